@@ -0,0 +1,312 @@
+# Information ---------------------------------------------------------------- #
+# Author :	Julien Lenoir
+# Github :	Blackounet
+# Created : March 2021
+# Updated :
+# ---------------------------------------------------------------------------- #
+
+
+
+# Importations --------------------------------------------------------------- #
+
+# Universal modules
+import numpy as np
+	# Allows Numpy array manipulation
+
+# Parameters
+from config import global_parameters as gp
+	# Contains the global variables
+
+# ---------------------------------------------------------------------------- #
+
+
+
+# Class ---------------------------------------------------------------------- #
+
+class AtomTable:
+	"""
+	A compact table of atom properties, read and written by field name like a structured array
+		The text fields are stored as small integer codes, their values are shared by the tables of a process
+		The grid coordinates are only stored once they have been computed
+	"""
+
+	def __init__(self, o_dtype=None, i_atom_count=0):
+		"""
+		Initializes the fields of the table
+		:param o_dtype: The structured type of an atom, as exposed by the table
+		:param i_atom_count: Number of atoms in the table
+		"""
+
+		# Layout fields
+		self.o_dtype = o_dtype					# Structured type of an atom, as exposed by the table
+		self.l_s_categories = []				# Fields stored as codes
+		self.l_s_grid = []						# Fields only stored once computed
+
+		# Storage fields
+		self.a_columns = None					# Array of the stored fields
+		self.d_categories = {}					# Values of each field stored as codes
+		self.a_grid_columns = None				# Array of the grid coordinates, None until computed
+
+		# If the table is not restored from stored columns
+		if o_dtype is not None:
+			self.build_layout()					# Defines the stored fields
+
+			l_t_columns = []					# Stored type of each field
+
+			# For each field of an atom
+			for s_field in self.o_dtype.names:
+
+				# If the field is a text
+				if s_field in self.l_s_categories:
+					l_t_columns.append((s_field, np.uint8))								# Stores the code of the value
+					self.d_categories[s_field] = share_categories(						# No value yet
+						s_field=s_field,
+						a_categories=np.array([""], dtype=self.o_dtype[s_field])
+					)
+
+				# If the field is stored as it is
+				elif s_field not in self.l_s_grid:
+					l_t_columns.append((s_field, self.o_dtype[s_field]))		# Stores the value
+			# End for
+
+			self.a_columns = np.zeros(i_atom_count, dtype=np.dtype(l_t_columns))		# Array of the stored fields
+	# End method ---------------------------------------- #
+
+
+	def __len__(self):
+		"""
+		Returns the number of atoms in the table
+		"""
+
+		return len(self.a_columns)
+	# End method ---------------------------------------- #
+
+
+	def __iter__(self):
+		"""
+		Iterates over the atoms as records of the structured type
+		"""
+
+		return iter(self.to_records())
+	# End method ---------------------------------------- #
+
+
+	def __getitem__(self, s_field):
+		"""
+		Retrieves the values of a field for each atom
+		:param s_field: Name of the field
+		:return: The array of values
+		"""
+
+		# If the field is stored as codes
+		if s_field in self.d_categories:
+			a_values = self.d_categories[s_field][self.a_columns[s_field]]		# Decodes the values
+			a_values.setflags(write=False)										# The decoded values are a copy, writing them would be lost
+
+			return a_values
+
+		# If the field is a grid coordinate
+		if s_field in self.l_s_grid:
+
+			# If the grid coordinates have not been computed
+			if self.a_grid_columns is None:
+				self.create_grid_columns()		# Default coordinates, kept for the next writes
+
+			return self.a_grid_columns[s_field]		# Loads the grid coordinates
+
+		return self.a_columns[s_field]		# Loads the stored values
+	# End method ---------------------------------------- #
+
+
+	def take(self, s_field, x_indexes):
+		"""
+		Retrieves the values of a field for some atoms only, the codes of the other atoms are not decoded
+		:param s_field: Name of the field
+		:param x_indexes: Index of the atoms, an array, a list or an integer
+		:return: The array of values, or the value of a single atom
+		"""
+
+		# If the field is stored as codes
+		if s_field in self.d_categories:
+			return self.d_categories[s_field][self.a_columns[s_field][x_indexes]]		# Decodes the values of the atoms
+
+		return self[s_field][x_indexes]		# Loads the values of the atoms
+	# End method ---------------------------------------- #
+
+
+	def __setitem__(self, s_field, x_values):
+		"""
+		Saves the values of a field for each atom
+		:param s_field: Name of the field
+		:param x_values: The values to save, an array or a list
+		"""
+
+		# If the field is stored as codes
+		if s_field in self.d_categories:
+			a_values = np.asarray(x_values).astype(self.o_dtype[s_field])		# Uses the width of the field
+			a_categories, a_codes = np.unique(a_values, return_inverse=True)	# Encodes the values
+			o_code_type = np.min_scalar_type(max(len(a_categories) - 1, 0))		# Narrowest code for the values
+
+			# If the current codes are too narrow
+			if np.dtype(o_code_type).itemsize > self.a_columns.dtype[s_field].itemsize:
+				self.widen_column(s_field=s_field, o_type=o_code_type)		# Widens the codes
+
+			self.d_categories[s_field] = share_categories(s_field=s_field, a_categories=a_categories)		# Saves the values
+			self.a_columns[s_field] = a_codes																# Saves the codes
+
+		# If the field is a grid coordinate
+		elif s_field in self.l_s_grid:
+
+			# If the grid coordinates have not been computed yet
+			if self.a_grid_columns is None:
+				self.create_grid_columns()		# Creates the grid coordinates
+
+			self.a_grid_columns[s_field] = x_values		# Saves the grid coordinates
+
+		# If the field is stored as it is
+		else:
+			self.a_columns[s_field] = x_values		# Saves the values
+	# End method ---------------------------------------- #
+
+
+	def __setstate__(self, d_state):
+		"""
+		Restores a pickled table, its values are shared with the tables of this process
+		:param d_state: The content of the pickled table
+		"""
+
+		self.__dict__.update(d_state)		# Restores the fields
+
+		# For each field stored as codes
+		for s_field in self.d_categories:
+			self.d_categories[s_field] = share_categories(s_field=s_field, a_categories=self.d_categories[s_field])
+	# End method ---------------------------------------- #
+
+
+	@property
+	def dtype(self):
+		"""
+		Structured type of an atom, as exposed by the table
+		"""
+
+		return self.o_dtype
+	# End method ---------------------------------------- #
+
+
+	@property
+	def nbytes(self):
+		"""
+		Number of bytes used by the atoms of the table
+		"""
+
+		return self.a_columns.nbytes + (self.a_grid_columns.nbytes if self.a_grid_columns is not None else 0)
+	# End method ---------------------------------------- #
+
+
+	def build_layout(self):
+		"""
+		Defines the fields stored as codes and the fields stored once computed
+		"""
+
+		self.l_s_categories = [s_field for s_field in self.o_dtype.names if self.o_dtype[s_field].kind == "U"]		# Text fields
+		self.l_s_grid = [s_field for s_field in self.o_dtype.names if s_field.startswith("grid_")]					# Grid coordinates
+	# End method ---------------------------------------- #
+
+
+	def restore_table(self, o_dtype, a_columns, d_categories):
+		"""
+		Loads in the table previously stored columns
+		:param o_dtype: The structured type of an atom, as exposed by the table
+		:param a_columns: Array of the stored fields
+		:param d_categories: Values of each field stored as codes
+		"""
+
+		self.o_dtype = o_dtype				# Structured type of an atom
+		self.build_layout()					# Defines the stored fields
+		self.a_columns = a_columns			# Array of the stored fields
+
+		# For each field stored as codes
+		for s_field in d_categories:
+			self.d_categories[s_field] = share_categories(s_field=s_field, a_categories=d_categories[s_field])
+	# End method ---------------------------------------- #
+
+
+	def create_grid_columns(self):
+		"""
+		Creates the grid coordinates of every atom, at the origin of the grid
+		"""
+
+		self.a_grid_columns = np.zeros(len(self), dtype=np.dtype(		# Array of the grid coordinates
+			[(s_grid, self.o_dtype[s_grid]) for s_grid in self.l_s_grid]
+		))
+	# End method ---------------------------------------- #
+
+
+	def widen_column(self, s_field, o_type):
+		"""
+		Stores the codes of a field in a wider integer type
+		:param s_field: Name of the field
+		:param o_type: The new integer type of the codes
+		"""
+
+		a_columns = np.zeros(len(self), dtype=np.dtype(		# Array of the stored fields, with the wider field
+			[(s_name, o_type if s_name == s_field else self.a_columns.dtype[s_name]) for s_name in self.a_columns.dtype.names]
+		))
+
+		# For each stored field
+		for s_name in self.a_columns.dtype.names:
+			a_columns[s_name] = self.a_columns[s_name]		# Copies the values
+
+		self.a_columns = a_columns		# Saves the new array
+	# End method ---------------------------------------- #
+
+
+	def to_records(self):
+		"""
+		Builds a structured array containing every field of every atom
+		:return: The structured array of the atoms
+		"""
+
+		a_records = np.zeros(len(self), dtype=self.o_dtype)		# Array of the atoms
+
+		# For each field of an atom
+		for s_field in self.o_dtype.names:
+			a_records[s_field] = self[s_field]		# Copies the values
+
+		return a_records		# Returns the structured array
+	# End method ---------------------------------------- #
+
+# ---------------------------------------------------------------------------- #
+
+
+
+# Auxiliary functions -------------------------------------------------------- #
+
+def share_categories(s_field, a_categories):
+	"""
+	Retrieves the array of values already used by another table, the same values are kept only once by process
+	:param s_field: Name of the field
+	:param a_categories: The values of the field
+	:return: The shared array of values
+	"""
+
+	t_key = (s_field, a_categories.dtype.str, a_categories.tobytes())		# Identifies the values
+
+	# If the values are not used by another table
+	if t_key not in gp.D_ATOM_CATEGORIES:
+		a_categories.setflags(write=False)				# The shared values cannot be modified
+		gp.D_ATOM_CATEGORIES[t_key] = a_categories		# Shares the values
+
+	return gp.D_ATOM_CATEGORIES[t_key]		# Returns the shared values
+# End function ------------------------------------------ #
+
+# ---------------------------------------------------------------------------- #
+
+
+
+# Reference ------------------------------------------------------------------ #
+
+# from atom_table import AtomTable
+	# Compact table of atom properties
+
+# ---------------------------------------------------------------------------- #
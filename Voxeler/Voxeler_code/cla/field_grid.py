@@ -0,0 +1,123 @@
+# Information ---------------------------------------------------------------- #
+# Author :	Julien Lenoir
+# Github :	Blackounet
+# Created : March 2021
+# Updated :
+# ---------------------------------------------------------------------------- #
+
+
+
+# Importations --------------------------------------------------------------- #
+
+# Universal modules
+import numpy as np
+	# Allows Numpy array manipulation
+
+# ---------------------------------------------------------------------------- #
+
+
+
+# Class ---------------------------------------------------------------------- #
+
+class FieldGrid:
+	"""
+	A grid whose points have several fields, each field is stored in its own contiguous array
+		The fields are accessed by their name, as the fields of a structured array, and scanned without stride
+		Indexing the grid with coordinates indexes every field, a point value is a tuple with one value per field
+	"""
+
+	def __init__(self, d_a_fields):
+		"""
+		Initializes the fields
+		:param d_a_fields: Dictionary of the array of each field, in the order of the fields, the arrays share their shape
+		"""
+
+		# Grid fields
+		self.d_a_fields = d_a_fields																				# Array of each field
+		self.dtype = np.dtype([(s_field, a_field.dtype) for s_field, a_field in d_a_fields.items()])		# Type of a point
+		self.shape = next(iter(d_a_fields.values())).shape															# Number of points in each dimension
+		self.size = int(np.prod(self.shape))																		# Number of points in the grid
+	# End method
+
+
+	def __repr__(self):
+		"""
+		Creates a human friendly representation of the grid and it's content
+		"""
+
+		# Preparing variables
+		l_s_content = [		# List containing the content to print
+			"> The field grid :"
+		]
+
+		# Grid fields
+		l_s_content.append("d_a_fields : {}".format(", ".join(self.d_a_fields.keys())))
+		l_s_content.append("dtype : {}".format(self.dtype))
+		l_s_content.append("shape : {}".format(self.shape))
+		l_s_content.append("size : {}".format(self.size))
+
+		return "\n".join(l_s_content)		# Returns the content to show
+	# End method
+
+
+	def __len__(self):
+		"""
+		Returns the number of points along the first axis
+		"""
+
+		return self.shape[0]
+	# End method ---------------------------------------- #
+
+
+	def __getitem__(self, x_key):
+		"""
+		Retrieves the array of a field, or the grid restricted to some points
+		:param x_key: The name of a field, or the index of the points as for a Numpy array
+		:return: The array of the field, or a grid of the indexed values of each field, sharing memory with slices
+		"""
+
+		# If a field is requested
+		if isinstance(x_key, str):
+			return self.d_a_fields[x_key]
+
+		return FieldGrid({		# Indexes each field
+			s_field: np.asarray(a_field[x_key]) for s_field, a_field in self.d_a_fields.items()
+		})
+	# End method ---------------------------------------- #
+
+
+	def __setitem__(self, x_key, x_value):
+		"""
+		Writes the values of a field, or the values of every field at some points
+		:param x_key: The name of a field, or the index of the points as for a Numpy array
+		:param x_value: The values to write, a grid, a structured array or a tuple with one value per field
+		"""
+
+		# If a field is written
+		if isinstance(x_key, str):
+			self.d_a_fields[x_key][...] = x_value
+			return
+
+		# If the values are another field grid or a structured array
+		if isinstance(x_value, (FieldGrid, np.ndarray, np.void)):
+			l_x_values = [x_value[s_field] for s_field in self.d_a_fields]		# Values of each field
+
+		# If the values are given field by field
+		else:
+			l_x_values = list(x_value)		# Values of each field
+
+		# For each field of the grid
+		for a_field, x_values in zip(self.d_a_fields.values(), l_x_values):
+			a_field[x_key] = x_values		# Writes the values of the field
+	# End method ---------------------------------------- #
+
+# ---------------------------------------------------------------------------- #
+
+
+
+# Reference ------------------------------------------------------------------ #
+
+# from field_grid import FieldGrid
+	# A grid storing each field of its points in its own contiguous array, accessed by the field names
+
+# ---------------------------------------------------------------------------- #
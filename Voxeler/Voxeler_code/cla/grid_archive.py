@@ -0,0 +1,207 @@
+# Information ---------------------------------------------------------------- #
+# Author :	Julien Lenoir
+# Github :	Blackounet
+# Created : March 2021
+# Updated :
+# ---------------------------------------------------------------------------- #
+
+
+
+# Importations --------------------------------------------------------------- #
+
+# Universal modules
+import os
+	# Allows file system operations
+import zipfile
+	# Reads the archives of arrays written by Numpy
+import hashlib
+	# Computes the hash of a content
+import numpy as np
+	# Allows Numpy array manipulation
+
+# Parameters
+from config import global_parameters as gp
+	# Contains the global variables
+
+# General library
+from lib.write_file_content import write_file_content
+	# Writes content to a file
+	# In : (p) file's path, (s) writing mode, (l(s)) content to write
+	# Out : None
+
+# ---------------------------------------------------------------------------- #
+
+
+
+# Class ---------------------------------------------------------------------- #
+
+class GridArchive:
+	"""
+	An archive of the grids saved in files, the next runs load them instead of generating them again
+		Each grid is saved in a compressed file named after the hash of its key, with its key and its size on the
+		lattice, a file is only loaded by a grid with the same key and the same size
+	"""
+
+	def __init__(self, p_directory):
+		"""
+		Initializes the fields
+		:param p_directory: Path to the directory of the grid files, created if it is missing
+		"""
+
+		# Archive fields
+		self.p_directory = p_directory		# Directory of the grid files
+		self.s_version = "2"				# Version of the file format, changing it invalidates the previous files
+
+		# Statistics fields
+		self.i_hits = 0			# Number of grids loaded from their file
+		self.i_misses = 0		# Number of grids without a valid file
+
+		# Tries to create the directory of the grid files
+		try:
+			os.makedirs(self.p_directory, exist_ok=True)		# Creates the directory if it is missing
+
+		# If the directory cannot be created, the grids are generated without being saved
+		except OSError:
+			write_file_content(		# Writes the warning to the logs
+				p_file=gp.D_PARAMETERS_GLOBAL["p_log"],
+				s_writing_mode='a',
+				l_s_content=["WARNING : The directory of the grid archive '{}' cannot be created".format(self.p_directory)]
+			)
+		# End try
+	# End method
+
+
+	def __repr__(self):
+		"""
+		Creates a human friendly representation of the archive and it's content
+		"""
+
+		# Preparing variables
+		l_s_content = [		# List containing the content to print
+			"> The grid archive :"
+		]
+
+		# Archive fields
+		l_s_content.append("p_directory : {}".format(self.p_directory))
+		l_s_content.append("s_version : {}".format(self.s_version))
+
+		# Statistics fields
+		l_s_content.append("i_hits : {}".format(self.i_hits))
+		l_s_content.append("i_misses : {}".format(self.i_misses))
+
+		return "\n".join(l_s_content)		# Returns the content to show
+	# End method
+
+
+	def build_file_path(self, t_key):
+		"""
+		Defines the path to the file of a grid
+		:param t_key: The key of the grid
+		:return: The path to the file
+		"""
+
+		o_hash = hashlib.sha256()					# Creates the hash of the grid
+		o_hash.update(repr(t_key).encode())			# Hashes the key of the grid
+		o_hash.update(self.s_version.encode())		# Hashes the file format version
+
+		return os.path.join(self.p_directory, o_hash.hexdigest() + ".npz")		# Returns the path to the file
+	# End method ---------------------------------------- #
+
+
+	def retrieve_grid(self, t_key, a_grid_size):
+		"""
+		Loads a grid from its file
+		:param t_key: The key of the grid
+		:param a_grid_size: Number of points in each dimension of the grid
+		:return: The arrays of the grid, None if the grid has no file or if the file cannot be read
+		"""
+
+		# Preparing variables
+		p_file = self.build_file_path(t_key=t_key)		# Path to the file of the grid
+
+		# If the grid has never been saved
+		if not os.path.exists(p_file):
+			self.i_misses += 1
+			return None
+
+		# Tries to read the grid
+		try:
+			o_file = np.load(p_file, allow_pickle=False)		# Opens the archive of arrays
+
+			# If the file belongs to another grid, or the grid lies on another lattice
+			if str(o_file["s_key"]) != repr(t_key) or not np.array_equal(o_file["a_grid_size"], a_grid_size):
+				o_file.close()
+				self.i_misses += 1
+				return None
+
+			t_a_grid = tuple(		# Reads each array, the unused arrays are not saved
+				o_file["a_array_{}".format(i_array)] if "a_array_{}".format(i_array) in o_file.files else None
+				for i_array in range(int(o_file["i_array_count"]))
+			)
+			o_file.close()		# Closes the input file
+
+		# If the file is damaged
+		except (OSError, EOFError, ValueError, KeyError, zipfile.BadZipFile):
+			self.i_misses += 1
+			return None
+		# End try
+
+		self.i_hits += 1
+
+		return t_a_grid		# Returns the arrays of the grid
+	# End method ---------------------------------------- #
+
+
+	def store_grid(self, t_key, a_grid_size, t_a_grid):
+		"""
+		Saves a grid in its file, the arrays are compressed, failures are logged without stopping the program
+		:param t_key: The key of the grid
+		:param a_grid_size: Number of points in each dimension of the grid
+		:param t_a_grid: The arrays of the grid, None for the unused arrays
+		"""
+
+		# Preparing variables
+		p_file = self.build_file_path(t_key=t_key)			# Path to the file of the grid
+		s_suffix = ".{}.tmp".format(os.getpid())			# Suffix of the file being written
+		d_a_arrays = {										# The arrays to save
+			"s_key": np.array(repr(t_key)),					# Key of the grid
+			"a_grid_size": np.asarray(a_grid_size),			# Size of the grid on the lattice
+			"i_array_count": np.array(len(t_a_grid))		# Number of arrays of the grid
+		}
+
+		# For each used array of the grid
+		for i_array, a_array in enumerate(t_a_grid):
+
+			# If the array is used
+			if a_array is not None:
+				d_a_arrays["a_array_{}".format(i_array)] = np.asarray(a_array)
+		# End for
+
+		# Tries to write the grid
+		try:
+			f_output = open(p_file + s_suffix, "wb")		# Opens the file
+			np.savez_compressed(f_output, **d_a_arrays)		# Writes the compressed arrays
+			f_output.close()								# Closes the output file
+
+			os.replace(p_file + s_suffix, p_file)		# Publishes the file, the grid is now complete
+
+		# If the archive cannot be written
+		except OSError:
+			write_file_content(		# Writes the warning to the logs
+				p_file=gp.D_PARAMETERS_GLOBAL["p_log"],
+				s_writing_mode='a',
+				l_s_content=["WARNING : A grid cannot be saved in the archive '{}'".format(self.p_directory)]
+			)
+		# End try
+	# End method ---------------------------------------- #
+
+# ---------------------------------------------------------------------------- #
+
+
+
+# Reference ------------------------------------------------------------------ #
+
+# from grid_archive import GridArchive
+	# Archive of the grids saved in compressed files, reused by the next runs
+
+# ---------------------------------------------------------------------------- #
@@ -0,0 +1,151 @@
+# Information ---------------------------------------------------------------- #
+# Author :	Julien Lenoir
+# Github :	Blackounet
+# Created : March 2021
+# Updated :
+# ---------------------------------------------------------------------------- #
+
+
+
+# Importations --------------------------------------------------------------- #
+
+# Universal modules
+from collections import OrderedDict
+	# Allows dictionaries remembering the order of their keys
+
+# ---------------------------------------------------------------------------- #
+
+
+
+# Class ---------------------------------------------------------------------- #
+
+class GridCache:
+	"""
+	A cache of the grids generated by a process, the least recently used grids are discarded first
+		The cache is bounded by a number of bytes, each process owns its own cache
+	"""
+
+	def __init__(self, f_memory_budget=0.0):
+		"""
+		Initializes the fields
+		:param f_memory_budget: Memory available for the grids, in gigabytes, the cache is unbounded if it is not positive
+		"""
+
+		# Cache fields
+		self.d_grids = OrderedDict()								# Grids of each key, from the least to the most recently used
+		self.i_byte_budget = int(f_memory_budget * 1073741824)		# Maximal number of bytes used by the grids
+		self.i_byte_count = 0										# Number of bytes used by the grids
+
+		# Statistics fields
+		self.i_hits = 0			# Number of grids found in the cache
+		self.i_misses = 0		# Number of grids not found in the cache
+	# End method
+
+
+	def __repr__(self):
+		"""
+		Creates a human friendly representation of the cache and it's content
+		"""
+
+		# Preparing variables
+		l_s_content = [		# List containing the content to print
+			"> The grid cache :"
+		]
+
+		# Cache fields
+		l_s_content.append("d_grids : {}".format(len(self.d_grids)))
+		l_s_content.append("i_byte_budget : {}".format(self.i_byte_budget))
+		l_s_content.append("i_byte_count : {}".format(self.i_byte_count))
+
+		# Statistics fields
+		l_s_content.append("i_hits : {}".format(self.i_hits))
+		l_s_content.append("i_misses : {}".format(self.i_misses))
+
+		return "\n".join(l_s_content)		# Returns the content to show
+	# End method
+
+
+	def __len__(self):
+		"""
+		Returns the number of grids in the cache
+		"""
+
+		return len(self.d_grids)
+	# End method ---------------------------------------- #
+
+
+	def retrieve_grid(self, t_key):
+		"""
+		Retrieves a grid from the cache and marks it as the most recently used
+		:param t_key: The key of the grid
+		:return: The arrays of the grid, None if the grid is not in the cache
+		"""
+
+		# If the grid is not in the cache
+		if t_key not in self.d_grids:
+			self.i_misses += 1
+			return None
+
+		self.i_hits += 1
+		self.d_grids.move_to_end(t_key)		# Marks the grid as the most recently used
+
+		return self.d_grids[t_key]		# Returns the arrays of the grid
+	# End method ---------------------------------------- #
+
+
+	def store_grid(self, t_key, t_a_grid):
+		"""
+		Saves a grid in the cache, then discards the least recently used grids until the cache fits in its budget
+			The saved arrays cannot be modified anymore
+		:param t_key: The key of the grid
+		:param t_a_grid: The arrays of the grid, None for the unused arrays
+		"""
+
+		# Preparing variables
+		i_bytes = sum([a_array.nbytes for a_array in t_a_grid if a_array is not None])		# Number of bytes used by the grid
+
+		# If the grid alone exceeds the budget
+		if 0 < self.i_byte_budget < i_bytes:
+			return
+
+		# If the key is already used
+		if t_key in self.d_grids:
+			self.discard_grid(t_key)		# Replaces the previous grid
+
+		# For each array of the grid
+		for a_array in t_a_grid:
+
+			# If the array is used
+			if a_array is not None:
+				a_array.setflags(write=False)		# The cached grid cannot be modified
+		# End for
+
+		self.d_grids[t_key] = t_a_grid		# Saves the grid as the most recently used
+		self.i_byte_count += i_bytes
+
+		# While the cache exceeds its budget
+		while 0 < self.i_byte_budget < self.i_byte_count:
+			self.discard_grid(next(iter(self.d_grids)))		# Discards the least recently used grid
+	# End method ---------------------------------------- #
+
+
+	def discard_grid(self, t_key):
+		"""
+		Removes a grid from the cache
+		:param t_key: The key of the grid
+		"""
+
+		t_a_grid = self.d_grids.pop(t_key)																# Removes the grid
+		self.i_byte_count -= sum([a_array.nbytes for a_array in t_a_grid if a_array is not None])		# Frees its bytes
+	# End method ---------------------------------------- #
+
+# ---------------------------------------------------------------------------- #
+
+
+
+# Reference ------------------------------------------------------------------ #
+
+# from grid_cache import GridCache
+	# Least recently used cache of the grids generated by a process
+
+# ---------------------------------------------------------------------------- #
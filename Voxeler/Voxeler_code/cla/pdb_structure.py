@@ -12,6 +12,8 @@
 # Universal modules
 import numpy as np
 	# Allows Numpy array manipulation
+import zlib
+	# Compresses the PDB information kept with the structure
 
 # Program external resources
 from resources import elem_config
@@ -21,6 +23,10 @@ from resources import elem_config
 from config import global_parameters as gp
 	# Contains the global variables
 
+# Classes
+from cla.atom_table import AtomTable
+	# Compact table of atom properties
+
 # General library
 from lib.retrieve_element_mass import retrieve_element_mass
 	# Retrieves the mass of each given element
@@ -44,17 +50,25 @@ class PdbStructure:
 
 		# PDB fields
 		self.s_name = ""				# Name of the structure
-		self.l_s_leading_data = []		# PDB information written above the atom properties
-		self.l_s_trailing_data = []		# PDB information written under the atom properties
+		self.s_hash = ""				# Hash of the file content and parsing filters, key of the structure in the cache
+		self.x_leading_data = b""		# Compressed PDB information written above the atom properties
+		self.x_trailing_data = b""		# Compressed PDB information written under the atom properties
 
 		# Structural fields
 		self.i_atom_count = 0			# Number of atoms in the structure
-		self.a_atoms = None				# Array of atoms properties
+		self.a_atoms = None				# Table of atoms properties
 		self.a_max_coord = None			# Maximal coordinates for each axis
 		self.a_min_coord = None			# Minimal coordinates for each axis
 
 		# Grid fields
 		self.a_grid = None				# 3D grid containing the structure
+		self.a_voxels = None			# Runs of non empty points of the grid along the z axis, when the grid is sparse
+		self.a_bit_grid = None			# Occupancy of the grid points, one bit by point, when only the volume is compared
+		self.a_blocks = None			# Non empty blocks of the grid, when the grid is hierarchical
+		self.a_block_points = None		# Points of the blocks crossed by a surface, when the grid is hierarchical
+		self.a_occupancy = None			# Covered part of each point of the grid in 64th of a point, when the grid is fractional
+		self.a_grid_origin = None		# Position of the first point of the grid on the lattice of the system
+		self.a_grid_size = None			# Number of points in each dimension of the grid
 		self.l_l_elements = None		# Set of atoms contained in the structure
 
 		# Solubilization fields
@@ -103,6 +117,48 @@ class PdbStructure:
 	# End method
 
 
+	@property
+	def l_s_leading_data(self):
+		"""
+		PDB information written above the atom properties, decompressed when needed
+		"""
+
+		return decompress_lines(x_lines=self.x_leading_data)
+	# End method ---------------------------------------- #
+
+
+	@l_s_leading_data.setter
+	def l_s_leading_data(self, l_s_lines):
+		"""
+		Compresses the PDB information written above the atom properties
+		:param l_s_lines: The lines to keep
+		"""
+
+		self.x_leading_data = compress_lines(l_s_lines=l_s_lines)
+	# End method ---------------------------------------- #
+
+
+	@property
+	def l_s_trailing_data(self):
+		"""
+		PDB information written under the atom properties, decompressed when needed
+		"""
+
+		return decompress_lines(x_lines=self.x_trailing_data)
+	# End method ---------------------------------------- #
+
+
+	@l_s_trailing_data.setter
+	def l_s_trailing_data(self, l_s_lines):
+		"""
+		Compresses the PDB information written under the atom properties
+		:param l_s_lines: The lines to keep
+		"""
+
+		self.x_trailing_data = compress_lines(l_s_lines=l_s_lines)
+	# End method ---------------------------------------- #
+
+
 	def load_structure(self, **kwargs):
 		"""
 		Loads in the object the base information about the structure
@@ -115,15 +171,24 @@ class PdbStructure:
 
 		# Structural fields
 		self.i_atom_count = len(kwargs["d_atoms"]["element_type"])		# Retrieves the number of atoms
-		self.a_atoms = np.arange(self.i_atom_count).astype(				# Array of atoms properties
-			np.dtype([
+		self.a_atoms = AtomTable(										# Compact table of atoms properties
+			i_atom_count=self.i_atom_count,
+			o_dtype=np.dtype([
 				("element_type", np.str, 6),				# ATOM or HETATM
-				("atom_serial", np.uint16, 1),				# Atom serial number
+				("atom_serial", select_index_type(			# Atom serial number, wider for the large assemblies
+					a_values=kwargs["d_atoms"]["atom_serial"],
+					l_types=[np.uint16, np.uint32, np.uint64]
+				), 1),
 				("atom_name", np.str, 4),					# Atom name
 				("alternative_location", np.str, 1),		# Alternate location indicator
 				("residue_name", np.str, 3),				# Residue name
-				("chain_id", np.str, 1),					# Chain identifier
-				("residue_serial", np.int16, 1),			# Residue sequence number
+				("chain_id", np.str, max(					# Chain identifier, mmCIF chains can be longer than a char
+					np.asarray(kwargs["d_atoms"]["chain_id"]).dtype.itemsize // 4, 1
+				)),
+				("residue_serial", select_index_type(		# Residue sequence number, wider for the large assemblies
+					a_values=kwargs["d_atoms"]["residue_serial"],
+					l_types=[np.int16, np.int32, np.int64]
+				), 1),
 				("residue_insertion", np.str, 1),			# Code for insertion of residues
 				("coord_x", np.float32, 1),					# Orthogonal coordinates for X in Angstroms
 				("coord_y", np.float32, 1),					# Orthogonal coordinates for Y in Angstroms
@@ -178,6 +243,26 @@ class PdbStructure:
 	# End method ---------------------------------------- #
 
 
+	def restore_structure(self, **kwargs):
+		"""
+		Loads in the object a structure previously processed, without computing its properties again
+		"""
+
+		# PDB fields
+		self.s_hash = kwargs["s_hash"]								# Key of the structure in the cache
+		self.x_leading_data = kwargs["x_leading_data"]			# Compressed PDB information written above the atom properties
+		self.x_trailing_data = kwargs["x_trailing_data"]		# Compressed PDB information written under the atom properties
+
+		# Structural fields
+		self.a_atoms = kwargs["a_atoms"]				# Array of atoms properties
+		self.i_atom_count = len(self.a_atoms)			# Retrieves the number of atoms
+		self.l_l_elements = kwargs["l_l_elements"]		# Set of atoms contained in the structure
+
+		# Miscellaneous fields
+		self.f_mass = kwargs["f_mass"]		# Mass of the structure
+	# End method ---------------------------------------- #
+
+
 	def actualize_properties(self):
 		"""
 		Actualizes the properties of the structure
@@ -202,19 +287,74 @@ class PdbStructure:
 		"""
 
 		self.a_grid = None		# Deletes the object from memory
+		self.a_voxels = None	# Deletes the non empty points from memory
+		self.a_bit_grid = None	# Deletes the occupancy grid from memory
+		self.a_blocks = None		# Deletes the blocks from memory
+		self.a_block_points = None	# Deletes the points of the blocks from memory
+		self.a_occupancy = None		# Deletes the covered parts of the points from memory
 	# End method ---------------------------------------- #
 
 
 	def translate_custom_types(self):
 		"""
 		Defines a new element type according to the element role within the structure
+			The type depends only on the residue name, the atom name and the element symbol
+			The rules are applied once for each different combination, the results are shared by all the structures
+		"""
+
+		# STEP 1 : Encoding the combinations ---------------- #
+		l_a_codes = []		# The code of each atom in each field
+		l_a_values = []		# The different values of each field
+
+		# For each field defining the custom type
+		for s_field in ["residue_name", "atom_name", "element_symbol"]:
+			a_values, a_codes = np.unique(self.a_atoms[s_field], return_inverse=True)		# Encodes the field
+			l_a_values.append(a_values)
+			l_a_codes.append(a_codes.astype(np.int64))
+
+		a_combinations, a_inverse = np.unique(													# Encodes the combinations of the three fields
+			(l_a_codes[0] * len(l_a_values[1]) + l_a_codes[1]) * len(l_a_values[2]) + l_a_codes[2],
+			return_inverse=True
+		)
+		# END STEP 1 ---------------------------------------- #
+
+		# STEP 2 : Converting the combinations -------------- #
+		l_s_custom_types = []		# The custom type of each combination
+
+		# For each combination found in the structure
+		for i_combination in a_combinations.tolist():
+
+			t_combination = (																# The residue name, atom name and element symbol
+				str(l_a_values[0][i_combination // (len(l_a_values[1]) * len(l_a_values[2]))]),
+				str(l_a_values[1][i_combination // len(l_a_values[2]) % len(l_a_values[1])]),
+				str(l_a_values[2][i_combination % len(l_a_values[2])])
+			)
+
+			# If the combination has never been converted
+			if t_combination not in gp.D_CUSTOM_TYPES:
+				gp.D_CUSTOM_TYPES[t_combination] = self.determine_custom_type(*t_combination)		# Saves the custom type
+
+			l_s_custom_types.append(gp.D_CUSTOM_TYPES[t_combination])		# Loads the custom type
+		# End for
+		# END STEP 2 ---------------------------------------- #
+
+		# STEP 3 : Saving the list of custom types ---------- #
+		self.a_atoms["custom_type"] = np.array(l_s_custom_types, dtype=np.str_)[a_inverse] if len(l_s_custom_types) > 0 else []		# Saves the custom type of each atom
+		# END STEP 3 ---------------------------------------- #
+	# End method ---------------------------------------- #
+
+
+	@staticmethod
+	def determine_custom_type(s_residue_name, s_atom_name, s_atom_symbol):
+		"""
+		Determines the custom type of an element according to its role within the residue
+		:param s_residue_name: The name of the residue
+		:param s_atom_name: The name of the atom
+		:param s_atom_symbol: The element symbol
+		:return: The custom type of the element
 		"""
 
 		# Preparing variables
-		a_residue_names = self.a_atoms["residue_name"]		# Loads the names of residues
-		a_atom_name = self.a_atoms["atom_name"]		# Loads the names of the atoms
-		a_atom_symbol = self.a_atoms["element_symbol"]		# Loads the elements symbols
-		l_s_custom_types = []		# Contains the list of converted types
 		d_translate_custom = {		# Conversion dictionary for custom types
 			"O": "OC",
 			"H": "H",
@@ -225,96 +365,150 @@ class PdbStructure:
 			"OXT": "XOT"
 		}
 
-		# STEP 1 : Converting the atom types ---------------- #
-		# For each element to convert
-		for i_element in range(len(a_residue_names)):
+		# If the residue is one of the main amino acids
+		if s_residue_name in elem_config.RES:
+
+			# Hydrogen
+			if s_atom_symbol == "H":
+				s_custom_type = "H"
 
-			# If the residue is one of the main amino acids
-			if a_residue_names[i_element] in elem_config.RES:
+			# If the atom is one of the main carbon chain
+			elif s_atom_name in d_translate_custom.keys():
+				s_custom_type = d_translate_custom[s_atom_name]
 
-				# Hydrogen
-				if a_atom_symbol[i_element] == "H":
-					s_custom_type = "H"
+			# Nitrogen in Arginine
+			elif s_residue_name == "ARG" and s_atom_name in elem_config.NARG[s_residue_name]:
+				s_custom_type = "NBAS"
 
-				# If the atom is one of the main carbon chain
-				elif a_atom_name[i_element] in d_translate_custom.keys():
-					s_custom_type = d_translate_custom[a_atom_name[i_element]]
+			# Carbon SP2 in aromatic ring
+			elif s_residue_name in elem_config.CAR.keys() and s_atom_name in elem_config.CAR[s_residue_name]:
+				s_custom_type = "CAR"
 
-				# Nitrogen in Arginine
-				elif a_residue_names[i_element] == "ARG" and a_atom_name[i_element] in elem_config.NARG[a_residue_names[i_element]]:
-					s_custom_type = "NBAS"
+			# Oxygen in hydroxyl or phenol
+			elif s_residue_name in elem_config.OHY.keys() and s_atom_name == elem_config.OHY[s_residue_name]:
+				s_custom_type = "OH"
 
-				# Carbon SP2 in aromatic ring
-				elif a_residue_names[i_element] in elem_config.CAR.keys() and a_atom_name[i_element] in elem_config.CAR[a_residue_names[i_element]]:
-					s_custom_type = "CAR"
+			# Nitrogen in amide
+			elif s_residue_name in elem_config.NAM.keys() and s_atom_name == elem_config.NAM[s_residue_name]:
+				s_custom_type = "NAM"
 
-				# Oxygen in hydroxyl or phenol
-				elif a_residue_names[i_element] in elem_config.OHY.keys() and a_atom_name[i_element] == elem_config.OHY[a_residue_names[i_element]]:
-					s_custom_type = "OH"
+			# Nitrogen in Histidine
+			elif s_residue_name in elem_config.NHIS.keys() and s_atom_name in elem_config.NHIS[s_residue_name]:
+				s_custom_type = "NBAS"
 
-				# Nitrogen in amide
-				elif a_residue_names[i_element] in elem_config.NAM.keys() and a_atom_name[i_element] == elem_config.NAM[a_residue_names[i_element]]:
-					s_custom_type = "NAM"
+			# Central carbon from ARG, GLN, GLU, ASP, ASN
+			elif s_residue_name in elem_config.CE.keys() and elem_config.CE[s_residue_name] == s_atom_name:
+				s_custom_type = "CAR"
 
-				# Nitrogen in Histidine
-				elif a_residue_names[i_element] in elem_config.NHIS.keys() and a_atom_name[i_element] in elem_config.NHIS[a_residue_names[i_element]]:
-					s_custom_type = "NBAS"
+			# Oxygen in carbonyl
+			elif s_residue_name in elem_config.OC.keys() and s_atom_name == elem_config.OC[s_residue_name]:
+				s_custom_type = "OC"
 
-				# Central carbon from ARG, GLN, GLU, ASP, ASN
-				elif a_residue_names[i_element] in elem_config.CE.keys() and elem_config.CE[a_residue_names[i_element]] == a_atom_name[i_element]:
-					s_custom_type = "CAR"
+			# Oxygen in carboxylate and oxygen in C-terminal
+			elif s_residue_name in elem_config.OOX.keys() and \
+					(s_atom_name == elem_config.OOX[s_residue_name][0] or
+					 s_atom_name == elem_config.OOX[s_residue_name][1]):
+				s_custom_type = "OOX"
 
-				# Oxygen in carbonyl
-				elif a_residue_names[i_element] in elem_config.OC.keys() and a_atom_name[i_element] == elem_config.OC[a_residue_names[i_element]]:
-					s_custom_type = "OC"
+			# Nitrogen in Lysine
+			elif s_residue_name in elem_config.NLYS.keys() and s_atom_name == elem_config.NLYS[s_residue_name]:
+				s_custom_type = "NBAS"
 
-				# Oxygen in carboxylate and oxygen in C-terminal
-				elif a_residue_names[i_element] in elem_config.OOX.keys() and \
-						(a_atom_name[i_element] == elem_config.OOX[a_residue_names[i_element]][0] or
-						 a_atom_name[i_element] == elem_config.OOX[a_residue_names[i_element]][1]):
-					s_custom_type = "OOX"
+			# Unknown element within a amino acid
+			else:
+				s_custom_type = "XOT"
+		# End if
 
-				# Nitrogen in Lysine
-				elif a_residue_names[i_element] in elem_config.NLYS.keys() and a_atom_name[i_element] == elem_config.NLYS[a_residue_names[i_element]]:
-					s_custom_type = "NBAS"
+		# If the element is a metallic atom
+		elif s_atom_symbol in elem_config.METAL:
+			s_custom_type = "META"
 
-				# Unknown element within a amino acid
-				else:
-					s_custom_type = "XOT"
-			# End if
+		# If the element is a halogen
+		elif s_atom_symbol in elem_config.HALO:
+			s_custom_type = "HALO"
 
-			# If the element is a metallic atom
-			elif a_atom_symbol[i_element] in elem_config.METAL:
-				s_custom_type = "META"
+		# If the element is a water molecule
+		elif s_residue_name == "HOH" and s_atom_name == "O":
+			s_custom_type = "OOW"
 
-			# If the element is a halogen
-			elif a_atom_symbol[i_element] in elem_config.HALO:
-				s_custom_type = "HALO"
+		# If the element is not known
+		else:
 
-			# If the element is a water molecule
-			elif a_residue_names[i_element] == "HOH" and a_atom_name[i_element] == "O":
-				s_custom_type = "OOW"
+			# If the element can be converted
+			if s_atom_symbol in d_translate_custom.keys():
+				s_custom_type = d_translate_custom[s_atom_symbol]
 
-			# If the element is not known
+			# If it cannot
 			else:
+				s_custom_type = "HETATM"
+		# End if
+
+		return s_custom_type		# Returns the custom type
+	# End method ---------------------------------------- #
 
-				# If the element can be converted
-				if a_atom_symbol[i_element] in d_translate_custom.keys():
-					s_custom_type = d_translate_custom[a_atom_symbol[i_element]]
+# ---------------------------------------------------------------------------- #
 
-				# If it cannot
-				else:
-					s_custom_type = "HETATM"
-			# End if
 
-			l_s_custom_types.append(s_custom_type)		# Saves the new element type
-		# End for
-		# END STEP 1 ---------------------------------------- #
 
-		# STEP 2 : Saving the list of custom types ---------- #
-		self.a_atoms["custom_type"] = l_s_custom_types		# Saves the list of custom types
-		# END STEP 2 ---------------------------------------- #
-	# End method ---------------------------------------- #
+# Auxiliary functions -------------------------------------------------------- #
+
+def compress_lines(l_s_lines):
+	"""
+	Compresses a list of lines, each line keeps its newline char
+	:param l_s_lines: The lines to compress
+	:return: The compressed lines, empty if there is no line
+	"""
+
+	# If there is no line to compress
+	if len(l_s_lines) == 0:
+		return b""
+
+	return zlib.compress("".join(l_s_lines).encode())		# Compresses the lines, with their newline chars
+# End function ------------------------------------------ #
+
+
+def decompress_lines(x_lines):
+	"""
+	Decompresses a list of lines
+	:param x_lines: The compressed lines
+	:return: The list of lines
+	"""
+
+	# If there is no line to decompress
+	if len(x_lines) == 0:
+		return []
+
+	l_s_lines = zlib.decompress(x_lines).decode().split("\n")		# Splits the content on each newline
+
+	return [s_line + "\n" for s_line in l_s_lines[:-1]] + [s_line for s_line in l_s_lines[-1:] if s_line]		# Returns the lines with their newline
+# End function ------------------------------------------ #
+
+
+def select_index_type(a_values, l_types):
+	"""
+	Selects the narrowest integer type able to store every value
+	:param a_values: The values to store
+	:param l_types: The possible integer types, from the narrowest to the widest
+	:return: The selected integer type
+	"""
+
+	# If there is no value to store
+	if len(a_values) == 0:
+		return l_types[0]		# Uses the narrowest type
+
+	i_min = int(np.min(a_values))		# Minimal value to store
+	i_max = int(np.max(a_values))		# Maximal value to store
+
+	# For each possible type
+	for o_type in l_types:
+
+		# If the type can store every value
+		if np.iinfo(o_type).min <= i_min and i_max <= np.iinfo(o_type).max:
+			return o_type
+	# End for
+
+	return l_types[-1]		# Uses the widest type
+# End function ------------------------------------------ #
 
 # ---------------------------------------------------------------------------- #
 
@@ -0,0 +1,224 @@
+# Information ---------------------------------------------------------------- #
+# Author :	Julien Lenoir
+# Github :	Blackounet
+# Created : March 2021
+# Updated :
+# ---------------------------------------------------------------------------- #
+
+
+
+# Importations --------------------------------------------------------------- #
+
+# Universal modules
+import os
+	# Allows python to access the operating system
+import numpy as np
+	# Allows Numpy array manipulation
+from multiprocessing import shared_memory
+	# Allows memory blocks shared between processes
+
+# ---------------------------------------------------------------------------- #
+
+
+
+# Class ---------------------------------------------------------------------- #
+
+class SharedGridStore:
+	"""
+	A store of grids kept in shared memory blocks, each grid is generated once and read by every process
+		The forked processes inherit the blocks and read them without copy, the other processes attach them by name
+		The store is bounded by a number of bytes, the grids exceeding it are not stored
+	"""
+
+	def __init__(self, f_memory_budget=0.0):
+		"""
+		Initializes the fields
+		:param f_memory_budget: Memory available for the grids, in gigabytes, the store is unbounded if it is not positive
+		"""
+
+		# Store fields
+		self.d_blocks = {}											# Name, shape and type of the blocks of each grid
+		self.d_grids = {}											# Arrays of each grid attached by the current process
+		self.l_o_memories = []										# Shared memory blocks opened by the current process
+		self.i_byte_budget = int(f_memory_budget * 1073741824)		# Maximal number of bytes used by the grids
+		self.i_byte_count = 0										# Number of bytes used by the grids
+		self.i_owner = os.getpid()									# Process creating and deleting the blocks
+	# End method
+
+
+	def __repr__(self):
+		"""
+		Creates a human friendly representation of the store and it's content
+		"""
+
+		# Preparing variables
+		l_s_content = [		# List containing the content to print
+			"> The shared grid store :"
+		]
+
+		# Store fields
+		l_s_content.append("d_blocks : {}".format(len(self.d_blocks)))
+		l_s_content.append("i_byte_budget : {}".format(self.i_byte_budget))
+		l_s_content.append("i_byte_count : {}".format(self.i_byte_count))
+
+		return "\n".join(l_s_content)		# Returns the content to show
+	# End method
+
+
+	def __len__(self):
+		"""
+		Returns the number of grids in the store
+		"""
+
+		return len(self.d_blocks)
+	# End method ---------------------------------------- #
+
+
+	def __getstate__(self):
+		"""
+		Prepares the store to be sent to another process, only the names of the blocks are sent
+		:return: The content of the store to pickle
+		"""
+
+		d_state = self.__dict__.copy()		# Copies the fields
+		d_state["d_grids"] = {}				# The blocks are attached again by the receiving process
+		d_state["l_o_memories"] = []
+
+		return d_state		# Returns the content to pickle
+	# End method ---------------------------------------- #
+
+
+	def retrieve_grid(self, t_key):
+		"""
+		Retrieves a grid from the store, its blocks are attached the first time the current process reads it
+		:param t_key: The key of the grid
+		:return: The read only arrays of the grid, None if the grid is not in the store
+		"""
+
+		# If the grid is not in the store
+		if t_key not in self.d_blocks:
+			return None
+
+		# If the grid has not been attached by the current process
+		if t_key not in self.d_grids:
+			l_a_grid = []		# Arrays of the grid
+
+			# For each array of the grid
+			for t_block in self.d_blocks[t_key]:
+
+				# If the array is not used
+				if t_block is None:
+					l_a_grid.append(None)
+					continue
+
+				o_memory = shared_memory.SharedMemory(name=t_block[0])		# Attaches the block
+				self.l_o_memories.append(o_memory)
+				l_a_grid.append(self.view_block(o_memory=o_memory, t_shape=t_block[1], o_dtype=t_block[2]))
+			# End for
+
+			self.d_grids[t_key] = tuple(l_a_grid)		# Saves the attached arrays
+
+		return self.d_grids[t_key]		# Returns the arrays of the grid
+	# End method ---------------------------------------- #
+
+
+	def store_grid(self, t_key, t_a_grid):
+		"""
+		Copies a grid into shared memory blocks
+		:param t_key: The key of the grid
+		:param t_a_grid: The arrays of the grid, None for the unused arrays
+		:return: True if the grid is stored, False if it exceeds the budget of the store
+		"""
+
+		# Preparing variables
+		i_bytes = sum([a_array.nbytes for a_array in t_a_grid if a_array is not None])		# Number of bytes used by the grid
+		l_t_blocks = []																		# Name, shape and type of each block
+		l_a_grid = []																		# Arrays of the grid in the blocks
+
+		# If the grid does not fit in the store
+		if 0 < self.i_byte_budget < self.i_byte_count + i_bytes:
+			return False
+
+		# For each array of the grid
+		for a_array in t_a_grid:
+
+			# If the array is not used
+			if a_array is None:
+				l_t_blocks.append(None)
+				l_a_grid.append(None)
+				continue
+
+			o_memory = shared_memory.SharedMemory(create=True, size=max(a_array.nbytes, 1))		# Creates the block
+			self.l_o_memories.append(o_memory)
+			a_shared = np.ndarray(a_array.shape, dtype=a_array.dtype, buffer=o_memory.buf)		# Array in the block
+			a_shared[...] = a_array																# Copies the array
+			a_shared.setflags(write=False)														# The shared grid cannot be modified
+
+			l_t_blocks.append((o_memory.name, a_array.shape, a_array.dtype))
+			l_a_grid.append(a_shared)
+		# End for
+
+		self.d_blocks[t_key] = tuple(l_t_blocks)		# Saves the blocks of the grid
+		self.d_grids[t_key] = tuple(l_a_grid)			# Saves the arrays of the grid
+		self.i_byte_count += i_bytes
+
+		return True
+	# End method ---------------------------------------- #
+
+
+	def release_blocks(self):
+		"""
+		Detaches the blocks from the current process, the process which created them also deletes them
+			The memory is freed once every process has stopped reading the grids
+		"""
+
+		self.d_grids = {}		# Forgets the attached arrays
+
+		# For each block opened by the current process
+		for o_memory in self.l_o_memories:
+
+			# If the current process created the blocks
+			if self.i_owner == os.getpid():
+				o_memory.unlink()		# Deletes the block
+
+			# Tries to detach the block
+			try:
+				o_memory.close()
+
+			# If some arrays still read the block
+			except BufferError:
+				pass
+		# End for
+
+		self.l_o_memories = []		# Forgets the blocks
+		self.d_blocks = {}
+		self.i_byte_count = 0
+	# End method ---------------------------------------- #
+
+
+	@staticmethod
+	def view_block(o_memory, t_shape, o_dtype):
+		"""
+		Creates a read only array reading a shared memory block
+		:param o_memory: The shared memory block
+		:param t_shape: The shape of the array
+		:param o_dtype: The type of the array values
+		:return: The array reading the block
+		"""
+
+		a_shared = np.ndarray(t_shape, dtype=o_dtype, buffer=o_memory.buf)		# Array in the block
+		a_shared.setflags(write=False)														# The shared grid cannot be modified
+
+		return a_shared		# Returns the array
+	# End method ---------------------------------------- #
+
+# ---------------------------------------------------------------------------- #
+
+
+
+# Reference ------------------------------------------------------------------ #
+
+# from shared_grid_store import SharedGridStore
+	# Store of grids kept in shared memory blocks, read by every process without copy
+
+# ---------------------------------------------------------------------------- #
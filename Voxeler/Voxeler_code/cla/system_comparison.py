@@ -12,22 +12,64 @@
 # Universal modules
 import sys
 	# Allows python to access the system commands
+import hashlib
+	# Computes the hash of a content
 import numpy as np
 	# Allows Numpy array manipulation
 
-# Program external resources
-from resources import elements
-	# Contains chemical elements properties
-
 # General library
+from lib.build_sphere_stencil import build_sphere_stencil
+	# Defines the relative coordinates of the points of a sphere, built once by process
+	# In : (s) sphere geometry, (i) radius in grid points
+	# Out : (a) the relative coordinates, one row per axis
+from lib.collect_vdw_voxels import collect_vdw_voxels
+	# Lists the runs of grid points covered by the spheres of groups of atoms along the z axis, by slabs of the grid
+	# In : (t) grid shape, (l(t)) atoms grid coordinates, sphere relative coordinates and value of each group,
+	# In : (f) update of the points of a slab or None, (i) number of points of a slab
+	# Out : (a) sorted runs, with their first grid index, their number of points and their value
 from lib.convert_element_symbol import convert_element_symbol
 	# Converts atomic number into element symbols or element symbols into atomic numbers
 	# In : (a/i/s) the atom symbol to convert
 	# Out : (a/i/s) the converted atom data
+from lib.load_element_registry import load_element_registry
+	# Loads the symbol, mass and VdW radius of each element code
+	# In : None
+	# Out : (d) the dictionary of the element properties arrays
+from lib.count_set_bits import count_set_bits
+	# Counts the bits set in a bit-packed grid, or in both of two bit-packed grids, by 64 bits words
+	# In : (a) first bit-packed grid, (a) second bit-packed grid or None, (i) maximal number of words at once
+	# Out : (i) the number of bits set
+from lib.measure_partial_volumes import measure_partial_volumes
+	# Measures the part of each grid point covered by the VdW volumes, as the number of its 64 sub-points covered
+	# In : (t) grid shape, (a) exact atoms grid coordinates, (a) exact radius in grid points, (s) sphere geometry,
+	# In : (i) maximal number of pairs at once
+	# Out : (a) the number of sub-points covered in each point
+from lib.pack_vdw_spheres import pack_vdw_spheres
+	# Sets the bits of the grid points covered by the sphere of each atom of an element, by chunks of atoms
+	# In : (a) bit-packed grid, (t) grid shape, (a) atoms grid coordinates, (a) sphere relative coordinates,
+	# In : (i) maximal number of points at once
+	# Out : None
+from lib.rasterize_vdw_blocks import rasterize_vdw_blocks
+	# Generates a two levels grid of the VdW volumes, full blocks stored by value and mixed blocks refined point by point
+	# In : (t) grid shape, (l(t)) atoms grid coordinates, radius and value of each group, (s) sphere geometry,
+	# In : (i) points along each axis of a block, (i) maximal number of points at once
+	# Out : (a) sorted non empty blocks, (a) points of the mixed blocks
+from lib.stamp_vdw_spheres import stamp_vdw_spheres
+	# Fills the sphere of each atom of an element in the grids, by chunks of atoms
+	# In : (l(a)) grids to fill, (a) atoms grid coordinates, (a) sphere relative coordinates,
+	# In : (l(a/i)) values of the atoms or None to spread the center values, (i) maximal number of points at once,
+	# In : (a) marks of the grid points or None
+	# Out : None
 from lib.terminate_program_process import terminate_program_process
 	# Stops the program and prints content
 	# In : (l(s)) content to prompt
 	# Out : None
+from lib.transform_nearest_atoms import transform_nearest_atoms
+	# Fills the grid points with the values of their nearest atom, with distance transforms by slabs of the grids
+	# In : (l(a)) grids to fill, (a) atoms grid coordinates, (l(a)) values of the atoms for each grid,
+	# In : (i) reach of the atoms, (s) sphere geometry, (a) radius of the atoms or None to relabel,
+	# In : (i) number of points of a slab
+	# Out : None
 
 # ---------------------------------------------------------------------------- #
 
@@ -58,10 +100,20 @@ class SystemComparison:
 		self.a_min_grid = None			# Minimal grid coordinates for each axis
 		self.a_grid_size = None			# Size of the grid
 		self.i_points_count = 0			# Number of points in the grid
+		self.b_sparse_grid = False		# If the grids only store their runs of non empty points
+		self.b_packed_grid = False		# If the grids only store the occupancy of their points, one bit by point
+		self.b_distance_grid = False	# If the VdW volumes are derived from a distance transform of the atom centers instead of the sphere stencils
+		self.b_block_grid = False		# If the grids are made of blocks, only the blocks crossed by a surface store their points
+		self.i_block_points = 8			# Number of points along each axis of a block
+		self.b_nearest_labels = False	# If the points take the element of their nearest atom instead of the last element stamped
+		self.b_fractional_grid = False	# If the grids store the covered part of each point instead of its occupancy
+		self.o_grid_cache = None		# Cache of the grids generated by the current process, None disables the cache
+		self.o_grid_store = None		# Grids generated once and shared by every process, None disables the store
+		self.o_grid_archive = None	# Grids saved in files by the previous runs, None disables the archive
 
 		# Resources fields
-		self.d_vdw_radius = {}		# Dictionary of VdW radius
-		self.d_scaled_vdw = {}		# VdW radius scaled to the grid
+		self.a_vdw_radius = None		# VdW radius of each element code
+		self.a_scaled_vdw = None		# VdW radius of each element code scaled to the grid
 		self.i_max_radius = 0		# The maximal VdW radius scaled to the grid
 
 		# Comparison fields
@@ -94,6 +146,13 @@ class SystemComparison:
 		l_s_content.append("a_max_grid : {}".format(self.a_max_grid))
 		l_s_content.append("a_min_grid : {}".format(self.a_min_grid))
 		l_s_content.append("a_grid_size : {}".format(self.a_grid_size))
+		l_s_content.append("b_sparse_grid : {}".format(self.b_sparse_grid))
+		l_s_content.append("b_packed_grid : {}".format(self.b_packed_grid))
+		l_s_content.append("b_distance_grid : {}".format(self.b_distance_grid))
+		l_s_content.append("b_block_grid : {}".format(self.b_block_grid))
+		l_s_content.append("i_block_points : {}".format(self.i_block_points))
+		l_s_content.append("b_nearest_labels : {}".format(self.b_nearest_labels))
+		l_s_content.append("b_fractional_grid : {}".format(self.b_fractional_grid))
 
 		return "\n".join(l_s_content)		# Returns the content to show
 	# End method
@@ -106,8 +165,71 @@ class SystemComparison:
 		:param d_parameters: Dictionary of the system parameters
 		"""
 
+		# Preparing variables
+		s_grid_storage = d_parameters["s_grid_storage"].upper()		# Converts to uppercase the grid storage
+		s_rasterization = d_parameters["s_rasterization"].upper()	# Converts to uppercase the rasterization
+		s_labeling = d_parameters["s_labeling"].upper()				# Converts to uppercase the labeling
+		s_occupancy = d_parameters["s_occupancy"].upper()			# Converts to uppercase the occupancy
+		l_s_logs = []												# Creates an empty list for logs
+
+		# If the grid storage is unknown
+		if s_grid_storage not in ("DENSE", "SPARSE", "HIERARCHICAL"):
+			l_s_logs.append("ERROR : Unknown grid storage '{}', known storages are 'Dense', 'Sparse' and 'Hierarchical'.".format(s_grid_storage))		# Defines the error message
+			terminate_program_process(		# Stops the program
+				l_s_content=l_s_logs		# Content to save in the logs
+			)
+
+		# If the rasterization is unknown
+		if s_rasterization != "STENCIL" and s_rasterization != "DISTANCE":
+			l_s_logs.append("ERROR : Unknown rasterization '{}', known rasterizations are 'Stencil' and 'Distance'.".format(s_rasterization))		# Defines the error message
+			terminate_program_process(		# Stops the program
+				l_s_content=l_s_logs		# Content to save in the logs
+			)
+
+		# If the labeling is unknown
+		if s_labeling != "ORDER" and s_labeling != "NEAREST":
+			l_s_logs.append("ERROR : Unknown labeling '{}', known labelings are 'Order' and 'Nearest'.".format(s_labeling))		# Defines the error message
+			terminate_program_process(		# Stops the program
+				l_s_content=l_s_logs		# Content to save in the logs
+			)
+
+		# If the blocks would need the labels of their points
+		if s_labeling == "NEAREST" and s_grid_storage == "HIERARCHICAL" and d_parameters["b_consider_elements"]:
+			l_s_logs.append("ERROR : The 'Nearest' labeling is not available with the 'Hierarchical' storage when the elements are considered.")		# Defines the error message
+			terminate_program_process(		# Stops the program
+				l_s_content=l_s_logs		# Content to save in the logs
+			)
+
+		# If the occupancy is unknown
+		if s_occupancy != "BINARY" and s_occupancy != "FRACTIONAL":
+			l_s_logs.append("ERROR : Unknown occupancy '{}', known occupancies are 'Binary' and 'Fractional'.".format(s_occupancy))		# Defines the error message
+			terminate_program_process(		# Stops the program
+				l_s_content=l_s_logs		# Content to save in the logs
+			)
+
+		# If the covered part of the points would need to be stored by another storage
+		if s_occupancy == "FRACTIONAL" and s_grid_storage != "DENSE":
+			l_s_logs.append("ERROR : The 'Fractional' occupancy is only available with the 'Dense' storage.")		# Defines the error message
+			terminate_program_process(		# Stops the program
+				l_s_content=l_s_logs		# Content to save in the logs
+			)
+
+		# If the blocks are empty
+		if d_parameters["i_block_points"] < 1:
+			l_s_logs.append("ERROR : The number of points along each axis of a block must be positive, not {}.".format(d_parameters["i_block_points"]))		# Defines the error message
+			terminate_program_process(		# Stops the program
+				l_s_content=l_s_logs		# Content to save in the logs
+			)
+
 		# Grid fields
 		self.f_grid_spacing = d_parameters["f_grid_spacing"]		# The space between two grid points
+		self.b_sparse_grid = s_grid_storage == "SPARSE"				# If the grids only store their non empty points
+		self.b_fractional_grid = s_occupancy == "FRACTIONAL"		# If the grids store the covered part of each point
+		self.b_packed_grid = s_grid_storage == "DENSE" and not d_parameters["b_consider_elements"] and not self.b_fractional_grid		# The volume only comparison needs the occupancy only
+		self.b_distance_grid = s_rasterization == "DISTANCE"		# If the VdW volumes are derived from a distance transform of the atom centers
+		self.b_block_grid = s_grid_storage == "HIERARCHICAL"		# If the grids are made of full and refined blocks
+		self.i_block_points = d_parameters["i_block_points"]		# Number of points along each axis of a block
+		self.b_nearest_labels = s_labeling == "NEAREST" and d_parameters["b_consider_elements"]		# The volume only comparison has no label
 
 		# Resources fields
 		self.load_vdw_radius()		# Retrieves the VdW radius of chemical elements
@@ -127,15 +249,7 @@ class SystemComparison:
 		Extracts the values of VdW radius
 		"""
 
-		# Preparing variables
-		d_vdw_radius = {}						# A dictionary containing the VdW radius of each element
-		d_o_elements = elements.ELEMENTS		# A dictionary of chemical elements properties
-
-		# For each known element within the list of chemical elements
-		for o_element in d_o_elements:
-			d_vdw_radius[o_element.symbol] = d_o_elements[o_element.symbol].vdwrad		# Saves the VdW radius of each chemical element
-
-		self.d_vdw_radius = d_vdw_radius		# Saves the dictionary of VdW radius
+		self.a_vdw_radius = load_element_registry()["a_f_vdw_radius"]		# Saves the VdW radius of each element code
 	# End method ---------------------------------------- #
 
 
@@ -144,23 +258,10 @@ class SystemComparison:
 		Scales the VdW radius to the grid spacing, converting the radius from Angstroms to points
 		"""
 
-		# Preparing variables
-		i_max_radius = 0		# Stores the maximal radius encountered
-		d_scaled_vdw = {}		# Dictionary of VdW radius per element scaled with the grid spacing
-
-		# For each element in the dictionary
-		for s_element in self.d_vdw_radius:
-			d_scaled_vdw[s_element] = np.rint(		# Defines the VdW radius in points
-				self.d_vdw_radius[s_element] / self.f_grid_spacing
-			).astype(np.int32)
-
-			# If the radius is superior to the actual maximal
-			if d_scaled_vdw[s_element] > i_max_radius:
-				i_max_radius = d_scaled_vdw[s_element]		# Saves the actual radius
-		# End for
-
-		self.i_max_radius = i_max_radius		# Saves the maximal radius
-		self.d_scaled_vdw = d_scaled_vdw		# Saves the scaled radius
+		self.a_scaled_vdw = np.rint(		# Defines the VdW radius of each element code in points
+			self.a_vdw_radius / self.f_grid_spacing
+		).astype(np.int32)
+		self.i_max_radius = max(0, np.max(self.a_scaled_vdw))		# Saves the maximal radius
 	# End method ---------------------------------------- #
 
 
@@ -237,21 +338,234 @@ class SystemComparison:
 				o_structure.l_l_elements[i_element][3] = np.transpose(l_l_elements[i_element][3])		# Formats and saves the atom coordinates
 		# End if
 
+		self.load_vdw_spheres(				# Retrieves the VdW sphere of each element
+			o_structure=o_structure,		# The structure to be incorporated
+			d_parameters=d_parameters		# Dictionary of the program parameters
+		)
+		self.compute_grid_box(o_structure=o_structure)		# Places the grid of the structure on the system lattice
+
+		# Preparing variables
+		t_key = self.build_grid_key(		# Identifies the structure and the grid parameters
+			o_structure=o_structure,		# The structure to be loaded into a grid
+			d_parameters=d_parameters		# Dictionary of the program parameters
+		)
+
+		# If the grids are shared between the processes
+		if self.o_grid_store is not None:
+			t_a_grid = self.o_grid_store.retrieve_grid(t_key=t_key)		# Looks for the grid in the shared store
+
+			# If the grid has already been generated
+			if t_a_grid is not None:
+				o_structure.a_grid, o_structure.a_voxels, o_structure.a_bit_grid, o_structure.a_blocks, o_structure.a_block_points, o_structure.a_occupancy = t_a_grid		# Reads the shared grid, without copy
+				return
+
+		# If the grids are cached
+		if self.o_grid_cache is not None:
+			t_a_grid = self.o_grid_cache.retrieve_grid(t_key=t_key)		# Looks for the grid in the cache
+
+			# If the grid has already been generated by this process
+			if t_a_grid is not None:
+				o_structure.a_grid, o_structure.a_voxels, o_structure.a_bit_grid, o_structure.a_blocks, o_structure.a_block_points, o_structure.a_occupancy = t_a_grid		# Loads the cached grid
+				return
+
+			self.load_grid(						# Loads the grid from its file, or generates it
+				o_structure=o_structure,		# The structure to be loaded into a grid
+				d_parameters=d_parameters		# Dictionary of the program parameters
+			)
+			self.o_grid_cache.store_grid(		# Saves the grid in the cache
+				t_key=t_key,
+				t_a_grid=(o_structure.a_grid, o_structure.a_voxels, o_structure.a_bit_grid, o_structure.a_blocks, o_structure.a_block_points, o_structure.a_occupancy)
+			)
+
+		# If the grids are not cached
+		else:
+			self.load_grid(						# Loads the grid from its file, or generates it
+				o_structure=o_structure,		# The structure to be loaded into a grid
+				d_parameters=d_parameters		# Dictionary of the program parameters
+			)
+	# End method ---------------------------------------- #
+
+
+	def load_grid(self, o_structure, d_parameters):
+		"""
+		Loads the grid of a structure from the archive of the previous runs, or generates it and saves it in the archive
+			The structures without hash, not extracted through the structure cache, are always generated
+		:param o_structure: The structure to be loaded into a grid
+		:param d_parameters: Dictionary of the program parameters
+		"""
+
+		# If the grid cannot be archived
+		if self.o_grid_archive is None or o_structure.s_hash == "":
+			self.build_grid(					# Generates the grid
+				o_structure=o_structure,		# The structure to be loaded into a grid
+				d_parameters=d_parameters		# Dictionary of the program parameters
+			)
+			return
+
+		# Preparing variables
+		t_key = self.build_archive_key(		# Identifies the structure, its placement and the grid parameters
+			o_structure=o_structure,		# The structure to be loaded into a grid
+			d_parameters=d_parameters		# Dictionary of the program parameters
+		)
+		t_a_grid = self.o_grid_archive.retrieve_grid(		# Looks for the file of the grid
+			t_key=t_key,
+			a_grid_size=o_structure.a_grid_size
+		)
+
+		# If the grid has already been saved by a previous run
+		if t_a_grid is not None:
+			o_structure.a_grid, o_structure.a_voxels, o_structure.a_bit_grid, o_structure.a_blocks, o_structure.a_block_points, o_structure.a_occupancy = t_a_grid		# Loads the archived grid
+			return
+
+		self.build_grid(					# Generates the grid
+			o_structure=o_structure,		# The structure to be loaded into a grid
+			d_parameters=d_parameters		# Dictionary of the program parameters
+		)
+		self.o_grid_archive.store_grid(		# Saves the grid for the next runs
+			t_key=t_key,
+			a_grid_size=o_structure.a_grid_size,
+			t_a_grid=(o_structure.a_grid, o_structure.a_voxels, o_structure.a_bit_grid, o_structure.a_blocks, o_structure.a_block_points, o_structure.a_occupancy)
+		)
+	# End method ---------------------------------------- #
+
+
+	def build_grid_key(self, o_structure, d_parameters):
+		"""
+		Identifies the grid of a structure for the cache and the shared store, the forked processes share the keys
+		:param o_structure: The structure to be loaded into a grid
+		:param d_parameters: Dictionary of the program parameters
+		:return: The key of the grid
+		"""
+
+		return (
+			id(o_structure),							# The structure
+			self.f_grid_spacing,						# The grid parameters
+			d_parameters["s_grid_geometry"].upper(),
+			d_parameters["b_consider_elements"],
+			self.b_sparse_grid,
+			self.b_packed_grid,
+			self.b_distance_grid,
+			self.b_block_grid,
+			self.i_block_points,
+			self.b_nearest_labels,
+			self.b_fractional_grid
+		)
+	# End method ---------------------------------------- #
+
+
+	def build_archive_key(self, o_structure, d_parameters):
+		"""
+		Identifies the grid of a structure for the archive, the key does not depend on the run
+			The structure is identified by its hash, and its atoms by their integer points relative to the origin of the
+			grid, so a grid is reused as long as its atoms fall on the same points of its box
+			The coordinates are rounded with the lattice offset, the halves go to the even points, so the grids are also
+			identified by the parity of the offset
+			The blocks are placed on the system lattice, so the block grids are also identified by the origin of their
+			box and by the size of the system grid, and the exact centers of the fractional grids by the offset
+		:param o_structure: The structure to be loaded into a grid
+		:param d_parameters: Dictionary of the program parameters
+		:return: The key of the grid
+		"""
+
+		# Preparing variables
+		a_points = np.transpose((														# Points of the atoms in the grid of the structure
+			o_structure.a_atoms["grid_x"].astype(np.int64) - o_structure.a_grid_origin[0],
+			o_structure.a_atoms["grid_y"].astype(np.int64) - o_structure.a_grid_origin[1],
+			o_structure.a_atoms["grid_z"].astype(np.int64) - o_structure.a_grid_origin[2]
+		))
+		t_lattice = ()		# Placement of the grid on the system lattice, when the grid depends on it
+
+		# If the grid is made of blocks
+		if self.b_block_grid:
+			t_lattice = (												# The origin of the box and the system grid
+				tuple(int(i_point) for i_point in o_structure.a_grid_origin),
+				tuple(int(i_points) for i_points in self.a_grid_size)
+			)
+
+		# If the grid stores the covered part of each point
+		elif self.b_fractional_grid:
+			t_lattice = tuple(int(f_offset) for f_offset in self.a_offset)		# The offset of the exact centers
+
+		return (
+			o_structure.s_hash,															# The structure
+			hashlib.sha256(np.ascontiguousarray(a_points).tobytes()).hexdigest(),		# The placement of its atoms
+			tuple(int(f_offset) % 2 for f_offset in self.a_offset),						# The rounding of its atoms
+			t_lattice,																	# The placement of its grid
+			self.f_grid_spacing,														# The grid parameters
+			d_parameters["s_grid_geometry"].upper(),
+			d_parameters["b_consider_elements"],
+			self.b_sparse_grid,
+			self.b_packed_grid,
+			self.b_distance_grid,
+			self.b_block_grid,
+			self.i_block_points,
+			self.b_nearest_labels,
+			self.b_fractional_grid
+		)
+	# End method ---------------------------------------- #
+
+
+	def build_grid(self, o_structure, d_parameters):
+		"""
+		Fills the grid of a structure, in the storage used by the system
+		:param o_structure: The structure to be loaded into a grid
+		:param d_parameters: Dictionary of the program parameters
+		"""
+
+		# If the grid stores the covered part of each point
+		if self.b_fractional_grid:
+			self.generate_fractional_grid(		# Measures the part of each point covered by the VdW volumes of the atoms
+				o_structure=o_structure,		# The structure to be incorporated
+				d_parameters=d_parameters		# Dictionary of the program parameters
+			)
+			return
+
+		# If the grid is made of blocks
+		if self.b_block_grid:
+			self.generate_block_grid(			# Fills the blocks covered by the VdW volumes of the atoms
+				o_structure=o_structure,		# The structure to be incorporated
+				d_parameters=d_parameters		# Dictionary of the program parameters
+			)
+			return
+
+		# If the VdW volumes are given by the nearest atom of each point
+		if self.b_distance_grid:
+			self.generate_distance_grid(		# Labels the points covered by the VdW volumes of the atoms
+				o_structure=o_structure,		# The structure to be incorporated
+				d_parameters=d_parameters		# Dictionary of the program parameters
+			)
+			return
+
+		# If the grid only stores its non empty points
+		if self.b_sparse_grid:
+			self.generate_voxel_set(			# Lists the points covered by the VdW volumes of the atoms
+				o_structure=o_structure,		# The structure to be incorporated
+				d_parameters=d_parameters		# Dictionary of the program parameters
+			)
+			return
+
+		# If the grid only stores the occupancy of its points
+		if self.b_packed_grid:
+			self.generate_bit_grid(				# Sets the points covered by the VdW volumes of the atoms
+				o_structure=o_structure,		# The structure to be incorporated
+				d_parameters=d_parameters		# Dictionary of the program parameters
+			)
+			return
+
 		# Creating the grid
-		o_structure.a_grid = np.zeros(self.i_points_count).reshape(		# Initializes the grid
-			self.a_grid_size[0],
-			self.a_grid_size[1],
-			self.a_grid_size[2]
-		).astype(np.uint8)		# Stores values between 0 and 127
+		o_structure.a_grid = np.zeros(		# Initializes the grid, over the box of the structure only
+			tuple(o_structure.a_grid_size),
+			dtype=np.uint8					# Stores values between 0 and 127
+		)
 
 		# Loading the structure into the grid
 		a_elements_code = convert_element_symbol(					# Switches between atom symbols and atomic numbers
 			x_element=o_structure.a_atoms["element_symbol"],		# The elements to convert
 		)
 		o_structure.a_grid[
-			o_structure.a_atoms["grid_x"],
-			o_structure.a_atoms["grid_y"],
-			o_structure.a_atoms["grid_z"]
+			o_structure.a_atoms["grid_x"] - o_structure.a_grid_origin[0],
+			o_structure.a_atoms["grid_y"] - o_structure.a_grid_origin[1],
+			o_structure.a_atoms["grid_z"] - o_structure.a_grid_origin[2]
 		] = a_elements_code
 
 		# Generating VDW volumes
@@ -259,6 +573,14 @@ class SystemComparison:
 			o_structure=o_structure,		# The structure to be incorporated
 			d_parameters=d_parameters		# Dictionary of the program parameters
 		)
+
+		# If the points take the element of their nearest atom
+		if self.b_nearest_labels:
+			self.label_nearest_atoms(				# Relabels the points covered by the VdW volumes
+				o_structure=o_structure,			# The structure loaded into the grid
+				d_parameters=d_parameters,			# Dictionary of the program parameters
+				a_grid=o_structure.a_grid			# The grid of the structure
+			)
 	# End method ---------------------------------------- #
 
 
@@ -272,95 +594,358 @@ class SystemComparison:
 		# Preparing variables
 		l_l_elements = o_structure.l_l_elements		# Shortcut for the structure field containing sorted data for each element
 
+		# For each chemical element present
+		for i_element in range(len(l_l_elements)):
+			stamp_vdw_spheres(									# Fills the sphere of each atom of the element
+				l_a_grids=[o_structure.a_grid],					# The grid to fill
+				a_centers=l_l_elements[i_element][3] - o_structure.a_grid_origin,		# Coordinates of the atoms in the grid of the structure
+				a_sphere=l_l_elements[i_element][5],			# Relative coordinates of the sphere points
+				l_x_values=[									# Value of the atoms
+					l_l_elements[i_element][1] if d_parameters["b_consider_elements"]	# The type of element, if it is used by the comparison
+					else 1																# The same element, if only the volume is considered
+				]
+			)
+		# End for
+	# End method ---------------------------------------- #
+
+
+	def load_vdw_spheres(self, o_structure, d_parameters):
+		"""
+		Retrieves the VdW radius and the VdW sphere of each element of a structure, once by structure
+		:param o_structure: The structure to be incorporated with its VdW volume
+		:param d_parameters: Dictionary of the program parameters
+		"""
+
+		# Preparing variables
+		l_l_elements = o_structure.l_l_elements		# Shortcut for the structure field containing sorted data for each element
+
 		# If the VdW radius by element has not been already retrieved
 		if o_structure.b_loaded is not True:
 
 			# For each atom type in the structure
 			for i_element in range(len(l_l_elements)):
 
-				i_radius = self.d_scaled_vdw[l_l_elements[i_element][0]]		# Retrieves the VdW radius of the element
-				l_i_radius_range = list(range(-i_radius, i_radius + 1))			# Builds a list of distances included in the sphere
+				i_radius = self.a_scaled_vdw[l_l_elements[i_element][1]]		# Retrieves the VdW radius of the element
 				l_l_elements[i_element][4] = i_radius							# Saves the VdW radius
-				l_l_elements[i_element][5] = self.create_vdw_sphere(
-					d_parameters=d_parameters,				# Dictionary of the program parameters
-					i_radius=i_radius,						# VdW radius of the element
-					l_i_radius_range=l_i_radius_range		# Range of radius around the element
+				l_l_elements[i_element][5] = build_sphere_stencil(		# Retrieves the shared sphere of the radius
+					s_geometry=d_parameters["s_grid_geometry"],		# The grid geometry
+					i_radius=i_radius									# VdW radius of the element
 				)
 				o_structure.b_loaded = True		# Sets the structure as loaded
+	# End method ---------------------------------------- #
 
-		# For each chemical element present
-		for i_element in range(len(l_l_elements)):
 
-			# For each atom in the structure
-			for a_atom in l_l_elements[i_element][3]:
+	def generate_voxel_set(self, o_structure, d_parameters):
+		"""
+		Lists the runs along the z axis of the grid points covered by the VdW volumes of a structure, with the element
+		code of their points, as the grid would contain them
+			The runs are sorted by linear index in the box of the structure, the box is filled by slabs and is never
+			allocated at once
+		:param o_structure: The structure to be incorporated with its VdW volume
+		:param d_parameters: Dictionary of the program parameters
+		"""
+
+		# Preparing variables
+		l_l_elements = o_structure.l_l_elements		# Shortcut for the structure field containing sorted data for each element
 
-				a_sphere_coords = (									# Retrieves the coordinates of each point of the sphere
-					l_l_elements[i_element][5][0] + a_atom[0],		# X coordinates
-					l_l_elements[i_element][5][1] + a_atom[1],		# Y coordinates
-					l_l_elements[i_element][5][2] + a_atom[2]		# Z coordinates
+		o_structure.a_voxels = collect_vdw_voxels(								# Lists the runs of points covered by the atoms of each element
+			t_grid_shape=tuple(o_structure.a_grid_size),						# The shape of the grid of the structure
+			l_t_groups=[														# Atoms, sphere and code of each element, in order
+				(
+					l_l_elements[i_element][3] - o_structure.a_grid_origin,		# Coordinates of the atoms in the grid of the structure
+					l_l_elements[i_element][5],									# Relative coordinates of the sphere points
+					l_l_elements[i_element][1] if d_parameters["b_consider_elements"] else 1		# The type of element, or the same element for the volume only
 				)
+				for i_element in range(len(l_l_elements))
+			],
+			f_update=self.find_relabeling(o_structure, d_parameters)		# Element of the nearest atom, if used
+		)
+	# End method ---------------------------------------- #
 
-				# If the comparison uses the type of elements
-				if d_parameters["b_consider_elements"]:
-					o_structure.a_grid[a_sphere_coords] = l_l_elements[i_element][1]		# Fills the sphere with the element
 
-				# If only the volume is considered
-				else:
-					o_structure.a_grid[a_sphere_coords] = 1		# Fills the sphere with the same element
+	def generate_bit_grid(self, o_structure, d_parameters):
+		"""
+		Generates a bit-packed occupancy grid for a structure, one bit by grid point
+			Each row of the grid along the z axis is made of whole 64 bits words, aligned on the system lattice
+		:param o_structure: The structure to be incorporated with its VdW volume
+		:param d_parameters: Dictionary of the program parameters
+		"""
+
+		# Preparing variables
+		l_l_elements = o_structure.l_l_elements		# Shortcut for the structure field containing sorted data for each element
+
+		o_structure.a_bit_grid = np.zeros(					# Initializes the grid, one bit by point
+			int(np.prod(o_structure.a_grid_size)) // 8,		# The box of the structure is padded to whole words
+			dtype=np.uint8
+		)
+
+		# For each chemical element present
+		for i_element in range(len(l_l_elements)):
+			pack_vdw_spheres(								# Sets the points covered by the atoms of the element
+				a_bits=o_structure.a_bit_grid,						# The bit-packed grid to fill
+				t_grid_shape=tuple(o_structure.a_grid_size),		# The shape of the unpacked grid of the structure
+				a_centers=l_l_elements[i_element][3] - o_structure.a_grid_origin,		# Coordinates of the atoms in the grid of the structure
+				a_sphere=l_l_elements[i_element][5]			# Relative coordinates of the sphere points
+			)
 		# End for
 	# End method ---------------------------------------- #
 
 
-	@staticmethod
-	def create_vdw_sphere(d_parameters, i_radius, l_i_radius_range):
+	def generate_distance_grid(self, o_structure, d_parameters):
 		"""
-		Defines a spherical array of points for a specific geometry
+		Generates the grid of a structure from the distance transform of the atom centers
+			Each point takes the element of its nearest atom, found by the transform, if it is within the VdW radius
+			of this atom, so a point of a large atom closer to a small atom is left empty, the cost only depends on the
+			number of points of the box of the structure
+			The points already take the element of their nearest atom, they are not relabelled
+		:param o_structure: The structure to be incorporated with its VdW volume
 		:param d_parameters: Dictionary of the program parameters
-		:param i_radius: The raw VdW radius of the element, in grid points
-		:param l_i_radius_range: The list of points in the radius range
-		:return: A spherical array of relative coordinates
 		"""
 
 		# Preparing variables
-		s_grid_geometry = d_parameters["s_grid_geometry"].upper()		# Converts to uppercase the grid geometry
-		a_sphere = None													# Array of points coordinates for each grid point in the VdW range
-		l_s_logs = []													# Creates an empty list for logs
-
-		# If the grid geometry is a taxicab
-		if s_grid_geometry == "TAXICAB":
-			a_sphere = np.array(		# The taxicab sphere formula
-				[
-					(x, y, z) for x in l_i_radius_range for y in l_i_radius_range for z in l_i_radius_range
-					if abs(x) + abs(y) + abs(z) <= i_radius
-				]
-			).astype(np.int32)
+		l_l_elements = o_structure.l_l_elements		# Shortcut for the structure field containing sorted data for each element
+		a_centers = np.concatenate(					# Coordinates of the atoms in the grid of the structure, by element
+			[np.reshape(l_l_elements[i_element][3], (-1, 3)) for i_element in range(len(l_l_elements))] + [np.zeros((0, 3))]
+		).astype(np.int64) - o_structure.a_grid_origin
+		a_radius = np.concatenate(					# VdW radius of each atom
+			[np.full(len(l_l_elements[i_element][3]), l_l_elements[i_element][4]) for i_element in range(len(l_l_elements))] + [np.zeros(0)]
+		).astype(np.int64)
+		a_elements_code = np.concatenate(			# Element of each atom, or the same element for the volume only
+			[
+				np.full(len(l_l_elements[i_element][3]), l_l_elements[i_element][1] if d_parameters["b_consider_elements"] else 1)
+				for i_element in range(len(l_l_elements))
+			] + [np.zeros(0)]
+		).astype(np.uint8)
+		f_fill = lambda a_slab, i_first_plane: transform_nearest_atoms(		# Fills the planes of a slab starting at a plane of the box
+			l_a_grids=[a_slab],												# The planes to fill
+			a_centers=a_centers - (i_first_plane, 0, 0),					# Coordinates of the atoms in the planes
+			l_a_values=[a_elements_code],									# Element of each atom
+			i_reach=int(np.max(a_radius, initial=0)),						# Largest VdW radius of the structure
+			s_geometry=d_parameters["s_grid_geometry"],						# The sphere geometry
+			a_radius=a_radius												# VdW radius of each atom
+		)
 
-		# If the grid geometry is uniform
-		elif s_grid_geometry == "UNIFORM":
-			a_sphere = np.array(		# The uniform sphere formula
-				[
-					(x, y, z) for x in l_i_radius_range for y in l_i_radius_range for z in l_i_radius_range
-				]
-			).astype(np.int32)
-
-		# If the grid geometry is a classic sphere
-		elif s_grid_geometry == "SPHERE":
-			a_sphere = np.array(		# The classic sphere formula
-				[
-					(x, y, z) for x in l_i_radius_range for y in l_i_radius_range for z in l_i_radius_range
-					if x ** 2 + y ** 2 + z ** 2 <= i_radius ** 2
-				]
-			).astype(np.int32)
+		# If the grid only stores its non empty points
+		if self.b_sparse_grid:
+			o_structure.a_voxels = collect_vdw_voxels(			# Lists the runs of points with the element of the nearest atom
+				t_grid_shape=tuple(o_structure.a_grid_size),	# The shape of the grid of the structure
+				l_t_groups=[],									# No sphere is stamped
+				f_update=f_fill									# Fills each slab from the distance transform
+			)
+			return
+		# End if
 
-		# If the geometry is unknown
+		a_grid = np.zeros(tuple(o_structure.a_grid_size), dtype=np.uint8)		# Element of each point of the box of the structure
+		f_fill(a_grid, 0)														# Fills the whole box
+
+		# If the grid only stores the occupancy of its points
+		if self.b_packed_grid:
+			o_structure.a_bit_grid = np.packbits(a_grid.ravel() != 0)		# One bit by point, the rows are made of whole words
+
+		# If the grid is dense
 		else:
-			l_s_logs.append("ERROR : Unknown sphere geometry '{}', known geometries are 'taxicab', 'uniform' and 'sphere'.".format(s_grid_geometry))		# Defines the error message
-			terminate_program_process(		# Stops the program
-				l_s_content=l_s_logs		# Content to save in the logs
+			o_structure.a_grid = a_grid		# Saves the grid
+	# End method ---------------------------------------- #
+
+
+	def generate_block_grid(self, o_structure, d_parameters):
+		"""
+		Generates a grid of blocks for a structure, the blocks entirely covered by an element are stored by their value
+		and the blocks crossed by a surface store each of their points
+			The blocks are placed on the system lattice, so the blocks of two structures are compared one to one
+		:param o_structure: The structure to be incorporated with its VdW volume
+		:param d_parameters: Dictionary of the program parameters
+		"""
+
+		# Preparing variables
+		l_l_elements = o_structure.l_l_elements		# Shortcut for the structure field containing sorted data for each element
+		l_t_groups = [								# Atoms, radius and value of each element
+			(
+				l_l_elements[i_element][3],														# Grid coordinates of the atoms
+				np.full(len(l_l_elements[i_element][3]), l_l_elements[i_element][4]),			# VdW radius of the atoms
+				l_l_elements[i_element][1]														# The type of element
 			)
-		# End if
-		return a_sphere.T		# Returns the spherical array of points
-	# End method
+			for i_element in range(len(l_l_elements))
+		]
+
+		# If only the volume is considered
+		if not d_parameters["b_consider_elements"] and len(l_t_groups) > 0:
+			l_t_groups = [(												# The same element for every atom
+				np.concatenate([t_group[0] for t_group in l_t_groups]),
+				np.concatenate([t_group[1] for t_group in l_t_groups]),
+				1
+			)]
+
+		o_structure.a_blocks, o_structure.a_block_points = rasterize_vdw_blocks(		# Fills the blocks of the grid
+			t_grid_shape=tuple(self.a_grid_size),										# The shape of the grid
+			l_t_groups=l_t_groups,														# Atoms, radius and value of each group
+			s_geometry=d_parameters["s_grid_geometry"],									# The sphere geometry
+			i_block_points=self.i_block_points											# Points along each axis of a block
+		)
+	# End method ---------------------------------------- #
+
+
+	def generate_fractional_grid(self, o_structure, d_parameters):
+		"""
+		Generates the grid of a structure with the part of each point covered by the VdW volumes, in 64th of a point
+			The atoms keep their exact position and VdW radius instead of being rounded to the grid, the points are
+			labelled with the element of their nearest atom
+		:param o_structure: The structure to be incorporated with its VdW volume
+		:param d_parameters: Dictionary of the program parameters
+		"""
+
+		# Preparing variables
+		a_elements_code = convert_element_symbol(					# Switches between atom symbols and atomic numbers
+			x_element=o_structure.a_atoms["element_symbol"],		# The elements to convert
+		)
+
+		o_structure.a_occupancy = measure_partial_volumes(			# Counts the sub-points covered in each point
+			t_grid_shape=tuple(o_structure.a_grid_size),			# The shape of the grid of the structure
+			a_centers=np.transpose((								# Exact coordinates of the atoms in the grid of the structure
+				o_structure.a_atoms["coord_x"] / self.f_grid_spacing + self.a_offset[0] - o_structure.a_grid_origin[0],
+				o_structure.a_atoms["coord_y"] / self.f_grid_spacing + self.a_offset[1] - o_structure.a_grid_origin[1],
+				o_structure.a_atoms["coord_z"] / self.f_grid_spacing + self.a_offset[2] - o_structure.a_grid_origin[2]
+			)),
+			a_radius=self.a_vdw_radius[np.asarray(a_elements_code)] / self.f_grid_spacing,		# Exact VdW radius of the atoms
+			s_geometry=d_parameters["s_grid_geometry"]				# The sphere geometry
+		)
+
+		o_structure.a_grid = (o_structure.a_occupancy != 0).astype(np.uint8)		# The same element for the points of the VdW volumes
+
+		# If the elements are used by the comparison
+		if d_parameters["b_consider_elements"]:
+			self.label_nearest_atoms(				# Relabels the points covered by the VdW volumes
+				o_structure=o_structure,			# The structure loaded into the grid
+				d_parameters=d_parameters,			# Dictionary of the program parameters
+				a_grid=o_structure.a_grid			# The grid of the structure
+			)
+	# End method ---------------------------------------- #
+
+
+	def label_nearest_atoms(self, o_structure, d_parameters, a_grid, i_first_plane=0):
+		"""
+		Gives to each non empty point of the grid of a structure the element of its nearest atom
+			The nearest atom is found by a distance transform of the atom centers, by slabs of the grid, so the cost
+			does not depend on the VdW radius, the atoms at equal distances are resolved by the transform
+			For the fractional grids, the reach is widened, the points partly covered exceed the rounded VdW radius
+		:param o_structure: The structure loaded into a grid
+		:param d_parameters: Dictionary of the program parameters
+		:param a_grid: The planes of the box of the structure to relabel, along the x axis
+		:param i_first_plane: Index of the first plane of the grid in the box of the structure
+		"""
+
+		# Preparing variables
+		a_elements_code = convert_element_symbol(					# Switches between atom symbols and atomic numbers
+			x_element=o_structure.a_atoms["element_symbol"],		# The elements to convert
+		)
+
+		transform_nearest_atoms(												# Relabels the non empty points with the element of the nearest atom
+			l_a_grids=[a_grid],													# The grid to relabel
+			a_centers=np.transpose((											# Coordinates of the atoms in the planes of the grid
+				o_structure.a_atoms["grid_x"] - o_structure.a_grid_origin[0] - i_first_plane,
+				o_structure.a_atoms["grid_y"] - o_structure.a_grid_origin[1],
+				o_structure.a_atoms["grid_z"] - o_structure.a_grid_origin[2]
+			)),
+			l_a_values=[np.asarray(a_elements_code, dtype=np.uint8)],			# Element of each atom
+			i_reach=self.i_max_radius + (4 if self.b_fractional_grid else 0),	# Distance of every point covered by the atoms
+			s_geometry=d_parameters["s_grid_geometry"]							# The sphere geometry
+		)
+	# End method ---------------------------------------- #
+
+
+	def find_relabeling(self, o_structure, d_parameters):
+		"""
+		Defines the relabelling of the slabs of the box of a structure, when the points take the element of their
+		nearest atom
+		:param o_structure: The structure loaded into a grid
+		:param d_parameters: Dictionary of the program parameters
+		:return: The function relabelling the planes of a slab starting at a plane of the box, None to keep the labels
+		"""
+
+		# If the points keep the element stamped last
+		if not self.b_nearest_labels:
+			return None
+
+		return lambda a_slab, i_first_plane: self.label_nearest_atoms(		# Relabels the covered points of the slab
+			o_structure=o_structure,
+			d_parameters=d_parameters,
+			a_grid=a_slab,
+			i_first_plane=i_first_plane
+		)
+	# End method ---------------------------------------- #
+
+
+	def compute_grid_box(self, o_structure):
+		"""
+		Defines the box of the grid of a structure, the smallest box of the system lattice containing its VdW volumes
+			The grid of the structure starts at its origin on the system lattice, so the grids of two structures are
+			compared on the intersection of their boxes only
+			For the bit-packed grids, the box is widened along the z axis to whole 64 bits words of the system lattice
+			For the fractional grids, the box is widened by one point, the exact VdW volumes exceed the rounded ones
+		:param o_structure: The structure loaded into a grid
+		"""
+
+		# Preparing variables
+		l_l_elements = o_structure.l_l_elements		# Shortcut for the structure field containing sorted data for each element
+		a_low = np.zeros(3, dtype=np.int64)			# First point of the box
+		a_high = np.zeros(3, dtype=np.int64)		# Point following the last point of the box
+
+		# If the structure contains atoms
+		if len(l_l_elements) > 0:
+			a_low = np.min([											# First point covered by the VdW volumes
+				np.min(l_l_elements[i_element][3], axis=0) - l_l_elements[i_element][4]
+				for i_element in range(len(l_l_elements))
+			], axis=0).astype(np.int64)
+			a_high = np.max([											# Last point covered by the VdW volumes
+				np.max(l_l_elements[i_element][3], axis=0) + l_l_elements[i_element][4]
+				for i_element in range(len(l_l_elements))
+			], axis=0).astype(np.int64) + 1
+
+		# If the grid stores the covered part of each point
+		if self.b_fractional_grid:
+			a_low -= 1		# Points partly covered before the box
+			a_high += 1		# Points partly covered after the box
+
+		# If the grid only stores the occupancy of its points
+		if self.b_packed_grid:
+			a_low[2] = a_low[2] // 64 * 64				# Starts the rows on a word
+			a_high[2] = -(-a_high[2] // 64) * 64		# Ends the rows on a word
+
+		o_structure.a_grid_origin = a_low					# Position of the grid on the system lattice
+		o_structure.a_grid_size = a_high - a_low			# Number of points in each dimension of the grid
+	# End method ---------------------------------------- #
+
+
+	def count_grid_points(self, o_structure):
+		"""
+		Counts the non empty points of the grid of a structure
+			For the fractional grids, the covered parts of the points are summed, in 64th of a point
+		:param o_structure: The structure loaded into a grid
+		:return: The number of non empty points
+		"""
+
+		# If the grid stores the covered part of each point
+		if self.b_fractional_grid:
+			return int(np.sum(o_structure.a_occupancy[o_structure.a_grid != 0], dtype=np.int64))
+
+		# If the grid only stores its runs of non empty points
+		if self.b_sparse_grid:
+			return int(np.sum(o_structure.a_voxels["run_length"], dtype=np.int64))
+
+		# If the grid only stores the occupancy of its points
+		if self.b_packed_grid:
+			return count_set_bits(a_first_bits=o_structure.a_bit_grid)
+
+		# If the grid is made of blocks
+		if self.b_block_grid:
+			return (																	# Points of the full blocks and of the mixed blocks
+				int(np.count_nonzero(o_structure.a_blocks["block_row"] < 0)) * self.i_block_points ** 3
+				+ int(np.count_nonzero(o_structure.a_block_points))
+			)
+
+		return np.count_nonzero(o_structure.a_grid)
+	# End method ---------------------------------------- #
+
 
 # Progression
 
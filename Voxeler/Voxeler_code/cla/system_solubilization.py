@@ -15,13 +15,21 @@ import numpy as np
 import sys
 	# Allows python to access the system commands
 
-# Program external resources
-from resources import elements
-	# Contains chemical elements properties
-
 # Parameters
 # Classes
+from cla.field_grid import FieldGrid
+	# A grid storing each field of its points in its own contiguous array, accessed by the field names
+
 # General library
+from lib.allocate_grid import allocate_grid
+	# Allocates an empty grid or a copy of a grid, in memory or in a temporary file of a scratch directory
+	# In : (t) grid shape, (o) type of the points, (p) scratch directory or None, (i) maximal number of points at once,
+	# In : (a) grid to copy or None
+	# Out : (a) the new grid
+from lib.build_sphere_stencil import build_sphere_stencil
+	# Defines the relative coordinates of the points of a sphere, built once by process
+	# In : (s) sphere geometry, (i) radius in grid points
+	# Out : (a) the relative coordinates, one row per axis
 from lib.retrieve_specific_files import retrieve_specific_files
 	# Retrieves files path, recursively or not, matching a specific pattern, or not
 	# In : (p) directory to retrieve files from, (s) pattern to match,
@@ -32,6 +40,22 @@ from lib.read_file_content import read_file_content
 	# Extracts the content of a file
 	# In : (p) file's path
 	# Out : (l(s)) the file's content
+from lib.load_element_registry import load_element_registry
+	# Loads the symbol, mass and VdW radius of each element code
+	# In : None
+	# Out : (d) the dictionary of the element properties arrays
+from lib.transform_nearest_atoms import transform_nearest_atoms
+	# Fills the grid points with the values of their nearest atom, with distance transforms by slabs of the grids
+	# In : (l(a)) grids to fill, (a) atoms grid coordinates, (l(a)) values of the atoms for each grid,
+	# In : (i) reach of the atoms, (s) sphere geometry, (a) radius of the atoms or None to relabel,
+	# In : (i) number of points of a slab
+	# Out : None
+from lib.stamp_vdw_spheres import stamp_vdw_spheres
+	# Fills the sphere of each atom of an element in the grids, by chunks of atoms
+	# In : (l(a)) grids to fill, (a) atoms grid coordinates, (a) sphere relative coordinates,
+	# In : (l(a/i)) values of the atoms or None to spread the center values, (i) maximal number of points at once,
+	# In : (a) marks of the grid points or None
+	# Out : None
 from lib.terminate_program_process import terminate_program_process
 	# Stops the program and prints content
 	# In : (l(s)) content to prompt
@@ -72,10 +96,13 @@ class SystemSolubilization:
 		self.a_min_grid = None			# Minimal grid coordinates for each axis
 		self.a_grid_size = None			# Size of the grid
 		self.i_points_count = 0			# Number of points in the grid
+		self.b_disk_grid = False		# If the grids are stored in temporary files
+		self.p_scratch_directory = None	# Directory of the temporary grid files
+		self.b_nearest_labels = False	# If the points take the properties of their nearest atom instead of the last atom stamped
 
 		# Resources fields
-		self.d_vdw_radius = {}				# Dictionary of VdW radius
-		self.d_scaled_vdw = {}				# VdW radius scaled to the grid
+		self.a_vdw_radius = None				# VdW radius of each element code
+		self.a_scaled_vdw = None				# VdW radius of each element code scaled to the grid
 		self.i_max_radius = 0				# The maximal VdW radius scaled to the grid
 		self.d_d_distance_score = {}		# Dictionary containing the electronic densities
 
@@ -108,6 +135,9 @@ class SystemSolubilization:
 		l_s_content.append("a_max_grid : {}".format(self.a_max_grid))
 		l_s_content.append("a_min_grid : {}".format(self.a_min_grid))
 		l_s_content.append("a_grid_size : {}".format(self.a_grid_size))
+		l_s_content.append("b_disk_grid : {}".format(self.b_disk_grid))
+		l_s_content.append("p_scratch_directory : {}".format(self.p_scratch_directory))
+		l_s_content.append("b_nearest_labels : {}".format(self.b_nearest_labels))
 
 		# Resources fields
 		l_s_content.append("d_d_distance_score : {} entries".format(len(self.d_d_distance_score.keys())))
@@ -123,8 +153,30 @@ class SystemSolubilization:
 		:param d_parameters: Dictionary of the system parameters
 		"""
 
+		# Preparing variables
+		s_grid_backend = d_parameters["s_grid_backend"].upper()		# Converts to uppercase the grid backend
+		s_labeling = d_parameters["s_labeling"].upper()				# Converts to uppercase the labeling
+		l_s_logs = []												# Creates an empty list for logs
+
+		# If the grid backend is unknown
+		if s_grid_backend != "MEMORY" and s_grid_backend != "DISK":
+			l_s_logs.append("ERROR : Unknown grid backend '{}', known backends are 'Memory' and 'Disk'.".format(s_grid_backend))		# Defines the error message
+			terminate_program_process(		# Stops the program
+				l_s_content=l_s_logs		# Content to save in the logs
+			)
+
+		# If the labeling is unknown
+		if s_labeling != "ORDER" and s_labeling != "NEAREST":
+			l_s_logs.append("ERROR : Unknown labeling '{}', known labelings are 'Order' and 'Nearest'.".format(s_labeling))		# Defines the error message
+			terminate_program_process(		# Stops the program
+				l_s_content=l_s_logs		# Content to save in the logs
+			)
+
 		# Grid fields
 		self.f_grid_spacing = d_parameters["f_grid_spacing"]		# The space between two grid points
+		self.b_nearest_labels = s_labeling == "NEAREST"				# If the points take the properties of their nearest atom
+		self.b_disk_grid = s_grid_backend == "DISK"					# If the grids are stored in temporary files
+		self.p_scratch_directory = d_parameters["p_scratch_directory"] if self.b_disk_grid else None		# Directory of the grid files
 
 		# Resources fields
 		self.load_vdw_radius()				# Retrieves the VdW radius of chemical elements
@@ -147,15 +199,7 @@ class SystemSolubilization:
 		Extracts the values of VdW radius
 		"""
 
-		# Preparing variables
-		d_vdw_radius = {}						# A dictionary containing the VdW radius of each element
-		d_o_elements = elements.ELEMENTS		# A dictionary of chemical elements properties
-
-		# For each known element within the list of chemical elements
-		for o_element in d_o_elements:
-			d_vdw_radius[o_element.symbol] = d_o_elements[o_element.symbol].vdwrad		# Saves the VdW radius of each chemical element
-
-		self.d_vdw_radius = d_vdw_radius		# Saves the dictionary of VdW radius
+		self.a_vdw_radius = load_element_registry()["a_f_vdw_radius"]		# Saves the VdW radius of each element code
 	# End method ---------------------------------------- #
 
 
@@ -164,23 +208,10 @@ class SystemSolubilization:
 		Scales the VdW radius to the grid spacing, converting the radius from Angstroms to points
 		"""
 
-		# Preparing variables
-		i_max_radius = 0		# Stores the maximal radius encountered
-		d_scaled_vdw = {}		# Dictionary of VdW radius per element scaled with the grid spacing
-
-		# For each element in the dictionary
-		for s_element in self.d_vdw_radius:
-			d_scaled_vdw[s_element] = np.rint(		# Defines the VdW radius in points
-				self.d_vdw_radius[s_element] / self.f_grid_spacing #WHY ?
-			).astype(np.int32)
-
-			# If the radius is superior to the actual maximal
-			if d_scaled_vdw[s_element] > i_max_radius:
-				i_max_radius = d_scaled_vdw[s_element]		# Saves the actual radius
-		# End for
-
-		self.i_max_radius = i_max_radius		# Saves the maximal radius
-		self.d_scaled_vdw = d_scaled_vdw		# Saves the scaled radius
+		self.a_scaled_vdw = np.rint(		# Defines the VdW radius of each element code in points
+			self.a_vdw_radius / self.f_grid_spacing #WHY ?
+		).astype(np.int32)
+		self.i_max_radius = max(0, np.max(self.a_scaled_vdw))		# Saves the maximal radius
 	# End method ---------------------------------------- #
 
 
@@ -303,14 +334,10 @@ class SystemSolubilization:
 		# End for
 
 		# Creating the grid
-		o_structure.a_grid = np.zeros(self.i_points_count).reshape(		# Initializes the grid
-			self.a_grid_size[0],
-			self.a_grid_size[1],
-			self.a_grid_size[2]
-		).astype(
-			np.dtype([									# Defines the content of each point
+		o_structure.a_grid = self.allocate_grid(		# Initializes the grid, one array per field
+			o_dtype=np.dtype([							# Defines the content of each point
 				("element_symbol", np.uint8, 1),		# The atom symbol
-				("atom_serial", np.uint16, 1),			# The atom serial number
+				("atom_serial", o_structure.a_atoms.dtype["atom_serial"], 1),		# The atom serial number, as wide as in the structure
 				("score", np.float16, 1)				# The atom score
 			])
 		)
@@ -335,6 +362,13 @@ class SystemSolubilization:
 			o_structure=o_structure,		# The structure to be incorporated
 			d_parameters=d_parameters		# Dictionary of the program parameters
 		)
+
+		# If the points take the properties of their nearest atom
+		if self.b_nearest_labels:
+			self.label_nearest_atoms(			# Relabels the points covered by the VdW volumes
+				o_structure=o_structure,		# The structure loaded into the grid
+				d_parameters=d_parameters		# Dictionary of the program parameters
+			)
 	# End method ---------------------------------------- #
 
 
@@ -349,96 +383,103 @@ class SystemSolubilization:
 
 		# Preparing variables
 		l_l_elements = o_structure.l_l_elements		# Shortcut for the structure field containing sorted data for each element
+		a_marks = self.allocate_grid(o_dtype=np.int32) if self.b_disk_grid else None		# Marks of the filled points, beside the grids
 
 		# For each atom type in the structure
 		for i_element in range(len(l_l_elements)):
 
-			i_radius = self.d_scaled_vdw[l_l_elements[i_element][0]] + i_solubilization_radius		# Retrieves the VdW radius of the element
-			l_i_radius_range = list(range(-i_radius, i_radius + 1))									# Builds a list of distances included in the sphere
+			i_radius = self.a_scaled_vdw[l_l_elements[i_element][1]] + i_solubilization_radius		# Retrieves the VdW radius of the element
 			l_l_elements[i_element][4] = i_radius													# Saves the VdW radius
-			l_l_elements[i_element][5] = self.create_vdw_sphere(
-				d_parameters=d_parameters,				# Dictionary of the program parameters
-				i_radius=i_radius,						# VdW radius of the element
-				l_i_radius_range=l_i_radius_range		# Range of radius around the element
+			l_l_elements[i_element][5] = build_sphere_stencil(		# Retrieves the shared sphere of the radius
+				s_geometry=d_parameters["s_grid_geometry"],		# The grid geometry
+				i_radius=i_radius									# VdW radius of the element
 			)
 
 		# For each chemical element present
 		for i_element in range(len(l_l_elements)):
+			stamp_vdw_spheres(												# Fills the sphere of each atom of the element
+				l_a_grids=[													# The grids to fill
+					o_structure.a_grid["element_symbol"],					# The element symbols
+					o_structure.a_grid["atom_serial"]						# The atom serial numbers
+				],
+				a_centers=l_l_elements[i_element][3],						# Grid coordinates of the atoms
+				a_sphere=l_l_elements[i_element][5],						# Relative coordinates of the sphere points
+				l_x_values=[0, 0] if b_remove_volume else None,				# Deletes the volume, or spreads the properties found at the atom centers
+				a_marks=a_marks												# Marks of the filled points
+			)
+		# End for
+	# End method ---------------------------------------- #
+
 
-			# For each atom in the structure
-			for a_atom in l_l_elements[i_element][3]:
+	def label_nearest_atoms(self, o_structure, d_parameters):
+		"""
+		Gives to each point covered by the VdW volumes the element and the serial number of its nearest atom
+			The nearest atom is found by a distance transform of the atom centers, by slabs of the grid, so the grid is
+			only read and written by slabs, the atoms at equal distances are resolved by the transform
+		:param o_structure: The structure loaded into the grid
+		:param d_parameters: Dictionary of the program parameters
+		"""
 
-				i_symbol = o_structure.a_grid["element_symbol"][a_atom[0], a_atom[1], a_atom[2]]
-				i_serial = o_structure.a_grid["atom_serial"][a_atom[0], a_atom[1], a_atom[2]]
+		# Preparing variables
+		a_elements_code = convert_element_symbol(					# Switches between atom symbols and atomic numbers
+			x_element=o_structure.a_atoms["element_symbol"],		# The elements to convert
+		)
 
-				a_sphere_coords = (									# Retrieves the coordinates of each point of the sphere
-					l_l_elements[i_element][5][0] + a_atom[0],		# X coordinates
-					l_l_elements[i_element][5][1] + a_atom[1],		# Y coordinates
-					l_l_elements[i_element][5][2] + a_atom[2]		# Z coordinates
-				)
+		transform_nearest_atoms(									# Relabels the covered points with the properties of the nearest atom
+			l_a_grids=[												# The grids to relabel
+				o_structure.a_grid["element_symbol"],				# The element symbols
+				o_structure.a_grid["atom_serial"]					# The atom serial numbers
+			],
+			a_centers=np.transpose((								# Grid coordinates of the atoms
+				o_structure.a_atoms["grid_x"],
+				o_structure.a_atoms["grid_y"],
+				o_structure.a_atoms["grid_z"]
+			)),
+			l_a_values=[np.asarray(a_elements_code), o_structure.a_atoms["atom_serial"]],		# Element and serial number of each atom
+			i_reach=self.i_max_radius,								# Distance of every point covered by the atoms
+			s_geometry=d_parameters["s_grid_geometry"]				# The sphere geometry
+		)
+	# End method ---------------------------------------- #
 
-				# If the volume needs to be removed
-				if b_remove_volume:
-					o_structure.a_grid["element_symbol"][a_sphere_coords] = 0		# Deletes the element symbol
-					o_structure.a_grid["atom_serial"][a_sphere_coords] = 0			# Deletes the atom serial number
 
-				# If the volume need to be filled with the atom properties
-				else:
-					o_structure.a_grid["element_symbol"][a_sphere_coords] = i_symbol		# Fills the sphere with the element
-					o_structure.a_grid["atom_serial"][a_sphere_coords] = i_serial			# Fills the sphere with the atom serial number
-		# End for
+	def allocate_grid(self, o_dtype, a_source=None):
+		"""
+		Allocates a grid of the system size, in memory or in the scratch directory depending on the grid backend
+			A type with several fields gives a field grid, each field is allocated in its own contiguous array
+		:param o_dtype: The type of the grid points
+		:param a_source: The grid to copy into the new grid, None to leave the grid empty
+		:return: The new grid
+		"""
+
+		# If the points have several fields
+		if np.dtype(o_dtype).names is not None:
+			return FieldGrid({		# Allocates each field on its own
+				s_field: self.allocate_grid(
+					o_dtype=o_dtype[s_field],
+					a_source=None if a_source is None else a_source[s_field]
+				) for s_field in o_dtype.names
+			})
+
+		return allocate_grid(								# Allocates the grid
+			t_grid_shape=tuple(self.a_grid_size),			# The shape of the grid
+			o_dtype=o_dtype,								# The type of the grid points
+			p_scratch_directory=self.p_scratch_directory,	# Directory of the grid file, None to keep it in memory
+			a_source=a_source								# The grid to copy
+		)
 	# End method ---------------------------------------- #
 
 
-	@staticmethod
-	def create_vdw_sphere(d_parameters, i_radius, l_i_radius_range):
+	def copy_grid(self, a_grid):
 		"""
-		Defines a spherical array of points for a specific geometry
-		:param d_parameters: Dictionary of the program parameters
-		:param i_radius: The raw VdW radius of the element, in grid points
-		:param l_i_radius_range: The list of points in the radius range
-		:return: A spherical array of relative coordinates
+		Copies a grid, by slabs along the x axis, in the grid backend of the system
+		:param a_grid: The grid to copy
+		:return: The copy of the grid
 		"""
 
-		# Preparing variables
-		s_grid_geometry = d_parameters["s_grid_geometry"].upper()		# Converts to uppercase the grid geometry
-		a_sphere = None													# Array of points coordinates for each grid point in the VdW range
-		l_s_logs = []													# Creates an empty list for logs
-
-		# If the grid geometry is a taxicab
-		if s_grid_geometry == "TAXICAB":
-			a_sphere = np.array(		# The taxicab sphere formula
-				[
-					(x, y, z) for x in l_i_radius_range for y in l_i_radius_range for z in l_i_radius_range
-					if abs(x) + abs(y) + abs(z) <= i_radius
-				]
-			).astype(np.int32)
-
-		# If the grid geometry is uniform
-		elif s_grid_geometry == "UNIFORM":
-			a_sphere = np.array(		# The uniform sphere formula
-				[
-					(x, y, z) for x in l_i_radius_range for y in l_i_radius_range for z in l_i_radius_range
-				]
-			).astype(np.int32)
-
-		# If the grid geometry is a classic sphere
-		elif s_grid_geometry == "SPHERE":
-			a_sphere = np.array(		# The classic sphere formula
-				[
-					(x, y, z) for x in l_i_radius_range for y in l_i_radius_range for z in l_i_radius_range
-					if x ** 2 + y ** 2 + z ** 2 <= i_radius ** 2
-				]
-			).astype(np.int32)
-
-		# If the geometry is unknown
-		else:
-			l_s_logs.append("ERROR : Unknown sphere geometry '{}', known geometries are 'taxicab', 'uniform' and 'sphere'.".format(s_grid_geometry))		# Defines the error message
-			terminate_program_process(		# Stops the program
-				l_s_content=l_s_logs		# Content to save in the logs
-			)
-		# End if
-		return a_sphere.T		# Returns the spherical array of points
+		return self.allocate_grid(		# Allocates the copy of the grid
+			o_dtype=a_grid.dtype,		# The type of the grid points
+			a_source=a_grid				# The grid to copy
+		)
 	# End method ---------------------------------------- #
 
 
@@ -37,10 +37,16 @@ def init():
 
     global D_ELEMENT_NUMBER  # Dictionary of atomic number associated to the atom type
     global D_NUMBER_ELEMENT  # Dictionary of atom type associated to the atomic number
+    global D_ELEMENT_REGISTRY  # Dictionary of the element properties arrays indexed by atomic number
 
     global D_WATER_POSITION  # Dictionary of positions of the water
     global D_WATER_SCORING   # Dictionary of the association grid position - score
     global D_PDB_SCORING     # Dictionary of the association pdb position - score
+
+    global D_OPEN_ARCHIVES  # Dictionary of the input archives opened by the current process
+    global D_CUSTOM_TYPES   # Dictionary of the custom types associated to the residue name, atom name and element symbol
+    global D_ATOM_CATEGORIES  # Dictionary of the text values shared by the atom tables of the current process
+    global D_SPHERE_STENCILS  # Dictionary of the sphere points built by the current process for each geometry and radius
     # END STEP 0 ---------------------------------------- #
 
     # STEP 1 : Initializing variables ------------------- #
@@ -55,6 +61,12 @@ def init():
     D_WATER_SCORING = {}
     D_PDB_SCORING = {}
 
+    D_ELEMENT_REGISTRY = {}
+    D_OPEN_ARCHIVES = {}
+    D_CUSTOM_TYPES = {}
+    D_ATOM_CATEGORIES = {}
+    D_SPHERE_STENCILS = {}
+
     # Contains the parameter's name, it's key, it's type and it's default value
     D_EXPECTED_PARAMETERS_GLOBAL = {
 
@@ -62,6 +74,8 @@ def init():
         "path_to_logs": ["p_log", "path", "project.log"],  # Not shown in global_parameters.txt
         "cpu_allocated": ["i_cpu_allocated", "int", "None"],
         "memory_allocated": ["f_memory_allocated", "float", "4.0"],
+        "path_to_structure_cache": ["p_structure_cache", "path", "cache/structures/"],
+        "path_to_grid_cache": ["p_grid_cache", "path", "cache/grids/"],
 
         # Features requested
         "run_comparison": ["b_run_comparison", "bool", "True"],
@@ -91,6 +105,11 @@ def init():
         "consider_elements": ["b_consider_elements", "bool", "True"],
         "comparison_normalisation": ["s_comparison_normalisation", "str", "Max"],
         "grid_geometry": ["s_grid_geometry", "str", "Sphere"],
+        "grid_storage": ["s_grid_storage", "str", "Dense"],
+        "rasterization": ["s_rasterization", "str", "Stencil"],
+        "block_points": ["i_block_points", "int", "8"],
+        "labeling": ["s_labeling", "str", "Order"],
+        "occupancy": ["s_occupancy", "str", "Binary"],
 
         # Tree generation
         "tree_name": ["s_tree_name", "str", "None"],
@@ -106,6 +125,7 @@ def init():
         "discard_hydrogen": ["b_discard_hydrogen", "bool", "False"],
         "discard_water": ["b_discard_water", "bool", "False"],
         "discard_alternative": ["b_discard_alternative", "bool", "False"],
+        "split_models": ["b_split_models", "bool", "False"],
         "chain_white_list": ["l_c_chain_white", "list_char", ""],
         "chain_black_list": ["l_c_chain_black", "list_char", ""],
         "residue_white_list": ["l_s_residue_white", "list_str", ""],
@@ -126,6 +146,9 @@ def init():
         # Solubilization parameters
         "distance_between_points": ["f_grid_spacing", "float", "0.1"],
         "grid_geometry": ["s_grid_geometry", "str", "Sphere"],
+        "grid_backend": ["s_grid_backend", "str", "Memory"],
+        "path_to_scratch_directory": ["p_scratch_directory", "path", "cache/scratch/"],
+        "labeling": ["s_labeling", "str", "Order"],
         "use_randomax": ["b_use_randomax", "bool", "False"],
         "launch_number": ["i_launch_number", "int", "1"],
         "occurrences_threshold": ["f_occu_threshold", "float", "O.5"],
@@ -151,6 +174,7 @@ def init():
         "discard_hydrogen": ["b_discard_hydrogen", "bool", "False"],
         "discard_water": ["b_discard_water", "bool", "False"],
         "discard_alternative": ["b_discard_alternative", "bool", "False"],
+        "split_models": ["b_split_models", "bool", "False"],
         "chain_white_list": ["l_c_chain_white", "list_char", ""],
         "chain_black_list": ["l_c_chain_black", "list_char", ""],
         "residue_white_list": ["l_s_residue_white", "list_str", ""],
@@ -0,0 +1,92 @@
+# Information ---------------------------------------------------------------- #
+# Author :	Julien Lenoir
+# Github :	Blackounet
+# Created : March 2021
+# Updated :
+# ---------------------------------------------------------------------------- #
+
+
+
+# Importations --------------------------------------------------------------- #
+
+# Universal modules
+import os
+	# Allows the creation of directories
+import tempfile
+	# Allows the creation of temporary files
+import numpy as np
+	# Allows Numpy array manipulation
+
+# ---------------------------------------------------------------------------- #
+
+
+
+# Main function -------------------------------------------------------------- #
+
+def allocate_grid(t_grid_shape, o_dtype, p_scratch_directory=None, i_chunk_points=4194304, a_source=None):
+	"""
+	Allocates an empty grid, in memory or in a file of a scratch directory mapped into memory
+		The file has no name and is deleted by the system when the grid is freed, the system only keeps in memory the
+		parts of the grid recently read or written
+		A source grid can be copied into the new grid, by slabs along the x axis, without loading it entirely in memory
+	:param t_grid_shape: The shape of the grid
+	:param o_dtype: The type of the grid points
+	:param p_scratch_directory: Directory of the grid file, created if it is missing, None to allocate the grid in memory
+	:param i_chunk_points: Maximal number of points copied at once
+	:param a_source: The grid to copy into the new grid, None to leave the grid empty
+	:return: The grid, filled with zeros or with a copy of the source
+	"""
+
+	# STEP 0 : Allocating the grid ---------------------- #
+	# If the grid is kept in memory
+	if p_scratch_directory is None:
+		a_grid = np.zeros(t_grid_shape, dtype=o_dtype)		# Allocates the grid
+
+	# If the grid is stored in a file
+	else:
+		os.makedirs(p_scratch_directory, exist_ok=True)				# Creates the scratch directory if it is missing
+		a_grid = np.memmap(											# Maps the file into memory, the new file is filled with zeros
+			tempfile.TemporaryFile(dir=p_scratch_directory),		# Temporary file, already deleted from the directory
+			dtype=o_dtype,
+			mode="w+",
+			shape=t_grid_shape
+		)
+	# END STEP 0 ---------------------------------------- #
+
+
+	# STEP 1 : Copying the source grid ------------------ #
+	# If the grid is a copy
+	if a_source is not None:
+		i_chunk_rows = max(i_chunk_points // max(int(np.prod(t_grid_shape[1:])), 1), 1)		# Slabs of the x axis copied at once
+
+		# For each slab of the grid
+		for i_start in range(0, t_grid_shape[0], i_chunk_rows):
+			a_grid[i_start:i_start + i_chunk_rows] = a_source[i_start:i_start + i_chunk_rows]		# Copies the slab
+	# END STEP 1 ---------------------------------------- #
+
+
+	# STEP 2 : Returning the grid ----------------------- #
+	return a_grid		# Returns the new grid
+	# END STEP 2 ---------------------------------------- #
+
+# ---------------------------------------------------------------------------- #
+
+
+
+# Reference ------------------------------------------------------------------ #
+
+# Importation
+# from allocate_grid import allocate_grid
+	# Allocates an empty grid or a copy of a grid, in memory or in a temporary file of a scratch directory
+	# In : (t) grid shape, (o) type of the points, (p) scratch directory or None, (i) maximal number of points at once,
+	# In : (a) grid to copy or None
+	# Out : (a) the new grid
+
+# Usage
+# a_grid = allocate_grid(									# Allocates the grid of the structure
+# 	t_grid_shape=tuple(self.a_grid_size),					# The shape of the grid
+# 	o_dtype=o_dtype,										# The type of the grid points
+# 	p_scratch_directory=self.p_scratch_directory			# Directory of the grid file, None to keep it in memory
+# )
+
+# ---------------------------------------------------------------------------- #
@@ -0,0 +1,117 @@
+# Information ---------------------------------------------------------------- #
+# Author :	Julien Lenoir
+# Github :	Blackounet
+# Created : March 2021
+# Updated :
+# ---------------------------------------------------------------------------- #
+
+
+
+# Importations --------------------------------------------------------------- #
+
+# Universal modules
+import numpy as np
+	# Allows Numpy array manipulation
+
+# Parameters
+from config import global_parameters as gp
+	# Contains the global variables
+
+# General library
+from lib.terminate_program_process import terminate_program_process
+	# Stops the program and prints content
+	# In : (l(s)) content to prompt
+	# Out : None
+
+# ---------------------------------------------------------------------------- #
+
+
+
+# Main function -------------------------------------------------------------- #
+
+def build_sphere_stencil(s_geometry, i_radius):
+	"""
+	Defines the relative coordinates of the points of a sphere for a specific geometry
+		The stencils are built once by process and saved in the global parameters, they cannot be modified
+		The scoring metrics are accepted as the geometries they correspond to
+	:param s_geometry: The sphere geometry, 'taxicab', 'uniform' or 'sphere'
+	:param i_radius: The radius of the sphere, in grid points
+	:return: A spherical array of relative coordinates, one row per axis
+	"""
+
+	# STEP 0 : Preparing variables ---------------------- #
+	l_s_logs = []		# Creates an empty list for logs
+	d_geometries = {	# Name of the geometry corresponding to each accepted name
+		"TAXICAB": "TAXICAB",
+		"MANHATTAN": "TAXICAB",
+		"UNIFORM": "UNIFORM",
+		"MINKOWSKI": "UNIFORM",
+		"SPHERE": "SPHERE",
+		"EUCLIDEAN": "SPHERE"
+	}
+	# END STEP 0 ---------------------------------------- #
+
+
+	# STEP 1 : Security check --------------------------- #
+	# If the geometry is unknown
+	if s_geometry.upper() not in d_geometries:
+		l_s_logs.append("ERROR : Unknown sphere geometry '{}', known geometries are 'taxicab', 'uniform' and 'sphere'.".format(s_geometry.upper()))		# Defines the error message
+		terminate_program_process(		# Stops the program
+			l_s_content=l_s_logs		# Content to save in the logs
+		)
+
+	t_key = (d_geometries[s_geometry.upper()], int(i_radius))		# Key of the stencil
+
+	# If the stencil has already been built
+	if t_key in gp.D_SPHERE_STENCILS:
+		return gp.D_SPHERE_STENCILS[t_key]		# Returns the saved stencil
+	# END STEP 1 ---------------------------------------- #
+
+
+	# STEP 2 : Building the stencil --------------------- #
+	a_range = np.arange(-t_key[1], t_key[1] + 1)								# Distances included in the radius range
+	a_x, a_y, a_z = np.meshgrid(a_range, a_range, a_range, indexing="ij")		# Every point of the cube around the center
+
+	# If the grid geometry is a taxicab
+	if t_key[0] == "TAXICAB":
+		a_inside = np.abs(a_x) + np.abs(a_y) + np.abs(a_z) <= t_key[1]		# The taxicab sphere formula
+
+	# If the grid geometry is uniform
+	elif t_key[0] == "UNIFORM":
+		a_inside = np.ones(a_x.shape, dtype=bool)		# The uniform sphere formula
+
+	# If the grid geometry is a classic sphere
+	else:
+		a_inside = a_x ** 2 + a_y ** 2 + a_z ** 2 <= t_key[1] ** 2		# The classic sphere formula
+	# End if
+
+	a_sphere = np.array((a_x[a_inside], a_y[a_inside], a_z[a_inside])).astype(np.int32)		# Relative coordinates of the points
+	# END STEP 2 ---------------------------------------- #
+
+
+	# STEP 3 : Saving the stencil ----------------------- #
+	a_sphere.setflags(write=False)				# The shared stencil cannot be modified
+	gp.D_SPHERE_STENCILS[t_key] = a_sphere		# Saves the stencil
+
+	return a_sphere		# Returns the spherical array of points
+	# END STEP 3 ---------------------------------------- #
+
+# ---------------------------------------------------------------------------- #
+
+
+
+# Reference ------------------------------------------------------------------ #
+
+# Importation
+# from build_sphere_stencil import build_sphere_stencil
+	# Defines the relative coordinates of the points of a sphere, built once by process
+	# In : (s) sphere geometry, (i) radius in grid points
+	# Out : (a) the relative coordinates, one row per axis
+
+# Usage
+# a_sphere = build_sphere_stencil(						# Retrieves the points of the sphere
+# 	s_geometry=d_parameters["s_grid_geometry"],		# The sphere geometry
+# 	i_radius=i_radius								# The radius of the sphere, in grid points
+# )
+
+# ---------------------------------------------------------------------------- #
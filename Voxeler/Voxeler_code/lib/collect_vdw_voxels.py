@@ -0,0 +1,170 @@
+# Information ---------------------------------------------------------------- #
+# Author :	Julien Lenoir
+# Github :	Blackounet
+# Created : March 2021
+# Updated :
+# ---------------------------------------------------------------------------- #
+
+
+
+# Importations --------------------------------------------------------------- #
+
+# Universal modules
+import numpy as np
+	# Allows Numpy array manipulation
+
+# General library
+from lib.stamp_vdw_spheres import stamp_vdw_spheres
+	# Fills the sphere of each atom of an element in the grids, by chunks of atoms
+	# In : (l(a)) grids to fill, (a) atoms grid coordinates, (a) sphere relative coordinates,
+	# In : (l(a/i)) values of the atoms or None to spread the center values, (i) maximal number of points at once,
+	# In : (a) marks of the grid points or None
+	# Out : None
+
+# ---------------------------------------------------------------------------- #
+
+
+
+# Main function -------------------------------------------------------------- #
+
+def collect_vdw_voxels(t_grid_shape, l_t_groups, f_update=None, i_slab_points=67108864):
+	"""
+	Lists the runs of grid points covered by the sphere of each atom, with the value of the last group covering them
+		The grid is filled by slabs along the x axis, each slab is stamped as a dense grid then only its runs of points
+		of the same value along the z axis are kept, the memory used depends on the size of a slab and on the number
+		of runs
+		Each slab is widened by twice the largest sphere, so the atoms of the next slabs are stamped in their order
+	:param t_grid_shape: The shape of the grid, the spheres of the atoms must be within the grid
+	:param l_t_groups: List of the groups of atoms, in order, each one is the grid coordinates of its atoms, one row
+	per atom, the relative coordinates of its sphere points, one row per axis, and the value of the group
+	:param f_update: Function changing in place the values of the planes of a slab once the groups are stamped, given
+	with the index of its first plane, None to keep the group values
+	:param i_slab_points: Number of points of a slab, without its widening
+	:return: The runs sorted by linear grid index of their first point, with their number of points and their value
+	"""
+
+	# STEP 0 : Preparing variables ---------------------- #
+	i_row_points = int(t_grid_shape[1]) * int(t_grid_shape[2])				# Number of points in a plane of the grid
+	l_a_centers = [np.asarray(t_group[0]).reshape(-1, 3).astype(np.int64) for t_group in l_t_groups]		# Coordinates of the atoms of each group
+	l_i_reach = [int(np.max(np.abs(t_group[1][0]), initial=0)) for t_group in l_t_groups]					# Extent of the sphere of each group along x
+	i_margin = 2 * max(l_i_reach + [0])																			# Points added on each side of a slab
+	i_slab_width = max(i_slab_points // max(i_row_points, 1), 2 * i_margin, 1)									# Number of planes in a slab
+	l_a_runs = [encode_voxel_runs(													# Runs of each slab, without any run to keep their type
+		a_grid=np.zeros((0,) + tuple(t_grid_shape[1:]), dtype=np.uint8),
+		t_grid_shape=t_grid_shape
+	)]
+	# END STEP 0 ---------------------------------------- #
+
+
+	# STEP 1 : Filling each slab ------------------------ #
+	# For each slab of the grid
+	for i_start in range(0, int(t_grid_shape[0]), i_slab_width):
+		i_end = min(i_start + i_slab_width, int(t_grid_shape[0]))		# Plane following the last plane of the slab
+		i_low = max(i_start - i_margin, 0)								# First plane of the widened slab
+		i_high = min(i_end + i_margin, int(t_grid_shape[0]))				# Plane following the last plane of the widened slab
+		a_slab = np.zeros((i_high - i_low, t_grid_shape[1], t_grid_shape[2]), dtype=np.uint8)		# The widened slab
+
+		# For each group of atoms, in order
+		for a_centers, i_reach, t_group in zip(l_a_centers, l_i_reach, l_t_groups):
+			a_reaching = a_centers[		# Atoms whose sphere reaches the slab
+				(a_centers[:, 0] >= i_start - i_reach) & (a_centers[:, 0] < i_end + i_reach)
+			]
+
+			# If no atom of the group reaches the slab
+			if len(a_reaching) == 0:
+				continue
+
+			stamp_vdw_spheres(										# Fills the sphere of each atom of the group
+				l_a_grids=[a_slab],									# The widened slab
+				a_centers=a_reaching - (i_low, 0, 0),				# Coordinates of the atoms in the widened slab
+				a_sphere=t_group[1],								# Relative coordinates of the sphere points
+				l_x_values=[t_group[2]]								# Value of the group
+			)
+		# End for
+
+		a_kept = a_slab[i_start - i_low:i_end - i_low]		# Planes of the slab itself, without copy
+
+		# If the points take other values
+		if f_update is not None:
+			f_update(a_kept, i_start)		# Updates the points of the slab
+
+		l_a_runs.append(encode_voxel_runs(				# Runs of the slab
+			a_grid=a_kept,								# Planes of the slab
+			t_grid_shape=t_grid_shape,					# The shape of the grid
+			i_first_index=i_start * i_row_points		# Linear grid index of the first point of the slab
+		))
+	# End for
+	# END STEP 1 ---------------------------------------- #
+
+
+	# STEP 2 : Returning the runs ----------------------- #
+	return np.concatenate(l_a_runs)		# Returns the sorted runs
+	# END STEP 2 ---------------------------------------- #
+
+# ---------------------------------------------------------------------------- #
+
+
+
+# Auxiliary functions -------------------------------------------------------- #
+
+def encode_voxel_runs(a_grid, t_grid_shape, i_first_index=0):
+	"""
+	Lists the runs of non empty points of the same value along the z axis of a part of a grid made of whole planes
+		A run never continues on the next row, the runs are sorted by linear grid index
+		The grid index is stored on 32 bits and the number of points on 16 bits when the grid allows it
+	:param a_grid: The planes of the grid, an array of values of the shape of the planes along the x axis
+	:param t_grid_shape: The shape of the whole grid
+	:param i_first_index: Linear grid index of the first point of the planes
+	:return: The runs, with the linear grid index of their first point, their number of points and their value
+	"""
+
+	# Preparing variables
+	i_row_length = int(t_grid_shape[2])		# Number of points in a row along the z axis
+	a_runs = np.zeros(0, dtype=np.dtype([	# Type of the runs
+		("grid_index", np.uint32 if int(np.prod(t_grid_shape, dtype=np.int64)) <= 2 ** 32 else np.int64),
+		("run_length", np.uint16 if i_row_length < 2 ** 16 else np.uint32),
+		("element_symbol", np.uint8)
+	]))
+
+	# If the planes are empty
+	if a_grid.size == 0:
+		return a_runs
+
+	a_changes = np.empty(a_grid.shape, dtype=bool)									# Points whose value differs from the previous point of the row
+	a_changes[:, :, 0] = a_grid[:, :, 0] != 0										# The rows start with a change when their first point is covered
+	np.not_equal(a_grid[:, :, 1:], a_grid[:, :, :-1], out=a_changes[:, :, 1:])
+	a_bounds = np.flatnonzero(a_changes)											# First point of the runs, and of the empty points following them
+	del a_changes
+
+	a_values = a_grid.reshape(-1)[a_bounds]																# Value of each run
+	a_ends = np.minimum(np.append(a_bounds[1:], a_grid.size), (a_bounds // i_row_length + 1) * i_row_length)		# Point following each run, within its row
+	a_kept = a_values != 0																				# Runs of non empty points
+
+	a_runs = np.zeros(np.count_nonzero(a_kept), dtype=a_runs.dtype)		# The runs of non empty points
+	a_runs["grid_index"] = a_bounds[a_kept] + i_first_index
+	a_runs["run_length"] = (a_ends - a_bounds)[a_kept]
+	a_runs["element_symbol"] = a_values[a_kept]
+
+	return a_runs		# Returns the runs
+# End function ------------------------------------------ #
+
+# ---------------------------------------------------------------------------- #
+
+
+
+# Reference ------------------------------------------------------------------ #
+
+# Importation
+# from collect_vdw_voxels import collect_vdw_voxels
+	# Lists the runs of grid points covered by the spheres of groups of atoms along the z axis, by slabs of the grid
+	# In : (t) grid shape, (l(t)) atoms grid coordinates, sphere relative coordinates and value of each group,
+	# In : (f) update of the points of a slab or None, (i) number of points of a slab
+	# Out : (a) sorted runs, with their first grid index, their number of points and their value
+
+# Usage
+# a_runs = collect_vdw_voxels(						# Lists the runs of points covered by the VdW sphere of each atom
+# 	t_grid_shape=tuple(o_structure.a_grid_size),		# The shape of the grid of the structure
+# 	l_t_groups=l_t_groups								# Atoms, sphere and value of each group
+# )
+
+# ---------------------------------------------------------------------------- #
@@ -17,6 +17,12 @@ import numpy as np
 from config import global_parameters as gp
 	# Contains the global variables
 
+# General library
+from lib.load_element_registry import load_element_registry, find_element_codes
+	# Loads the symbol, mass and VdW radius of each element code
+	# In : None
+	# Out : (d) the dictionary of the element properties arrays
+
 # ---------------------------------------------------------------------------- #
 
 
@@ -32,23 +38,20 @@ def convert_element_symbol(x_element):
 
 	# If the variable is an array
 	if isinstance(x_element, np.ndarray):
-		x_element = x_element.tolist()  # Converts the array into a list
 
 		# If the array contains strings
-		if isinstance(x_element[0], str):
-			x_converted = np.zeros(len(x_element)).astype(np.uint8)  # Creates an empty array of ints
+		if x_element.dtype.kind == "U":
+			x_converted = find_element_codes(a_symbols=x_element)		# Retrieves the atomic numbers
 
-			# For each strings in the array
-			for i_symbol in range(len(x_element)):
-				x_converted[i_symbol] = gp.D_ELEMENT_NUMBER[x_element[i_symbol]]  # Adds the atomic number
+			# If some symbols are unknown
+			if np.any(x_converted == -1):
+				raise KeyError(x_element[x_converted == -1][0])
 
-		# If the array contains ints
-		elif isinstance(x_element[0], int):
-			x_converted = np.zeros(len(x_element)).astype(np.str)  # Creates an empty array of strings
+			x_converted = x_converted.astype(np.uint8)		# Stores the atomic numbers as small ints
 
-			# For each strings in the array
-			for i_number in range(len(x_element)):
-				x_converted[i_number] = gp.D_NUMBER_ELEMENT[x_element[i_number]]  # Adds the element symbol
+		# If the array contains ints
+		else:
+			x_converted = load_element_registry()["a_s_symbols"][x_element]		# Retrieves the element symbols
 
 	# If the variable is a string
 	elif isinstance(x_element, str):
@@ -0,0 +1,78 @@
+# Information ---------------------------------------------------------------- #
+# Author :	Julien Lenoir
+# Github :	Blackounet
+# Created : March 2021
+# Updated :
+# ---------------------------------------------------------------------------- #
+
+
+
+# Importations --------------------------------------------------------------- #
+
+# Universal modules
+import numpy as np
+	# Allows Numpy array manipulation
+
+# ---------------------------------------------------------------------------- #
+
+
+
+# Main function -------------------------------------------------------------- #
+
+def count_set_bits(a_first_bits, a_second_bits=None, i_chunk_words=1048576):
+	"""
+	Counts the bits set in a bit-packed grid, or the bits set in both of two bit-packed grids
+		The grids are read by 64 bits words, the bits of each word are counted with a table of the bits set in each byte
+		The grids can be arrays of words of any shape, such as a part of a grid, they are read by slices of the first axis
+	:param a_first_bits: The first bit-packed grid, its last dimension is a multiple of 8 bytes
+	:param a_second_bits: The second bit-packed grid of the same shape, None to count the bits of the first grid only
+	:param i_chunk_words: Maximal number of words read at once
+	:return: The number of bits set
+	"""
+
+	# STEP 0 : Preparing variables ---------------------- #
+	a_byte_counts = np.unpackbits(np.arange(256, dtype=np.uint8)[:, np.newaxis], axis=1).sum(axis=1).astype(np.uint8)		# Bits set in each byte value
+	a_first_words = a_first_bits.view(np.uint64)																		# Words of the first grid
+	a_second_words = a_second_bits.view(np.uint64) if a_second_bits is not None else None							# Words of the second grid
+	i_chunk_rows = max(i_chunk_words // max(int(np.prod(a_first_words.shape[1:])), 1), 1)							# Slices of the first axis read at once
+	i_count = 0																											# Number of bits set
+	# END STEP 0 ---------------------------------------- #
+
+
+	# STEP 1 : Counting the bits of each chunk ---------- #
+	# For each chunk of words
+	for i_start in range(0, len(a_first_words), i_chunk_rows):
+		a_words = a_first_words[i_start:i_start + i_chunk_rows]		# Words of the chunk
+
+		# If the bits need to be set in both grids
+		if a_second_words is not None:
+			a_words = np.bitwise_and(a_words, a_second_words[i_start:i_start + i_chunk_rows])		# Keeps the bits set in both grids
+
+		i_count += int(np.sum(a_byte_counts[np.ascontiguousarray(a_words).view(np.uint8)], dtype=np.int64))		# Counts the bits of each byte
+	# End for
+	# END STEP 1 ---------------------------------------- #
+
+
+	# STEP 2 : Returning the count ---------------------- #
+	return i_count		# Returns the number of bits set
+	# END STEP 2 ---------------------------------------- #
+
+# ---------------------------------------------------------------------------- #
+
+
+
+# Reference ------------------------------------------------------------------ #
+
+# Importation
+# from count_set_bits import count_set_bits
+	# Counts the bits set in a bit-packed grid, or in both of two bit-packed grids, by 64 bits words
+	# In : (a) first bit-packed grid, (a) second bit-packed grid or None, (i) maximal number of words at once
+	# Out : (i) the number of bits set
+
+# Usage
+# i_shared = count_set_bits(							# Counts the points set in both grids
+# 	a_first_bits=o_first_structure.a_bit_grid,		# The first bit-packed grid
+# 	a_second_bits=o_second_structure.a_bit_grid		# The second bit-packed grid
+# )
+
+# ---------------------------------------------------------------------------- #
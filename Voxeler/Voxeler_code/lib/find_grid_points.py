@@ -0,0 +1,70 @@
+# Information ---------------------------------------------------------------- #
+# Author :	Julien Lenoir
+# Github :	Blackounet
+# Created : March 2021
+# Updated :
+# ---------------------------------------------------------------------------- #
+
+
+
+# Importations --------------------------------------------------------------- #
+
+# Universal modules
+import numpy as np
+	# Allows Numpy array manipulation
+
+# ---------------------------------------------------------------------------- #
+
+
+
+# Main function -------------------------------------------------------------- #
+
+def find_grid_points(a_grid, f_condition, i_chunk_points=4194304):
+	"""
+	Finds the coordinates of the grid points fulfilling a condition, reading the grid by slabs along the x axis
+		Only one slab is read at once, so the grids stored in files are never loaded entirely in memory
+	:param a_grid: The grid to scan
+	:param f_condition: Function returning the mask of the points to find in a slab of the grid
+	:param i_chunk_points: Maximal number of points read at once
+	:return: The coordinates of the points, one row per axis, in the order of np.where
+	"""
+
+	# STEP 0 : Preparing variables ---------------------- #
+	i_chunk_rows = max(i_chunk_points // max(int(np.prod(a_grid.shape[1:])), 1), 1)		# Slabs of the x axis read at once
+	l_a_points = [np.empty((3, 0), dtype=np.int64)]											# Coordinates of the points of each slab
+	# END STEP 0 ---------------------------------------- #
+
+
+	# STEP 1 : Scanning each slab ----------------------- #
+	# For each slab of the grid
+	for i_start in range(0, a_grid.shape[0], i_chunk_rows):
+		a_points = np.array(np.nonzero(f_condition(a_grid[i_start:i_start + i_chunk_rows])), dtype=np.int64)		# Points of the slab
+		a_points[0] += i_start																						# Coordinates in the grid
+		l_a_points.append(a_points)
+	# End for
+	# END STEP 1 ---------------------------------------- #
+
+
+	# STEP 2 : Returning the points --------------------- #
+	return np.concatenate(l_a_points, axis=1)		# Returns the coordinates of the points
+	# END STEP 2 ---------------------------------------- #
+
+# ---------------------------------------------------------------------------- #
+
+
+
+# Reference ------------------------------------------------------------------ #
+
+# Importation
+# from find_grid_points import find_grid_points
+	# Finds the coordinates of the grid points fulfilling a condition, by slabs along the x axis
+	# In : (a) grid to scan, (f) condition on a slab of the grid, (i) maximal number of points at once
+	# Out : (a) coordinates of the points, one row per axis
+
+# Usage
+# a_water_positions = find_grid_points(								# Retrieves the positions of potential water molecules
+# 	a_grid=o_structure.a_grid,										# The grid to scan
+# 	f_condition=lambda a_slab: a_slab["element_symbol"] == i_water_code		# The points containing water
+# )
+
+# ---------------------------------------------------------------------------- #
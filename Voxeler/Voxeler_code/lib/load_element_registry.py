@@ -0,0 +1,120 @@
+# Information ---------------------------------------------------------------- #
+# Author :	Julien Lenoir
+# Github :	Blackounet
+# Created : March 2021
+# Updated :
+# ---------------------------------------------------------------------------- #
+
+
+
+# Importations --------------------------------------------------------------- #
+
+# Universal modules
+import numpy as np
+	# Allows Numpy array manipulation
+
+# Parameters
+from config import global_parameters as gp
+	# Contains the global variables
+
+# Program external resources
+from resources import elements
+	# Contains chemical elements properties
+
+# ---------------------------------------------------------------------------- #
+
+
+
+# Main function -------------------------------------------------------------- #
+
+def load_element_registry():
+	"""
+	Loads the properties of the chemical elements as arrays indexed by the element code
+		The registry is built once by process and saved in the global parameters
+	:return: The dictionary of the element properties arrays
+	"""
+
+	# STEP 0 : Checking the saved registry -------------- #
+	# If the registry has already been built
+	if len(gp.D_ELEMENT_REGISTRY) > 0:
+		return gp.D_ELEMENT_REGISTRY		# Returns the saved registry
+	# END STEP 0 ---------------------------------------- #
+
+
+	# STEP 1 : Preparing variables ---------------------- #
+	i_element_count = len(gp.D_NUMBER_ELEMENT)								# Number of element codes
+	a_s_symbols = np.array(													# Symbol of each element code
+		[gp.D_NUMBER_ELEMENT[i_code] for i_code in range(i_element_count)],
+		dtype=np.str_
+	)
+	a_f_masses = np.zeros(i_element_count, dtype=np.float64)				# Atomic mass of each element code
+	a_f_vdw_radius = np.zeros(i_element_count, dtype=np.float64)			# VdW radius of each element code
+	# END STEP 1 ---------------------------------------- #
+
+
+	# STEP 2 : Filling the properties ------------------- #
+	# For each known element within the list of chemical elements
+	for o_element in elements.ELEMENTS:
+
+		# If the element has a code
+		if o_element.symbol in gp.D_ELEMENT_NUMBER:
+			a_f_masses[gp.D_ELEMENT_NUMBER[o_element.symbol]] = o_element.mass				# Saves the mass of the element
+			a_f_vdw_radius[gp.D_ELEMENT_NUMBER[o_element.symbol]] = o_element.vdwrad		# Saves the VdW radius of the element
+	# End for
+	# END STEP 2 ---------------------------------------- #
+
+
+	# STEP 3 : Saving the registry ---------------------- #
+	a_i_sorted_codes = np.argsort(a_s_symbols)		# Element codes by alphabetical order of their symbols
+
+	gp.D_ELEMENT_REGISTRY.update({
+		"a_s_symbols": a_s_symbols,								# Symbol of each element code
+		"a_s_sorted_symbols": a_s_symbols[a_i_sorted_codes],	# Symbols sorted for the binary searches
+		"a_i_sorted_codes": a_i_sorted_codes,					# Element code of each sorted symbol
+		"a_f_masses": a_f_masses,								# Atomic mass of each element code
+		"a_f_vdw_radius": a_f_vdw_radius						# VdW radius of each element code
+	})
+
+	return gp.D_ELEMENT_REGISTRY		# Returns the registry
+	# END STEP 3 ---------------------------------------- #
+
+# ---------------------------------------------------------------------------- #
+
+
+
+# Auxiliary functions -------------------------------------------------------- #
+
+def find_element_codes(a_symbols):
+	"""
+	Finds the code of each element symbol with a binary search in the registry
+	:param a_symbols: Array of element symbols
+	:return: The array of element codes, -1 for the unknown symbols
+	"""
+
+	d_registry = load_element_registry()		# Loads the element registry
+
+	a_positions = np.searchsorted(d_registry["a_s_sorted_symbols"], a_symbols)		# Position of each symbol among the sorted symbols
+	a_positions[a_positions == len(d_registry["a_s_sorted_symbols"])] = 0			# Keeps the positions within the array
+	a_codes = d_registry["a_i_sorted_codes"][a_positions].astype(np.int16)			# Code of each symbol
+
+	a_codes[d_registry["a_s_sorted_symbols"][a_positions] != a_symbols] = -1		# Marks the unknown symbols
+
+	return a_codes		# Returns the element codes
+# End function ------------------------------------------ #
+
+# ---------------------------------------------------------------------------- #
+
+
+
+# Reference ------------------------------------------------------------------ #
+
+# Importation
+# from load_element_registry import load_element_registry
+	# Loads the symbol, mass and VdW radius of each element code
+	# In : None
+	# Out : (d) the dictionary of the element properties arrays
+
+# Usage
+# d_registry = load_element_registry()		# Loads the element registry
+
+# ---------------------------------------------------------------------------- #
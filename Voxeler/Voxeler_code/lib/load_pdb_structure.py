@@ -0,0 +1,256 @@
+# Information ---------------------------------------------------------------- #
+# Author :	Julien Lenoir
+# Github :	Blackounet
+# Created : March 2021
+# Updated :
+# ---------------------------------------------------------------------------- #
+
+
+
+# Importations --------------------------------------------------------------- #
+
+# Universal modules
+import numpy as np
+	# Allows Numpy array manipulation
+import os
+	# Allows file system operations
+import pickle
+	# Serializes python objects
+import hashlib
+	# Computes the hash of a content
+
+# Classes
+from cla.atom_table import AtomTable
+	# Compact table of atom properties
+from cla.pdb_structure import PdbStructure
+	# PDB structure and associated grid
+
+# Parameters
+from config import global_parameters as gp
+	# Contains the global variables
+
+# General library
+from lib.read_file_bytes import read_file_bytes
+	# Extracts the raw content of a file
+	# In : (p) file's path
+	# Out : (x) the file's bytes
+from lib.parse_pdb_file import parse_pdb_file
+	# Extracts a PDB structure from a file and applies filters
+	# In : (p) PDB file to extract, (d) parsing filters to apply, (x) the file's bytes
+	# Out : (o) the object containing the structure
+from lib.parse_cif_file import parse_cif_file
+	# Extracts a structure from a mmCIF file and applies filters
+	# In : (p) mmCIF file to extract, (d) parsing filters to apply, (x) the file's bytes
+	# Out : (o) the object containing the structure
+from lib.write_file_content import write_file_content
+	# Writes content to a file
+	# In : (p) file's path, (s) writing mode, (l(s)) content to write
+	# Out : None
+
+# ---------------------------------------------------------------------------- #
+
+
+
+# Main function -------------------------------------------------------------- #
+
+def load_pdb_structure(p_file, d_filters, p_cache=None, x_content=None, s_name=None):
+	"""
+	Extracts a PDB structure from the cache of parsed structures, or parses the file and caches the result
+		Files with a '.cif' extension, compressed or not, are parsed as mmCIF files
+	:param p_file: Path to the PDB file to extract
+	:param d_filters: Dictionary of parsing filters to apply
+	:param p_cache: Path to the directory of cached structures, None disables the cache
+	:param x_content: The raw content of the structure, read from the path if not given
+	:param s_name: Name of the structure, extracted from the path if not given
+	:return: The PDB structure extracted and saved in an object
+	"""
+
+	# STEP 0 : Preparing variables ---------------------- #
+	s_cache_version = "4"		# Version of the cache format, changing it invalidates the previous entries
+	o_structure = None			# The structure to return
+	# END STEP 0 ---------------------------------------- #
+
+
+	# STEP 1 : Computing the cache key ------------------ #
+	# If the content of the structure has not already been read
+	if x_content is None:
+		x_content = read_file_bytes(		# Retrieves the raw content of the file
+			p_file=p_file					# Path to the file to extract
+		)
+
+	o_hash = hashlib.sha256()											# Creates the hash of the structure
+	o_hash.update(x_content)											# Hashes the content of the file
+	o_hash.update(repr(sorted(d_filters.items())).encode())				# Hashes the parsing filters
+	o_hash.update(s_cache_version.encode())								# Hashes the cache version
+	s_hash = o_hash.hexdigest()											# The key of the structure in the cache
+	# END STEP 1 ---------------------------------------- #
+
+
+	# STEP 2 : Loading the cached structure ------------- #
+	# If the cache is enabled
+	if p_cache is not None and p_cache != "":
+		o_structure = read_cached_structure(		# Tries to load the structure from the cache
+			p_cache=p_cache,						# Path to the cache directory
+			s_hash=s_hash							# Key of the structure in the cache
+		)
+	# END STEP 2 ---------------------------------------- #
+
+
+	# STEP 3 : Parsing the structure -------------------- #
+	# If the structure is not in the cache
+	if o_structure is None:
+
+		# If the file is a mmCIF file
+		if p_file.split("::")[-1].replace(".gz", "").endswith(".cif"):
+			o_structure = parse_cif_file(		# Extracts a structure into an object
+				p_file=p_file,					# The mmCIF file to extract
+				d_filters=d_filters,			# The parsing filters to apply
+				x_content=x_content				# The content already read
+			)
+
+		# If the file is a PDB file
+		else:
+			o_structure = parse_pdb_file(		# Extracts a PDB structure into an object
+				p_file=p_file,					# The PDB file to extract
+				d_filters=d_filters,			# The parsing filters to apply
+				x_content=x_content				# The content already read
+			)
+
+		o_structure.s_hash = s_hash			# Saves the key of the structure
+
+		# If the cache is enabled
+		if p_cache is not None and p_cache != "":
+			write_cached_structure(			# Saves the structure in the cache
+				p_cache=p_cache,			# Path to the cache directory
+				o_structure=o_structure		# The structure to save
+			)
+	# End if
+	# END STEP 3 ---------------------------------------- #
+
+
+	# STEP 4 : Returning the structure ------------------ #
+	# If the name of the structure is not given
+	if s_name is None:
+		s_name = p_file.split("::")[-1].split('/')[-1].split('.')[0]		# Extracts the name of the structure
+
+	o_structure.s_name = s_name		# The name depends on the path, not on the content
+	return o_structure				# Returns the extracted structure
+	# END STEP 4 ---------------------------------------- #
+
+# ---------------------------------------------------------------------------- #
+
+
+
+# Auxiliary functions -------------------------------------------------------- #
+
+def read_cached_structure(p_cache, s_hash):
+	"""
+	Loads a structure from the cache, the atoms are memory-mapped
+	:param p_cache: Path to the cache directory
+	:param s_hash: Key of the structure in the cache
+	:return: The cached structure, None if it is not cached or cannot be read
+	"""
+
+	p_atoms = os.path.join(p_cache, s_hash + ".npy")		# Path to the array of atoms
+	p_fields = os.path.join(p_cache, s_hash + ".pkl")		# Path to the other fields of the structure
+
+	# If the structure is not cached
+	if not os.path.exists(p_atoms) or not os.path.exists(p_fields):
+		return None
+
+	# Tries to read the cached structure
+	try:
+		f_input = open(p_fields, "rb")		# Opens the file
+		d_fields = pickle.load(f_input)		# Loads the fields of the structure
+		f_input.close()						# Closes the input file
+
+		a_columns = np.load(p_atoms, mmap_mode="c")		# Maps the atoms, modifications are not written to the cache
+
+	# If the cached files are damaged
+	except (OSError, EOFError, ValueError, pickle.UnpicklingError):
+		return None
+	# End try
+
+	o_atoms = AtomTable()								# Creates a table of atoms
+	o_atoms.restore_table(								# Loads the cached columns into the table
+		o_dtype=d_fields.pop("o_atom_dtype"),			# Structured type of an atom
+		a_columns=a_columns,							# Array of the stored fields
+		d_categories=d_fields.pop("d_atom_categories")	# Values of the fields stored as codes
+	)
+
+	o_structure = PdbStructure()			# Creates a PDB structure object
+	o_structure.restore_structure(			# Loads the cached fields into the object
+		a_atoms=o_atoms,					# Table of atoms properties
+		**d_fields							# The other fields of the structure
+	)
+
+	return o_structure		# Returns the cached structure
+# End function ------------------------------------------ #
+
+
+def write_cached_structure(p_cache, o_structure):
+	"""
+	Saves a structure in the cache, the cache directory is created if it is missing, failures are logged without
+	stopping the program
+	:param p_cache: Path to the cache directory
+	:param o_structure: The structure to save
+	"""
+
+	p_atoms = os.path.join(p_cache, o_structure.s_hash + ".npy")		# Path to the array of atoms
+	p_fields = os.path.join(p_cache, o_structure.s_hash + ".pkl")		# Path to the other fields of the structure
+	s_suffix = ".{}.tmp".format(os.getpid())							# Suffix of the files being written
+	d_fields = {														# The fields required to restore the structure
+		"s_hash": o_structure.s_hash,
+		"x_leading_data": o_structure.x_leading_data,
+		"x_trailing_data": o_structure.x_trailing_data,
+		"l_l_elements": o_structure.l_l_elements,
+		"f_mass": o_structure.f_mass,
+		"o_atom_dtype": o_structure.a_atoms.dtype,
+		"d_atom_categories": o_structure.a_atoms.d_categories,
+	}
+
+	# Tries to write the structure
+	try:
+		os.makedirs(p_cache, exist_ok=True)				# Creates the cache directory if it is missing
+
+		f_output = open(p_atoms + s_suffix, "wb")		# Opens the file
+		np.save(f_output, o_structure.a_atoms.a_columns)	# Writes the stored columns of the atoms
+		f_output.close()								# Closes the output file
+
+		f_output = open(p_fields + s_suffix, "wb")		# Opens the file
+		pickle.dump(d_fields, f_output)					# Writes the other fields
+		f_output.close()								# Closes the output file
+
+		os.replace(p_atoms + s_suffix, p_atoms)			# Publishes the array of atoms
+		os.replace(p_fields + s_suffix, p_fields)		# Publishes the other fields, the entry is now complete
+
+	# If the cache cannot be written
+	except OSError:
+		write_file_content(		# Writes the warning to the logs
+			p_file=gp.D_PARAMETERS_GLOBAL["p_log"],
+			s_writing_mode='a',
+			l_s_content=["WARNING : The structure '{}' cannot be saved in the cache '{}'".format(o_structure.s_name, p_cache)]
+		)
+	# End try
+# End function ------------------------------------------ #
+
+# ---------------------------------------------------------------------------- #
+
+
+
+# Reference ------------------------------------------------------------------ #
+
+# Importation
+# from load_pdb_structure import load_pdb_structure
+	# Extracts a PDB structure from the cache or from the file, and applies filters
+	# In : (p) PDB file to extract, (d) parsing filters to apply, (p) cache directory
+	# Out : (o) the object containing the structure
+
+# Usage
+# load_pdb_structure(		# Extracts a PDB structure into an object
+# 	p_file=p_file,			# The PDB file to extract
+# 	d_filters=d_filters,	# The parsing filters to apply
+# 	p_cache=p_cache			# Directory of the cached structures
+# )
+
+# ---------------------------------------------------------------------------- #
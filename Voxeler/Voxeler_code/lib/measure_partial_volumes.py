@@ -0,0 +1,147 @@
+# Information ---------------------------------------------------------------- #
+# Author :	Julien Lenoir
+# Github :	Blackounet
+# Created : March 2021
+# Updated :
+# ---------------------------------------------------------------------------- #
+
+
+
+# Importations --------------------------------------------------------------- #
+
+# Universal modules
+import numpy as np
+	# Allows Numpy array manipulation
+
+# ---------------------------------------------------------------------------- #
+
+
+
+# Main function -------------------------------------------------------------- #
+
+def measure_partial_volumes(t_grid_shape, a_centers, a_radius, s_geometry, i_chunk_pairs=65536):
+	"""
+	Measures the part of each grid point covered by the VdW volumes, as the number of its 64 sub-points covered
+		Each point is the cube of side 1 around it, divided into 4 x 4 x 4 sub-points, the covered sub-points of a point
+		are kept as the bits of a 64 bits word so the atoms covering the same sub-points are counted once
+		The atoms keep their exact position and radius, only the points crossed by a surface test their sub-points
+	:param t_grid_shape: The shape of the grid
+	:param a_centers: Array of the exact grid coordinates of each atom, one row per atom
+	:param a_radius: Array of the exact VdW radius of each atom, in grid points
+	:param s_geometry: The sphere geometry, 'taxicab', 'uniform' or 'sphere'
+	:param i_chunk_pairs: Maximal number of pairs of atom and point measured at once
+	:return: The grid of the number of sub-points covered in each point, from 0 to 64
+	"""
+
+	# STEP 0 : Preparing variables ---------------------- #
+	a_centers = np.asarray(a_centers, dtype=np.float64).reshape(-1, 3)		# Coordinates of the atoms
+	a_radius = np.asarray(a_radius, dtype=np.float64).reshape(-1)			# Radius of the atoms
+	a_words = np.zeros(int(np.prod(t_grid_shape)), dtype=np.uint64)			# Covered sub-points of each point
+	a_sub_points = (np.indices((4, 4, 4)).reshape(3, -1).T + 0.5) / 4 - 0.5		# Offsets of the sub-points from their point
+	a_sub_bits = np.left_shift(np.uint64(1), np.arange(64, dtype=np.uint64))		# Bit of each sub-point
+	f_half_diagonal = measure_distances(np.full((1, 3), 0.375), s_geometry)[0]	# Distance from a point to its farthest sub-point
+	i_reach = int(np.ceil(np.max(a_radius) + f_half_diagonal)) if len(a_radius) > 0 else 0		# Points reached around an atom
+	a_offsets = np.indices((2 * i_reach + 1,) * 3).reshape(3, -1).T - i_reach		# Offsets of the points around an atom
+	i_chunk_atoms = max(i_chunk_pairs // len(a_offsets), 1)						# Number of atoms measured at once
+	# END STEP 0 ---------------------------------------- #
+
+
+	# STEP 1 : Covering each chunk of atoms ------------- #
+	# For each chunk of atoms
+	for i_start in range(0, len(a_centers), i_chunk_atoms):
+		a_chunk = a_centers[i_start:i_start + i_chunk_atoms]			# Coordinates of the atoms of the chunk
+		a_chunk_radius = a_radius[i_start:i_start + i_chunk_atoms]		# Radius of the atoms of the chunk
+
+		a_points = (np.rint(a_chunk).astype(np.int64)[:, np.newaxis, :] + a_offsets).reshape(-1, 3)		# Points around each atom
+		a_atoms = np.repeat(np.arange(len(a_chunk)), len(a_offsets))										# Atom of each pair
+		a_inside = np.all((a_points >= 0) & (a_points < np.array(t_grid_shape)), axis=1)					# Pairs within the grid
+		a_points = a_points[a_inside]
+		a_atoms = a_atoms[a_inside]
+
+		a_distances = measure_distances(a_points - a_chunk[a_atoms], s_geometry)		# Distance from each atom to each point
+		a_reached = a_distances - f_half_diagonal <= a_chunk_radius[a_atoms]			# Points with at least one sub-point close enough
+		a_full = a_distances + f_half_diagonal <= a_chunk_radius[a_atoms]				# Points with every sub-point covered
+		a_crossed = a_reached & ~a_full													# Points crossed by the surface of the atom
+
+		a_pair_words = np.zeros(len(a_points), dtype=np.uint64)		# Covered sub-points of each pair
+		a_pair_words[a_full] = np.iinfo(np.uint64).max				# Every sub-point
+
+		# If some points are crossed by a surface
+		if np.any(a_crossed):
+			a_sub_distances = measure_distances(		# Distance from the atom to each sub-point of the crossed points
+				(a_points[a_crossed] - a_chunk[a_atoms[a_crossed]])[:, np.newaxis, :] + a_sub_points,
+				s_geometry
+			)
+			a_pair_words[a_crossed] = np.bitwise_or.reduce(		# Sets the bit of the covered sub-points
+				np.where(a_sub_distances <= a_chunk_radius[a_atoms[a_crossed], np.newaxis], a_sub_bits, np.uint64(0)),
+				axis=1
+			)
+
+		a_indexes = np.ravel_multi_index(tuple(a_points[a_reached].T), t_grid_shape)		# Grid index of the reached points
+		a_pair_words = a_pair_words[a_reached]
+		a_order = np.argsort(a_indexes, kind="stable")										# Groups the pairs by point
+		a_indexes = a_indexes[a_order]
+		a_starts = np.flatnonzero(np.append(True, a_indexes[1:] != a_indexes[:-1])) if len(a_indexes) > 0 \
+			else np.empty(0, dtype=np.int64)												# First pair of each point
+
+		# If some points are reached
+		if len(a_starts) > 0:
+			a_words[a_indexes[a_starts]] |= np.bitwise_or.reduceat(a_pair_words[a_order], a_starts)		# Merges the sub-points of each point
+	# End for
+	# END STEP 1 ---------------------------------------- #
+
+
+	# STEP 2 : Counting the covered sub-points ---------- #
+	a_byte_counts = np.unpackbits(np.arange(256, dtype=np.uint8)[:, np.newaxis], axis=1).sum(axis=1).astype(np.uint8)		# Bits set in each byte value
+	a_counts = a_byte_counts[a_words.view(np.uint8)].reshape(-1, 8).sum(axis=1, dtype=np.uint8)						# Sub-points covered in each point
+
+	return a_counts.reshape(t_grid_shape)		# Returns the number of sub-points covered in each point
+	# END STEP 2 ---------------------------------------- #
+
+# ---------------------------------------------------------------------------- #
+
+
+
+# Auxiliary functions -------------------------------------------------------- #
+
+def measure_distances(a_vectors, s_geometry):
+	"""
+	Measures the length of vectors in the grid geometry
+	:param a_vectors: Array of vectors, the last axis holds their coordinates
+	:param s_geometry: The sphere geometry, 'taxicab', 'uniform' or 'sphere'
+	:return: The length of each vector
+	"""
+
+	# If the grid geometry is a taxicab
+	if s_geometry.upper() in ("TAXICAB", "MANHATTAN"):
+		return np.sum(np.abs(a_vectors), axis=-1)		# Sum of the absolute differences
+
+	# If the grid geometry is uniform
+	if s_geometry.upper() in ("UNIFORM", "MINKOWSKI"):
+		return np.max(np.abs(a_vectors), axis=-1)		# Largest absolute difference
+
+	return np.sqrt(np.sum(a_vectors ** 2, axis=-1))		# Euclidean distance
+# End function ------------------------------------------ #
+
+# ---------------------------------------------------------------------------- #
+
+
+
+# Reference ------------------------------------------------------------------ #
+
+# Importation
+# from measure_partial_volumes import measure_partial_volumes
+	# Measures the part of each grid point covered by the VdW volumes, as the number of its 64 sub-points covered
+	# In : (t) grid shape, (a) exact atoms grid coordinates, (a) exact radius in grid points, (s) sphere geometry,
+	# In : (i) maximal number of pairs at once
+	# Out : (a) the number of sub-points covered in each point
+
+# Usage
+# o_structure.a_occupancy = measure_partial_volumes(		# Measures the covered part of each point
+# 	t_grid_shape=tuple(o_structure.a_grid_size),		# The shape of the grid of the structure
+# 	a_centers=a_centers,								# Exact coordinates of the atoms
+# 	a_radius=a_radius,									# Exact VdW radius of the atoms
+# 	s_geometry=d_parameters["s_grid_geometry"]			# The sphere geometry
+# )
+
+# ---------------------------------------------------------------------------- #
@@ -0,0 +1,166 @@
+# Information ---------------------------------------------------------------- #
+# Author :	Julien Lenoir
+# Github :	Blackounet
+# Created : March 2021
+# Updated :
+# ---------------------------------------------------------------------------- #
+
+
+
+# Importations --------------------------------------------------------------- #
+
+# Universal modules
+from os import path
+	# Interacting with OS paths
+import gzip
+	# Decompresses gzip files while reading them
+import tarfile
+	# Reads the members of tar archives
+import zipfile
+	# Reads the members of zip archives
+
+# Parameters
+from config import global_parameters as gp
+	# Contains the global variables
+
+# General library
+from lib.terminate_program_process import terminate_program_process
+	# Stops the program and prints content
+	# In : (l(s)) content to prompt
+	# Out : None
+
+# ---------------------------------------------------------------------------- #
+
+
+
+# Main function -------------------------------------------------------------- #
+
+def open_file_stream(p_file):
+	"""
+	Opens a file for a binary reading, gzip files are decompressed while being read
+		A member of an archive is designated by the path of the archive and the name of the member, separated by '::'
+		The archives are opened once by process and kept open for the reading of their other members
+	:param p_file: Path to the file to read
+	:return: The binary stream of the file
+	"""
+
+	# STEP 0 : Preparing variables ---------------------- #
+	l_s_logs = []							# A list for logs messages
+	l_p_parts = p_file.split("::", 1)		# Path to the file or to the archive, name of the member
+	# END STEP 0 ---------------------------------------- #
+
+
+	# STEP 1 : Security check --------------------------- #
+	# If the file does not exists
+	if not path.exists(l_p_parts[0]):
+		l_s_logs.append(		# Defines the error's message
+			"ERROR : The file '"
+			+ l_p_parts[0]
+			+ "' does not exist"
+		)
+		terminate_program_process(		# Stops the program
+			l_s_content=l_s_logs		# Content to save in the logs
+		)
+	# END STEP 1 ---------------------------------------- #
+
+
+	# STEP 2 : Opening the file ------------------------- #
+	# Tries to open the file
+	try:
+
+		# If the file is a member of an archive
+		if len(l_p_parts) == 2:
+			f_input = open_archive_member(		# Opens the member
+				p_archive=l_p_parts[0],			# Path to the archive
+				s_member=l_p_parts[1]			# Name of the member
+			)
+
+			# If the member is compressed
+			if p_file.endswith(".gz"):
+				f_input = gzip.GzipFile(fileobj=f_input, mode="rb")		# Decompresses the content while reading it
+
+		# If the file is compressed
+		elif p_file.endswith(".gz"):
+			f_input = gzip.open(p_file, "rb")		# Opens the file, decompresses the content while reading it
+
+		# If the file is a plain file
+		else:
+			f_input = open(p_file, "rb")		# Opens the file
+
+	# If the file cannot be read
+	except (OSError, KeyError, tarfile.TarError, zipfile.BadZipFile):
+		l_s_logs.append(		# Defines the error's message
+			"ERROR : Impossible to read the '"
+			+ p_file
+			+ "' file"
+		)
+		terminate_program_process(		# Stops the program
+			l_s_content=l_s_logs		# Content to save in the logs
+		)
+	# End try
+	# END STEP 2 ---------------------------------------- #
+
+
+	# STEP 3 : Returning the stream --------------------- #
+	return f_input		# Returns the binary stream
+	# END STEP 3 ---------------------------------------- #
+
+# ---------------------------------------------------------------------------- #
+
+
+
+# Auxiliary functions -------------------------------------------------------- #
+
+def open_archive_member(p_archive, s_member):
+	"""
+	Opens a member of a tar or zip archive, without extracting it
+	:param p_archive: Path to the archive
+	:param s_member: Name of the member in the archive
+	:return: The binary stream of the member
+	"""
+
+	# If the archive has not been opened by this process
+	if p_archive not in gp.D_OPEN_ARCHIVES:
+
+		# If the archive is a zip file
+		if zipfile.is_zipfile(p_archive):
+			gp.D_OPEN_ARCHIVES[p_archive] = zipfile.ZipFile(p_archive, "r")		# Opens the archive
+
+		# If the archive is a tar file, compressed or not
+		else:
+			gp.D_OPEN_ARCHIVES[p_archive] = tarfile.open(p_archive, "r:*")		# Opens the archive
+	# End if
+
+	o_archive = gp.D_OPEN_ARCHIVES[p_archive]		# Loads the opened archive
+
+	# If the archive is a zip file
+	if isinstance(o_archive, zipfile.ZipFile):
+		return o_archive.open(s_member, "r")		# Opens the member
+
+	f_member = o_archive.extractfile(s_member)		# Opens the member
+
+	# If the member is not a regular file
+	if f_member is None:
+		raise KeyError(s_member)
+
+	return f_member		# Returns the stream of the member
+# End function ------------------------------------------ #
+
+# ---------------------------------------------------------------------------- #
+
+
+
+# Reference ------------------------------------------------------------------ #
+
+# Importation
+# from open_file_stream import open_file_stream
+	# Opens a file, a gzip file or a member of an archive for a binary reading
+	# In : (p) file's path
+	# Out : (f) the binary stream of the file
+
+# Usage
+# f_input = open_file_stream(		# Opens the file
+# 	p_file=p_file					# Path to the file to read
+# )
+
+# ---------------------------------------------------------------------------- #
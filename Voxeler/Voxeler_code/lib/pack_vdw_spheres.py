@@ -0,0 +1,100 @@
+# Information ---------------------------------------------------------------- #
+# Author :	Julien Lenoir
+# Github :	Blackounet
+# Created : March 2021
+# Updated :
+# ---------------------------------------------------------------------------- #
+
+
+
+# Importations --------------------------------------------------------------- #
+
+# Universal modules
+import numpy as np
+	# Allows Numpy array manipulation
+
+# ---------------------------------------------------------------------------- #
+
+
+
+# Main function -------------------------------------------------------------- #
+
+def pack_vdw_spheres(a_bits, t_grid_shape, a_centers, a_sphere, i_chunk_points=4194304):
+	"""
+	Sets the bits of the grid points covered by the sphere of each atom of an element, in a bit-packed occupancy grid
+		The grid points are numbered as in a flattened grid, the first point of a byte is its most significant bit
+		The atoms are processed by chunks of bounded size, the grid is never unpacked
+		The sphere points of an atom are merged by byte, the bytes shared by several atoms are set again until no bit is lost
+	:param a_bits: The bit-packed grid to fill, one bit by grid point
+	:param t_grid_shape: The shape of the unpacked grid
+	:param a_centers: Array of the grid coordinates of each atom, one row per atom
+	:param a_sphere: Array of the relative coordinates of the sphere points, one row per axis
+	:param i_chunk_points: Maximal number of sphere points set at once
+	"""
+
+	# STEP 0 : Preparing variables ---------------------- #
+	i_sphere_points = a_sphere.shape[1]											# Number of points in the sphere
+	i_chunk_atoms = max(i_chunk_points // max(i_sphere_points, 1), 1)			# Number of atoms set at once
+	a_centers = np.asarray(a_centers).reshape(-1, 3).astype(np.int64)			# Coordinates of the atoms
+	a_offsets = np.sort(														# Grid index offset of each sphere point, in increasing order
+		a_sphere[0].astype(np.int64) * t_grid_shape[1] * t_grid_shape[2]
+		+ a_sphere[1].astype(np.int64) * t_grid_shape[2]
+		+ a_sphere[2].astype(np.int64)
+	)
+	# END STEP 0 ---------------------------------------- #
+
+
+	# STEP 1 : Setting the bits of each chunk ----------- #
+	# For each chunk of atoms
+	for i_start in range(0, len(a_centers), i_chunk_atoms):
+		a_chunk = a_centers[i_start:i_start + i_chunk_atoms]		# Coordinates of the atoms of the chunk
+
+		# For each axis x, y and z
+		for i_axis in range(3):
+
+			# If some sphere points are outside of the grid
+			if np.min(a_chunk[:, i_axis]) + np.min(a_sphere[i_axis]) < 0 or \
+					np.max(a_chunk[:, i_axis]) + np.max(a_sphere[i_axis]) >= t_grid_shape[i_axis]:
+				raise IndexError("The VdW spheres exceed the grid on axis {}".format(i_axis))
+		# End for
+
+		a_center_points = np.ravel_multi_index(tuple(a_chunk.T), t_grid_shape)		# Grid index of each atom center
+		a_points = (a_center_points[:, np.newaxis] + a_offsets).ravel()		# Grid index of each sphere point of each atom, sorted by atom
+		a_bytes = a_points >> 3												# Byte containing each point
+		a_masks = np.uint8(128) >> (a_points & 7).astype(np.uint8)			# Bit of each point in its byte
+		a_firsts = np.flatnonzero(np.append(True, a_bytes[1:] != a_bytes[:-1]))		# First point of each byte of each atom
+		a_bytes = a_bytes[a_firsts]											# Bytes covered by each atom
+		a_masks = np.bitwise_or.reduceat(a_masks, a_firsts)					# Bits covered by each atom in its bytes
+
+		# While some bits of the bytes shared by several atoms have been lost
+		while len(a_bytes) != 0:
+			a_bits[a_bytes] |= a_masks									# Sets the bits, only one atom is written by repeated byte
+			a_lost = np.flatnonzero((a_bits[a_bytes] & a_masks) != a_masks)		# Bytes missing some bits of their atom
+			a_bytes = a_bytes[a_lost]									# Bytes to set again
+			a_masks = a_masks[a_lost]									# Bits to set again
+		# End while
+	# End for
+	# END STEP 1 ---------------------------------------- #
+
+# ---------------------------------------------------------------------------- #
+
+
+
+# Reference ------------------------------------------------------------------ #
+
+# Importation
+# from pack_vdw_spheres import pack_vdw_spheres
+	# Sets the bits of the grid points covered by the sphere of each atom of an element, by chunks of atoms
+	# In : (a) bit-packed grid, (t) grid shape, (a) atoms grid coordinates, (a) sphere relative coordinates,
+	# In : (i) maximal number of points at once
+	# Out : None
+
+# Usage
+# pack_vdw_spheres(										# Sets the points covered by the VdW sphere of each atom
+# 	a_bits=o_structure.a_bit_grid,						# The bit-packed grid to fill
+# 	t_grid_shape=tuple(self.a_grid_size),				# The shape of the unpacked grid
+# 	a_centers=l_l_elements[i_element][3],				# Grid coordinates of the atoms
+# 	a_sphere=l_l_elements[i_element][5]					# Relative coordinates of the sphere points
+# )
+
+# ---------------------------------------------------------------------------- #
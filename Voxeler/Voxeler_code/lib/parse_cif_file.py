@@ -0,0 +1,316 @@
+# Information ---------------------------------------------------------------- #
+# Author :	Julien Lenoir
+# Github :	Blackounet
+# Created : March 2021
+# Updated :
+# ---------------------------------------------------------------------------- #
+
+
+
+# Importations --------------------------------------------------------------- #
+
+# Universal modules
+import numpy as np
+	# Allows Numpy array manipulation
+import re
+	# Searches patterns within the content
+
+# Classes
+from cla.pdb_structure import PdbStructure
+	# PDB structure and associated grid
+
+# General library
+from lib.read_file_bytes import read_file_bytes
+	# Extracts the raw content of a file
+	# In : (p) file's path
+	# Out : (x) the file's bytes
+from lib.parse_pdb_file import extract_line_chars, convert_pdb_columns, compile_parsing_filters, apply_parsing_filters
+	# Auxiliary functions of the PDB parsing, shared by the mmCIF parsing
+from lib.terminate_program_process import terminate_program_process
+	# Stops the program and prints content
+	# In : (l(s)) content to prompt
+	# Out : None
+
+# ---------------------------------------------------------------------------- #
+
+
+
+# Main function -------------------------------------------------------------- #
+
+def parse_cif_file(p_file, d_filters, x_content=None):
+	"""
+	Extracts a structure from a mmCIF file and applies filters, the atoms are read from the atom_site table
+		The author numbering and naming are used when available, as in the PDB format
+		Every model of the file is kept in the structure, as for the PDB files
+	:param p_file: Path to the mmCIF file to extract
+	:param d_filters: Dictionary of parsing filters to apply
+	:param x_content: The raw content of the file, read from the path if not given
+	:return: The structure extracted and saved in an object
+	"""
+
+	# STEP 0 : Preparing variables ---------------------- #
+	l_s_logs = []					# A list for logs
+	l_s_keys = [					# A list of PDB fields to save
+		"element_type", "atom_serial", "atom_name", "alternative_location", "residue_name",
+		"chain_id", "residue_serial", "residue_insertion", "coord_x", "coord_y",
+		"coord_z", "occupancy", "temperature_factor", "element_symbol", "element_charge"
+	]
+	d_cif_fields = {				# The atom_site fields of each PDB field, by order of preference
+		"element_type": ["group_PDB"],
+		"atom_serial": ["id"],
+		"atom_name": ["auth_atom_id", "label_atom_id"],
+		"alternative_location": ["label_alt_id"],
+		"residue_name": ["auth_comp_id", "label_comp_id"],
+		"chain_id": ["auth_asym_id", "label_asym_id"],
+		"residue_serial": ["auth_seq_id", "label_seq_id"],
+		"residue_insertion": ["pdbx_PDB_ins_code"],
+		"coord_x": ["Cartn_x"],
+		"coord_y": ["Cartn_y"],
+		"coord_z": ["Cartn_z"],
+		"occupancy": ["occupancy"],
+		"temperature_factor": ["B_iso_or_equiv"],
+		"element_symbol": ["type_symbol"],
+		"element_charge": ["pdbx_formal_charge"],
+	}
+	# END STEP 0 ---------------------------------------- #
+
+
+	# STEP 1 : Extracting the file content -------------- #
+	# If the content of the file has not already been read
+	if x_content is None:
+		x_content = read_file_bytes(		# Retrieves the raw content of the file
+			p_file=p_file					# Path to the file to extract
+		)
+	# END STEP 1 ---------------------------------------- #
+
+
+	# STEP 2 : Decoding the atom_site table ------------- #
+	l_s_fields, a_starts, a_ends = tokenize_atom_site(		# Locates each value of the atom table
+		x_content=x_content									# The raw content of the mmCIF file
+	)
+
+	# If the file does not contain an atom table
+	if len(l_s_fields) == 0 or len(a_starts) == 0:
+		l_s_logs.append("ERROR : The '{}' mmCIF file does not contain any atom".format(p_file))		# Defines the error message
+		terminate_program_process(		# Stops the program
+			l_s_content=l_s_logs		# Content to save to logs
+		)
+
+	# If the number of values does not match the number of fields
+	if len(a_starts) % len(l_s_fields) != 0:
+		l_s_logs.append("ERROR : Incomplete atom_site table in '{}'".format(p_file))		# Defines the error message
+		terminate_program_process(		# Stops the program
+			l_s_content=l_s_logs		# Content to save to logs
+		)
+
+	d_columns = {}									# Dictionary of stripped atom fields, as byte strings
+	a_content = np.frombuffer(x_content, dtype=np.uint8)		# Views the content as an array of chars
+
+	# For each PDB field
+	for s_key in l_s_keys:
+
+		l_s_found = [s_field for s_field in d_cif_fields[s_key] if s_field in l_s_fields]		# The available mmCIF fields
+
+		# If the field is mandatory and not available
+		if len(l_s_found) == 0 and s_key in ["atom_serial", "coord_x", "coord_y", "coord_z", "element_symbol"]:
+			l_s_logs.append("ERROR : The field '_atom_site.{}' is missing in '{}'".format(d_cif_fields[s_key][0], p_file))		# Defines the error message
+			terminate_program_process(		# Stops the program
+				l_s_content=l_s_logs		# Content to save to logs
+			)
+
+		# If the field is not available
+		if len(l_s_found) == 0:
+			d_columns[s_key] = np.full(len(a_starts) // len(l_s_fields), b"", dtype="S1")		# Leaves the field empty
+			continue
+
+		i_column = l_s_fields.index(l_s_found[0])		# Position of the field in the table
+		d_columns[s_key] = decode_atom_site_column(		# Gathers the values of the field
+			a_content=a_content,						# The content to read
+			a_starts=a_starts[i_column::len(l_s_fields)],		# The start of each value
+			a_ends=a_ends[i_column::len(l_s_fields)]			# The end of each value
+		)
+	# End for
+
+	d_columns["residue_serial"][d_columns["residue_serial"] == b""] = b"0"		# Residues without number, as waters in the label numbering
+
+	d_columns["element_symbol"] = np.char.upper(d_columns["element_symbol"])		# Uses the PDB case for the symbols
+	d_columns["element_charge"] = convert_formal_charges(						# Uses the PDB notation for the charges
+		a_charges=d_columns["element_charge"]
+	)
+
+	# For each numerical field with missing values
+	for s_key in ["occupancy", "temperature_factor"]:
+		d_columns[s_key][d_columns[s_key] == b""] = b"0"		# Missing values are set to zero
+	# END STEP 2 ---------------------------------------- #
+
+
+	# STEP 3 : Filtering and converting the atoms ------- #
+	a_valid = apply_parsing_filters(					# Applies the parsing filters to every atom line at once
+		d_columns=d_columns,							# The decoded atom fields
+		l_l_filters=compile_parsing_filters(			# Converts the filters into column tests
+			d_filters=d_filters							# The filters to apply
+		)
+	)
+
+	# Tries the conversion of each field
+	try:
+		d_atoms = convert_pdb_columns(		# Converts the valid atom fields to their final types
+			d_columns=d_columns,			# The decoded atom fields
+			a_valid=a_valid					# The atoms validated by the filters
+		)
+
+	# If there is an error during the conversion
+	except ValueError:
+		l_s_logs.append("ERROR : Incorrect value type in '{}'".format(p_file))		# Defines the error message
+		terminate_program_process(		# Stops the program
+			l_s_content=l_s_logs		# Content to save to logs
+		)
+	# End try
+	# END STEP 3 ---------------------------------------- #
+
+
+	# STEP 4 : Creating the structure ------------------- #
+	s_name = p_file.split("::")[-1].split('/')[-1].split('.')[0]		# Extracts the name of the structure
+	o_structure = PdbStructure()										# Creates a PDB structure object
+	o_structure.load_structure(											# Loads the structure into the object
+		s_name=s_name,													# Name of the structure
+		l_s_leading_data=[],											# mmCIF information has no PDB equivalent
+		l_s_trailing_data=[],											# mmCIF information has no PDB equivalent
+		d_atoms=d_atoms													# Dictionary of atom properties
+	)
+	# END STEP 4 ---------------------------------------- #
+
+
+	# STEP 5 : Returns the object ----------------------- #
+	return o_structure		# Returns the extracted structure
+	# END STEP 5 ---------------------------------------- #
+
+# ---------------------------------------------------------------------------- #
+
+
+
+# Auxiliary functions -------------------------------------------------------- #
+
+def tokenize_atom_site(x_content):
+	"""
+	Locates the values of the atom_site table of a mmCIF file, without splitting the content into python strings
+		The values are separated by whitespaces, a quote closes a value only if it is followed by a whitespace
+	:param x_content: The raw content of the mmCIF file
+	:return: The list of the table fields, the start and the end of each value, quotes excluded
+	"""
+
+	l_s_fields = []		# The list of fields of the atom table
+
+	# Locating the header of the table
+	o_header = re.search(rb"^loop_[ \t]*\n((?:[ \t]*_atom_site\.\S+[ \t]*\n)+)", x_content, re.M)		# The fields of the atom table
+
+	# If there is no atom table
+	if o_header is None:
+		return l_s_fields, np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+	l_s_fields = [s_field.strip().split('.', 1)[1] for s_field in o_header.group(1).decode().split('\n') if s_field.strip()]		# Names of the fields
+
+	# Locating the values of the table
+	i_start = o_header.end()																# Start of the values
+	o_end = re.compile(rb"^[ \t]*(?:#|loop_|_|data_|global_)", re.M).search(x_content, i_start)		# The end of the table
+	i_end = o_end.start() if o_end is not None else len(x_content)							# End of the values
+	a_table = np.frombuffer(x_content, dtype=np.uint8)[i_start:i_end]						# Views the values as an array of chars
+
+	a_space = np.isin(a_table, np.frombuffer(b" \t\r\n", dtype=np.uint8))		# Whitespace chars
+	a_starts = np.flatnonzero(~a_space & np.concatenate(([True], a_space[:-1])))			# Chars starting a value
+	a_ends = np.flatnonzero(~a_space & np.concatenate((a_space[1:], [True]))) + 1		# Chars ending a value
+
+	# Removing the quotes around the values
+	a_first = a_table[a_starts] if len(a_starts) > 0 else np.zeros(0, dtype=np.uint8)	# First char of each value
+	a_last = a_table[a_ends - 1] if len(a_ends) > 0 else np.zeros(0, dtype=np.uint8)		# Last char of each value
+	a_quoted = np.isin(a_first, np.frombuffer(b"'\"", dtype=np.uint8))					# Values starting with a quote
+
+	# If a quoted value contains whitespaces, the values need to be located one by one
+	if np.any(a_quoted & ((a_ends - a_starts < 2) | (a_first != a_last))):
+		l_l_tokens = [																		# Locates each value, following the quoting rules
+			[o_token.start(), o_token.end()]
+			for o_token in re.finditer(rb"'.*?'(?=\s)|\".*?\"(?=\s)|\S+", x_content[i_start:i_end] + b"\n")
+		]
+		a_tokens = np.array(l_l_tokens, dtype=np.int64).reshape(-1, 2)		# Boundaries of the values
+		a_starts = a_tokens[:, 0]											# Start of each value
+		a_ends = a_tokens[:, 1]												# End of each value
+		a_first = a_table[a_starts] if len(a_starts) > 0 else np.zeros(0, dtype=np.uint8)
+		a_quoted = np.isin(a_first, np.frombuffer(b"'\"", dtype=np.uint8))
+
+	a_starts = a_starts + a_quoted + i_start		# Excludes the opening quotes, positions in the whole content
+	a_ends = a_ends - a_quoted + i_start			# Excludes the closing quotes, positions in the whole content
+
+	return l_s_fields, a_starts, a_ends		# Returns the located values
+# End function ------------------------------------------ #
+
+
+def decode_atom_site_column(a_content, a_starts, a_ends):
+	"""
+	Gathers the values of a field of the atom table, the mmCIF null values are replaced by empty values
+	:param a_content: The content as an array of chars
+	:param a_starts: The position of the first char of each value
+	:param a_ends: The position following the last char of each value
+	:return: An array of byte strings
+	"""
+
+	i_width = max(int(np.max(a_ends - a_starts)), 1)		# Length of the longest value
+
+	a_values = np.char.strip(np.ascontiguousarray(extract_line_chars(		# Gathers the chars of each value
+		a_content=a_content,												# The content to read
+		a_line_starts=a_starts,												# The start of each value
+		a_line_ends=a_ends,													# The end of each value
+		i_width=i_width														# Width of the longest value
+	)).view("S{}".format(i_width)).reshape(-1))
+
+	a_values[(a_values == b"?") | (a_values == b".")] = b""		# Removes the null values
+
+	return a_values		# Returns the values of the field
+# End function ------------------------------------------ #
+
+
+def convert_formal_charges(a_charges):
+	"""
+	Converts mmCIF formal charges into the PDB notation, as '2+' or '1-', null charges are left empty
+	:param a_charges: The array of mmCIF charges, as byte strings
+	:return: The array of PDB charges, as byte strings
+	"""
+
+	a_unique, a_inverse = np.unique(a_charges, return_inverse=True)		# Each charge is converted once
+	l_x_converted = []													# The converted charges
+
+	# For each charge found
+	for x_charge in a_unique.tolist():
+
+		# Tries to read the charge
+		try:
+			i_charge = int(x_charge)
+
+		# If the charge is not a number
+		except ValueError:
+			i_charge = 0
+
+		l_x_converted.append(b"" if i_charge == 0 else "{}{}".format(abs(i_charge), "+" if i_charge > 0 else "-").encode())
+	# End for
+
+	return np.array(l_x_converted, dtype="S2")[a_inverse]		# Returns the converted charges
+# End function ------------------------------------------ #
+
+# ---------------------------------------------------------------------------- #
+
+
+
+# Reference ------------------------------------------------------------------ #
+
+# Importation
+# from parse_cif_file import parse_cif_file
+	# Extracts a structure from a mmCIF file and applies filters
+	# In : (p) mmCIF file to extract, (d) parsing filters to apply, (x) the file's bytes
+	# Out : (o) the object containing the structure
+
+# Usage
+# parse_cif_file(			# Extracts a structure into an object
+# 	p_file=p_file,			# The mmCIF file to extract
+# 	d_filters=d_filters		# The parsing filters to apply
+# )
+
+# ---------------------------------------------------------------------------- #
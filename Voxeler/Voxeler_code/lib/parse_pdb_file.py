@@ -9,15 +9,19 @@
 
 # Importations --------------------------------------------------------------- #
 
+# Universal modules
+import numpy as np
+	# Allows Numpy array manipulation
+
 # Classes
 from cla.pdb_structure import PdbStructure
 	# PDB structure and associated grid
 
 # General library
-from lib.read_file_content import read_file_content
-	# Extracts the content of a file
+from lib.read_file_bytes import read_file_bytes
+	# Extracts the raw content of a file
 	# In : (p) file's path
-	# Out : (l(s)) the file's content
+	# Out : (x) the file's bytes
 from lib.terminate_program_process import terminate_program_process
 	# Stops the program and prints content
 	# In : (l(s)) content to prompt
@@ -29,134 +33,73 @@ from lib.terminate_program_process import terminate_program_process
 
 # Main function -------------------------------------------------------------- #
 
-def parse_pdb_file(p_file, d_filters):
+def parse_pdb_file(p_file, d_filters, x_content=None):
 	"""
 	Extracts a PDB structure from a file and applies filters
 	:param p_file: Path to the PDB file to extract
 	:param d_filters: Dictionary of parsing filters to apply
+	:param x_content: The raw content of the file, read from the path if not given
 	:return: The PDB structure extracted and saved in an object
 	"""
 
 	# STEP 0 : Preparing variables ---------------------- #
-	l_s_logs = []					# A list for logs
-
-	l_s_leading_pdb = []			# List of lines before the atoms records
-	l_s_trailing_pdb = []			# List of lines after the atom records
-	b_atom_encountered = False		# If the first atom line has been encountered
-	i_line_count = -1				# Index of the current line of the file
-
-	d_atoms = {}					# A dictionary of valid elements from the parsed PDB
-	l_s_keys = [					# A list of PDB fields to save
-		"element_type", "atom_serial", "atom_name", "alternative_location", "residue_name",
-		"chain_id", "residue_serial", "residue_insertion", "coord_x", "coord_y",
-		"coord_z", "occupancy", "temperature_factor", "element_symbol", "element_charge"
-	]
-
-	# For each one of the 15 useful fields in the PDB file
-	for s_key in l_s_keys:
-		d_atoms[s_key] = []		# Creates an empty list for each field
+	l_s_logs = []		# A list for logs
 	# END STEP 0 ---------------------------------------- #
 
 
 	# STEP 1 : Extracting the file content -------------- #
-	l_s_content = read_file_content(		# Retrieves the content of the file
-		p_file=p_file						# Path to the file to extract
-	)
+	# If the content of the file has not already been read
+	if x_content is None:
+		x_content = read_file_bytes(		# Retrieves the raw content of the file
+			p_file=p_file					# Path to the file to extract
+		)
 	# END STEP 1 ---------------------------------------- #
 
 
-	# STEP 2 : Security check --------------------------- #
+	# STEP 2 : Decoding the PDB records ----------------- #
+	i_line_count, d_columns, l_s_leading_pdb, l_s_trailing_pdb = decode_pdb_records(		# Decodes every atom line at once
+		x_content=x_content		# The raw content of the PDB file
+	)
+	# END STEP 2 ---------------------------------------- #
+
+
+	# STEP 3 : Security check --------------------------- #
 	# If the PDB file is empty
-	if len(l_s_content) < 2:
+	if i_line_count < 2:
 		l_s_logs.append("ERROR : The '{}' PDB file is empty".format(p_file))		# Defines the error message
 		terminate_program_process(		# Stops the program
 			l_s_content=l_s_logs		# Content to save to logs
 		)
-	# END STEP 2 ---------------------------------------- #
-
+	# END STEP 3 ---------------------------------------- #
 
-	# STEP 3 : Parsing the PDB file --------------------- #
-	# For each line in the PDB file
-	for s_line in l_s_content:
-
-		i_line_count += 1		# Counts the lines
-
-		# If the line concerns ATOMs or HETATMs
-		if s_line.startswith("ATOM") or s_line.startswith("HETATM"):
-
-			b_atom_encountered = True		# If the first atom line has been encountered
-
-			l_s_atom_properties = [			# Contains the element properties
-				s_line[0:6].strip(),		# ATOM or HETATM
-				s_line[6:11].strip(),		# Atom serial number
-				s_line[12:16].strip(),		# Atom name
-				s_line[16].strip(),			# Alternate location indicator
-				s_line[17:20].strip(),		# Residue name
-				s_line[21].strip(),			# Chain identifier
-				s_line[22:26].strip(),		# Residue sequence number
-				s_line[26].strip(),			# Code for insertion of residues
-				s_line[30:38].strip(),		# Orthogonal coordinates for X in Angstroms
-				s_line[38:46].strip(),		# Orthogonal coordinates for Y in Angstroms
-				s_line[46:54].strip(),		# Orthogonal coordinates for Z in Angstroms
-				s_line[54:60].strip(),		# Occupancy
-				s_line[60:66].strip(),		# Temperature factor
-				s_line[76:78].strip(),		# Element symbol
-				s_line[78:80].strip(),		# Charge on the atom
-			]
-			b_valid = apply_parsing_filters(		# Applies the parsing filters to the line
-				l_s_atom=l_s_atom_properties,		# The atom line to filter
-				d_filters=d_filters			# The filters to apply
-			)
 
-			# If the line is validated by the filters
-			if b_valid:
-
-				# Try to save the line
-				try:
-
-					# Tries the conversion of each field
-					d_atoms["element_type"].append(l_s_atom_properties[0].strip())						# ATOM or HETATM
-					d_atoms["atom_serial"].append(int(l_s_atom_properties[1].strip()))					# Atom serial number
-					d_atoms["atom_name"].append(l_s_atom_properties[2].strip())							# Atom name
-					d_atoms["alternative_location"].append(l_s_atom_properties[3].strip())				# Alternate location indicator
-					d_atoms["residue_name"].append(l_s_atom_properties[4].strip())						# Residue name
-					d_atoms["chain_id"].append(l_s_atom_properties[5].strip())							# Chain identifier
-					d_atoms["residue_serial"].append(int(l_s_atom_properties[6].strip()))				# Residue sequence number
-					d_atoms["residue_insertion"].append(l_s_atom_properties[7].strip())					# Code for insertion of residues
-					d_atoms["coord_x"].append(float(l_s_atom_properties[8].strip()))					# Orthogonal coordinates for X in Angstroms
-					d_atoms["coord_y"].append(float(l_s_atom_properties[9].strip()))					# Orthogonal coordinates for Y in Angstroms
-					d_atoms["coord_z"].append(float(l_s_atom_properties[10].strip()))					# Orthogonal coordinates for Z in Angstroms
-					d_atoms["occupancy"].append(float(l_s_atom_properties[11].strip()))					# Occupancy
-					d_atoms["temperature_factor"].append(float(l_s_atom_properties[12].strip()))		# Temperature factor
-					d_atoms["element_symbol"].append(l_s_atom_properties[13].strip())					# Element symbol
-					d_atoms["element_charge"].append(l_s_atom_properties[14].strip())					# Element symbol
-
-				# If there is an error during the conversion
-				except OSError:
-					l_s_logs.append("ERROR : Incorrect value type in '{}' at line '{}'".format(p_file, i_line_count))		# Defines the error message
-					terminate_program_process(		# Stops the program
-						l_s_content=l_s_logs		# Content to save to logs
-					)
-				# End try
-			# End if
-
-		# If the line is does not contain atom data
-		else:
+	# STEP 4 : Filtering and converting the atoms ------- #
+	a_valid = apply_parsing_filters(					# Applies the parsing filters to every atom line at once
+		d_columns=d_columns,							# The decoded atom fields
+		l_l_filters=compile_parsing_filters(			# Converts the filters into column tests
+			d_filters=d_filters							# The filters to apply
+		)
+	)
 
-			# If atomic data have been encountered
-			if b_atom_encountered:
-				l_s_trailing_pdb.append(s_line)		# Saves the trailing line
+	# Tries the conversion of each field
+	try:
+		d_atoms = convert_pdb_columns(		# Converts the valid atom fields to their final types
+			d_columns=d_columns,			# The decoded atom fields
+			a_valid=a_valid					# The atoms validated by the filters
+		)
 
-			# If atomic data have not been encountered
-			else:
-				l_s_leading_pdb.append(s_line)		# Saves the leading line
-		# End if
-	# End for
-	# END STEP 3 ---------------------------------------- #
+	# If there is an error during the conversion
+	except ValueError:
+		l_s_logs.append("ERROR : Incorrect value type in '{}'".format(p_file))		# Defines the error message
+		terminate_program_process(		# Stops the program
+			l_s_content=l_s_logs		# Content to save to logs
+		)
+	# End try
+	# END STEP 4 ---------------------------------------- #
 
 
-	# STEP 4 : ------------------------------------------ #
-	s_name = p_file.split('/')[-1].split('.')[0]		# Extracts the name of the structure
+	# STEP 5 : Creating the structure ------------------- #
+	s_name = p_file.split("::")[-1].split('/')[-1].split('.')[0]		# Extracts the name of the structure
 	o_structure = PdbStructure()						# Creates a PDB structure object
 	o_structure.load_structure(							# Loads the structure into the object
 		s_name=s_name,									# Name of the structure
@@ -164,12 +107,12 @@ def parse_pdb_file(p_file, d_filters):
 		l_s_trailing_data=l_s_trailing_pdb,				# Remarks on the structure
 		d_atoms=d_atoms									# Dictionary of atom properties
 	)
-	# END STEP 4 ---------------------------------------- #
+	# END STEP 5 ---------------------------------------- #
 
 
-	# STEP 5 : Returns the object ----------------------- #
+	# STEP 6 : Returns the object ----------------------- #
 	return o_structure		# Returns the extracted structure
-	# END STEP 5 ---------------------------------------- #
+	# END STEP 6 ---------------------------------------- #
 
 # ---------------------------------------------------------------------------- #
 
@@ -177,70 +120,266 @@ def parse_pdb_file(p_file, d_filters):
 
 # Auxiliary functions -------------------------------------------------------- #
 
-def apply_parsing_filters(l_s_atom, d_filters):
+def decode_pdb_records(x_content):
 	"""
-	Applies filters to the PDB parsing, removing unwanted lines
-	:param l_s_atom: The atom line to filter
-	:param d_filters: Parsing parameters, filters to apply
-	:return: A boolean, if the line pass all the filters or not
+	Locates the ATOM and HETATM records of a PDB content and decodes their fixed columns in bulk
+	:param x_content: The raw content of a PDB file, with '\\n' newlines
+	:return: The number of lines, a dictionary of stripped atom fields as byte strings and the lists of leading and trailing lines
 	"""
 
-	b_valid_line = True					# If the line is valid and can be saved
-	l_s_water_id = ["HOH", "OOW"]		# List of possible water molecules identifiers
+	# Preparing variables
+	d_columns = {}		# A dictionary of decoded atom fields
+	l_l_fields = [		# The PDB fields to decode : name, first column, last column (excluded)
+		["element_type", 0, 6],
+		["atom_serial", 6, 11],
+		["atom_name", 12, 16],
+		["alternative_location", 16, 17],
+		["residue_name", 17, 20],
+		["chain_id", 21, 22],
+		["residue_serial", 22, 26],
+		["residue_insertion", 26, 27],
+		["coord_x", 30, 38],
+		["coord_y", 38, 46],
+		["coord_z", 46, 54],
+		["occupancy", 54, 60],
+		["temperature_factor", 60, 66],
+		["element_symbol", 76, 78],
+		["element_charge", 78, 80],
+	]
+
+	# Locating the lines
+	a_content = np.frombuffer(x_content, dtype=np.uint8)		# Views the content as an array of chars
+	a_line_ends = np.flatnonzero(a_content == 10)				# Retrieves the position of each newline
+
+	# If the last line is not terminated by a newline
+	if len(a_content) > 0 and a_content[-1] != 10:
+		a_line_ends = np.append(a_line_ends, len(a_content))		# Closes the last line
+
+	i_line_count = len(a_line_ends)																# Number of lines in the content
+	a_line_starts = np.concatenate(([0], a_line_ends + 1))[:i_line_count].astype(np.int64)		# Retrieves the position of each line start
+
+	# Locating the atom records
+	a_record = extract_line_chars(			# Retrieves the record name of each line
+		a_content=a_content,				# The content to read
+		a_line_starts=a_line_starts,		# The start of each line
+		a_line_ends=a_line_ends,			# The end of each line
+		i_width=6							# Width of the record name
+	)
+	a_is_atom = np.logical_or(												# Finds the ATOM and HETATM lines
+		np.all(a_record[:, :4] == np.frombuffer(b"ATOM", np.uint8), 1),		# ATOM lines
+		np.all(a_record == np.frombuffer(b"HETATM", np.uint8), 1)			# HETATM lines
+	)
+	a_atom_lines = np.flatnonzero(a_is_atom)		# Indexes of the atom lines
+	a_atom_chars = extract_line_chars(				# Retrieves the 80 columns of each atom line
+		a_content=a_content,						# The content to read
+		a_line_starts=a_line_starts[a_atom_lines],	# The start of each atom line
+		a_line_ends=a_line_ends[a_atom_lines],		# The end of each atom line
+		i_width=80									# Width of a PDB line
+	)
+
+	# For each one of the 15 useful fields in the PDB file
+	for l_field in l_l_fields:
+		d_columns[l_field[0]] = np.char.strip(							# Strips the field of each atom line
+			np.ascontiguousarray(a_atom_chars[:, l_field[1]:l_field[2]]).view(		# Views the columns of the field as byte strings
+				"S{}".format(l_field[2] - l_field[1])
+			).reshape(-1)
+		)
+
+	# Retrieving the non-atom lines
+	i_first_atom = a_atom_lines[0] if len(a_atom_lines) > 0 else i_line_count					# Index of the first atom line
+	i_first_char = a_line_starts[i_first_atom] if len(a_atom_lines) > 0 else len(x_content)	# Position of the first atom line
+	a_other_lines = np.flatnonzero(np.logical_not(a_is_atom))									# Indexes of the lines without atom data
+	l_s_leading_pdb = split_content_lines(		# Lines written before the first atom
+		s_content=x_content[:i_first_char].decode()
+	)
+	l_s_trailing_pdb = split_content_lines(						# Lines written after the first atom
+		s_content=b"".join([
+			x_content[a_line_starts[i_line]:a_line_ends[i_line] + 1]
+			for i_line in a_other_lines[a_other_lines > i_first_atom]
+		]).decode()
+	)
+
+	return i_line_count, d_columns, l_s_leading_pdb, l_s_trailing_pdb		# Returns the decoded content
+# End function ------------------------------------------ #
 
-	# If ATOM are discarded and the line contains a HETATM element
-	if d_filters["b_discard_atom"] and l_s_atom[0] == "ATOM":
-		return False		# The line cannot be saved
 
-	# If HETATM are discarded and the line contains a HETATM element
-	if d_filters["b_discard_hetatm"] and l_s_atom[0] == "HETATM":
-		return False		# The line cannot be saved
+def extract_line_chars(a_content, a_line_starts, a_line_ends, i_width, i_chunk_size=65536):
+	"""
+	Gathers the first columns of many lines, padding the short lines with spaces
+	:param a_content: The content as an array of chars
+	:param a_line_starts: The position of the first char of each line
+	:param a_line_ends: The position of the newline ending each line
+	:param i_width: The number of columns to gather
+	:param i_chunk_size: The number of lines gathered at once, bounding the memory used for the positions
+	:return: An array of chars, one row per line
+	"""
+
+	a_chars = np.full((len(a_line_starts), i_width), 32, dtype=np.uint8)		# Array of chars, filled with spaces
+	a_columns = np.arange(i_width)												# Columns to gather
+
+	# If there is nothing to gather
+	if len(a_content) == 0:
+		return a_chars		# Returns only spaces
+
+	# For each chunk of lines
+	for i_start in range(0, len(a_line_starts), i_chunk_size):
+
+		a_positions = a_line_starts[i_start:i_start + i_chunk_size, None] + a_columns		# Position of each char of the lines
+		a_chars[i_start:i_start + i_chunk_size] = np.where(									# Gathers the chars, spaces outside of the lines
+			a_positions < a_line_ends[i_start:i_start + i_chunk_size, None],
+			np.take(a_content, a_positions, mode="clip"),
+			32
+		)
+	# End for
+
+	return a_chars		# Returns the chars of each line
+# End function ------------------------------------------ #
+
+
+def split_content_lines(s_content):
+	"""
+	Splits a text content into lines, keeping the newline chars as the file reading does
+	:param s_content: The text to split
+	:return: The list of lines
+	"""
+
+	l_s_lines = s_content.split("\n")		# Splits the content on each newline
+
+	return [s_line + "\n" for s_line in l_s_lines[:-1]] + [s_line for s_line in l_s_lines[-1:] if s_line]		# Returns the lines with their newline
+# End function ------------------------------------------ #
+
+
+def decode_byte_strings(a_strings):
+	"""
+	Converts an array of ASCII byte strings into an array of strings without decoding each item
+	:param a_strings: The array of byte strings
+	:return: The array of strings
+	"""
+
+	i_width = max(a_strings.dtype.itemsize, 1)		# Maximal length of the strings
+
+	return np.ascontiguousarray(a_strings).view(np.uint8).reshape(-1, i_width).astype(np.uint32).view(		# Widens each char
+		"U{}".format(i_width)
+	).reshape(-1)
+# End function ------------------------------------------ #
 
-	# If the Hydrogen must be discarded and the line contains a Hydrogen
-	if d_filters["b_discard_hydrogen"] and l_s_atom[13] == " H":
-		return False		# The line cannot be saved
 
-	# If water is discarded and the line contains a water molecule
-	if d_filters["b_discard_water"] and l_s_atom[4] in l_s_water_id:
-		return False		# The line cannot be saved
+def convert_pdb_columns(d_columns, a_valid):
+	"""
+	Converts the decoded atom fields into the types expected by the atom array
+	:param d_columns: Dictionary of stripped atom fields, as byte strings
+	:param a_valid: Boolean array of the atoms to keep
+	:return: A dictionary of atom properties
+	"""
 
-	# If the alternative location for atom must be discarded and the line contains a alternative location
-	if d_filters["b_discard_alternative"] and l_s_atom[3] not in " A":
-		return False		# The line cannot be saved
+	d_atoms = {}		# A dictionary of valid elements from the parsed PDB
+	d_types = {			# The conversion applied to the numerical fields
+		"atom_serial": np.int64,
+		"residue_serial": np.int64,
+		"coord_x": np.float64,
+		"coord_y": np.float64,
+		"coord_z": np.float64,
+		"occupancy": np.float64,
+		"temperature_factor": np.float64,
+	}
+
+	# For each decoded field
+	for s_key in d_columns:
+
+		# If the field is numerical
+		if s_key in d_types:
+			d_atoms[s_key] = d_columns[s_key][a_valid].astype(d_types[s_key])		# Converts the field
+
+		# If the field is a string
+		else:
+			d_atoms[s_key] = decode_byte_strings(		# Converts the field into strings
+				a_strings=d_columns[s_key][a_valid]		# The valid byte strings
+			)
+	# End for
 
-	# If not all chain are considered and the element is from a discarded chain
-	if len(d_filters["l_c_chain_white"]) > 0 and l_s_atom[5] not in d_filters["l_c_chain_white"]:
-		return False		# The line cannot be saved
+	return d_atoms		# Returns the converted atom fields
+# End function ------------------------------------------ #
 
-	# If the chain id is black listed
-	if len(d_filters["l_c_chain_black"]) > 0 and l_s_atom[5] in d_filters["l_c_chain_black"]:
-		return False		# The line cannot be saved
 
-	# If not all residues are considered and the element is from a discarded residue
-	if len(d_filters["l_s_residue_white"]) > 0 and l_s_atom[4] not in d_filters["l_s_residue_white"]:
-		return False		# The line cannot be saved
+def compile_parsing_filters(d_filters):
+	"""
+	Converts the parsing filters into tests over the columns of atom fields
+	:param d_filters: Parsing parameters, filters to apply
+	:return: A list of tests, each one made of the field to test, if the matching atoms are kept and the values to match
+	"""
 
-	# If the residue is black listed
-	if len(d_filters["l_s_residue_black"]) > 0 and l_s_atom[4] in d_filters["l_s_residue_black"]:
-		return False		# The line cannot be saved
+	l_l_filters = []					# The list of tests to apply
+	l_s_water_id = ["HOH", "OOW"]		# List of possible water molecules identifiers
 
-	# If not all residues are considered and the element is from a discarded residue
-	if len(d_filters["l_i_residue_white"]) > 0 and l_s_atom[6] not in d_filters["l_i_residue_white"]:
-		return False		# The line cannot be saved
+	# If ATOM are discarded
+	if d_filters["b_discard_atom"]:
+		l_l_filters.append(["element_type", False, ["ATOM"]])
+
+	# If HETATM are discarded
+	if d_filters["b_discard_hetatm"]:
+		l_l_filters.append(["element_type", False, ["HETATM"]])
+
+	# If the Hydrogen must be discarded
+	if d_filters["b_discard_hydrogen"]:
+		l_l_filters.append(["element_symbol", False, [" H"]])
+
+	# If water is discarded
+	if d_filters["b_discard_water"]:
+		l_l_filters.append(["residue_name", False, l_s_water_id])
+
+	# If the alternative location for atom must be discarded, only the first location is kept
+	if d_filters["b_discard_alternative"]:
+		l_l_filters.append(["alternative_location", True, ["", " ", "A", " A"]])
+
+	# For each list of values to keep or to discard
+	for s_key, s_field, b_keep in [
+		["l_c_chain_white", "chain_id", True],
+		["l_c_chain_black", "chain_id", False],
+		["l_s_residue_white", "residue_name", True],
+		["l_s_residue_black", "residue_name", False],
+		["l_i_residue_white", "residue_serial", True],
+		["l_i_residue_black", "residue_serial", False],
+		["l_s_atom_white", "element_symbol", True],
+		["l_s_atom_black", "element_symbol", False],
+	]:
+
+		# If the list is not empty
+		if len(d_filters[s_key]) > 0:
+			l_l_filters.append([s_field, b_keep, [str(x_item) for x_item in d_filters[s_key]]])
+	# End for
 
-	# If the residue id is black listed
-	if len(d_filters["l_i_residue_black"]) > 0 and l_s_atom[6] in d_filters["l_i_residue_black"]:
-		return False		# The line cannot be saved
+	# For each test
+	for l_filter in l_l_filters:
+		l_filter[2] = np.array([s_value.encode() for s_value in l_filter[2]])		# Values comparable with the byte strings fields
 
-	# If not all residues are considered and the element is from a discarded residue
-	if len(d_filters["l_s_atom_white"]) > 0 and l_s_atom[13] not in d_filters["l_s_atom_white"]:
-		return False		# The line cannot be saved
+	return l_l_filters		# Returns the tests to apply
+# End function ------------------------------------------ #
+
+
+def apply_parsing_filters(d_columns, l_l_filters):
+	"""
+	Applies filters to the PDB parsing, removing unwanted lines
+	:param d_columns: Dictionary of stripped atom fields, as byte strings
+	:param l_l_filters: The tests to apply, as given by compile_parsing_filters
+	:return: A boolean array, if each line pass all the filters or not
+	"""
 
-	# If the residues is black listed
-	if len(d_filters["l_s_atom_black"]) > 0 and l_s_atom[13] in d_filters["l_s_atom_black"]:
-		return False		# The line cannot be saved
+	a_valid = np.ones(len(d_columns["element_type"]), dtype=bool)		# Every line is valid until a test fails
+
+	# For each test
+	for s_field, b_keep, a_values in l_l_filters:
+		a_match = np.isin(d_columns[s_field], a_values)		# Lines containing one of the values
+
+		# If the matching lines are kept
+		if b_keep:
+			a_valid &= a_match
+
+		# If the matching lines are discarded
+		else:
+			a_valid &= ~a_match
+	# End for
 
-	return True
+	return a_valid		# Returns the lines passing the filters
 # End function ------------------------------------------ #
 
 # ---------------------------------------------------------------------------- #
@@ -0,0 +1,248 @@
+# Information ---------------------------------------------------------------- #
+# Author :	Julien Lenoir
+# Github :	Blackounet
+# Created : March 2021
+# Updated :
+# ---------------------------------------------------------------------------- #
+
+
+
+# Importations --------------------------------------------------------------- #
+
+# Universal modules
+import numpy as np
+	# Allows Numpy array manipulation
+
+# ---------------------------------------------------------------------------- #
+
+
+
+# Main function -------------------------------------------------------------- #
+
+def rasterize_vdw_blocks(t_grid_shape, l_t_groups, s_geometry, i_block_points=8, i_chunk_points=4194304):
+	"""
+	Generates a two levels grid of the VdW volumes, a coarse grid of cubic blocks refined only where it is needed
+		A block covered entirely by the last group of atoms reaching it is full, it is stored by its value only
+		The other blocks reached by the atoms are mixed, their points are computed one by one
+		The groups are processed in order, the last group covering a point gives its value, as the stencils would
+	:param t_grid_shape: The shape of the grid
+	:param l_t_groups: List of the groups of atoms, each one is the grid coordinates of its atoms, one row per atom,
+	the VdW radius in grid points of each atom and the value of the group
+	:param s_geometry: The sphere geometry, 'taxicab', 'uniform' or 'sphere'
+	:param i_block_points: Number of points along each axis of a block
+	:param i_chunk_points: Maximal number of block points computed at once
+	:return: The sorted non empty blocks, with their block index, their value, null for the mixed blocks, and the
+	row of their points, -1 for the full blocks, then the points of the mixed blocks, one row per block
+	"""
+
+	# STEP 0 : Preparing variables ---------------------- #
+	i_block_size = i_block_points ** 3															# Number of points in a block
+	t_block_shape = tuple(-(-int(i_size) // i_block_points) for i_size in t_grid_shape)		# Number of blocks along each axis
+	l_a_indexes = []		# Block reached by each atom
+	l_a_atoms = []			# Atom reaching each block
+	l_a_groups = []			# Group of the atom reaching each block
+	l_a_full = []			# If the atom covers the whole block
+	a_centers = np.concatenate([np.asarray(t_group[0]).reshape(-1, 3) for t_group in l_t_groups] + [np.empty((0, 3))]).astype(np.int64)		# Coordinates of every atom
+	a_radius = np.concatenate([np.asarray(t_group[1]).ravel() for t_group in l_t_groups] + [np.empty(0)]).astype(np.int64)				# Radius of every atom
+	a_codes = np.array([t_group[2] for t_group in l_t_groups], dtype=np.uint8)														# Value of each group
+	a_owners = np.repeat(np.arange(len(l_t_groups)), [len(np.asarray(t_group[1]).ravel()) for t_group in l_t_groups])					# Group of every atom
+	# END STEP 0 ---------------------------------------- #
+
+
+	# STEP 1 : Finding the blocks reached by each atom -- #
+	a_low = np.maximum((a_centers - a_radius[:, np.newaxis]) // i_block_points, 0)										# First block reached by the atoms
+	a_high = np.minimum((a_centers + a_radius[:, np.newaxis]) // i_block_points, np.array(t_block_shape) - 1)			# Last block reached by the atoms
+	a_extents = a_high - a_low + 1																						# Blocks reached along each axis
+	a_counts = np.prod(a_extents, axis=1)																				# Blocks reached by each atom
+	i_chunk_atoms = max(i_chunk_points // max(int(np.max(a_counts, initial=1)), 1), 1)									# Number of atoms processed at once
+
+	# For each chunk of atoms
+	for i_start in range(0, len(a_centers), i_chunk_atoms):
+		a_chunk = np.arange(i_start, min(i_start + i_chunk_atoms, len(a_centers)))		# Atoms of the chunk
+		a_atoms = np.repeat(a_chunk, a_counts[a_chunk])									# Atom of each reached block
+		a_ranks = np.arange(len(a_atoms)) - np.repeat(np.cumsum(a_counts[a_chunk]) - a_counts[a_chunk], a_counts[a_chunk])		# Rank of the block for its atom
+		a_blocks = a_low[a_atoms] + np.stack((		# Coordinates of the reached blocks
+			a_ranks // (a_extents[a_atoms, 1] * a_extents[a_atoms, 2]),
+			a_ranks // a_extents[a_atoms, 2] % a_extents[a_atoms, 1],
+			a_ranks % a_extents[a_atoms, 2]
+		), axis=1)
+		a_first = a_blocks * i_block_points - a_centers[a_atoms]		# First point of the blocks, relative to the atoms
+		a_last = a_first + i_block_points - 1							# Last point of the blocks, relative to the atoms
+		a_near = np.maximum(np.maximum(a_first, -a_last), 0)			# Offsets of the point of the blocks closest to the atoms
+		a_far = np.maximum(-a_first, a_last)							# Offsets of the point of the blocks farthest from the atoms
+		a_reached = measure_offsets(a_offsets=a_near, s_geometry=s_geometry) <= measure_radius(a_radius=a_radius[a_atoms], s_geometry=s_geometry)		# The atom reaches the block
+
+		l_a_indexes.append(np.ravel_multi_index(tuple(a_blocks[a_reached].T), t_block_shape))
+		l_a_atoms.append(a_atoms[a_reached])
+		l_a_groups.append(a_owners[a_atoms[a_reached]])
+		l_a_full.append(measure_offsets(a_offsets=a_far[a_reached], s_geometry=s_geometry) <= measure_radius(a_radius=a_radius[a_atoms[a_reached]], s_geometry=s_geometry))
+	# End for
+	# END STEP 1 ---------------------------------------- #
+
+
+	# STEP 2 : Classifying the blocks ------------------- #
+	a_indexes = np.concatenate(l_a_indexes + [np.empty(0, dtype=np.int64)])		# Block of every pair of block and atom
+	a_atoms = np.concatenate(l_a_atoms + [np.empty(0, dtype=np.int64)])			# Atom of every pair
+	a_groups = np.concatenate(l_a_groups + [np.empty(0, dtype=np.int64)])		# Group of every pair
+	a_full = np.concatenate(l_a_full + [np.empty(0, dtype=bool)])				# If the atom of the pair covers its whole block
+	a_order = np.lexsort((a_groups, a_indexes))									# Sorts the pairs by block, then by group
+	a_indexes, a_atoms, a_groups, a_full = a_indexes[a_order], a_atoms[a_order], a_groups[a_order], a_full[a_order]
+
+	a_blocks, a_starts = np.unique(a_indexes, return_index=True)		# Reached blocks and their first pair
+	a_last_groups = np.maximum.reduceat(a_groups, a_starts) if len(a_starts) > 0 else np.empty(0, dtype=np.int64)		# Last group reaching each block
+	a_full_groups = np.maximum.reduceat(np.where(a_full, a_groups, -1), a_starts) if len(a_starts) > 0 else np.empty(0, dtype=np.int64)		# Last group covering each block
+	a_mixed = a_full_groups != a_last_groups		# The last group reaching the block does not cover it
+	a_values = np.zeros(len(a_blocks), dtype=np.uint8)		# Value of the group covering each block
+	a_values[a_full_groups >= 0] = a_codes[a_full_groups[a_full_groups >= 0]]
+	a_kept = a_mixed | (a_values != 0)				# Non empty blocks
+
+	a_block_table = np.zeros(np.count_nonzero(a_kept), dtype=np.dtype([		# The non empty blocks
+		("block_index", np.int64),
+		("element_symbol", np.uint8),
+		("block_row", np.int32)
+	]))
+	a_block_table["block_index"] = a_blocks[a_kept]
+	a_block_table["element_symbol"] = np.where(a_mixed, 0, a_values)[a_kept]
+	a_block_table["block_row"] = np.where(a_mixed, np.cumsum(a_mixed) - 1, -1)[a_kept]
+	a_block_points = np.empty((np.count_nonzero(a_mixed), i_block_size), dtype=np.uint8)		# Points of the mixed blocks
+	a_block_points[...] = a_values[a_mixed][:, np.newaxis]										# Starting with the value of the group covering them
+	# END STEP 2 ---------------------------------------- #
+
+
+	# STEP 3 : Refining the mixed blocks ---------------- #
+	a_pair_blocks = np.searchsorted(a_blocks, a_indexes)								# Reached block of each pair
+	a_rows = np.where(a_mixed, np.cumsum(a_mixed) - 1, -1)[a_pair_blocks]				# Row of the block of each pair
+	a_refined = (a_rows >= 0) & (a_groups > a_full_groups[a_pair_blocks])				# Pairs changing the points of a mixed block
+	a_rows, a_atoms, a_indexes, a_groups = a_rows[a_refined], a_atoms[a_refined], a_indexes[a_refined], a_groups[a_refined]
+	i_chunk_pairs = max(i_chunk_points // i_block_size, 1)				# Number of pairs computed at once
+	o_word_type = np.uint64 if i_block_size % 8 == 0 else np.uint8		# The points of a block are merged by words when possible
+
+	# For each group, in order
+	for i_group in np.unique(a_groups):
+		a_pairs = np.flatnonzero(a_groups == i_group)		# Pairs of the group
+
+		# For each chunk of pairs
+		for i_start in range(0, len(a_pairs), i_chunk_pairs):
+			a_chunk = a_pairs[i_start:i_start + i_chunk_pairs]		# Pairs of the chunk
+			a_first = (																				# First point of the blocks, relative to the atoms
+				np.array(np.unravel_index(a_indexes[a_chunk], t_block_shape)).T * i_block_points
+				- a_centers[a_atoms[a_chunk]]
+			).astype(np.int32)
+			a_covered = measure_block_points(				# Points of the blocks covered by the atoms
+				a_first=a_first,
+				i_block_points=i_block_points,
+				s_geometry=s_geometry
+			) <= measure_radius(a_radius=a_radius[a_atoms[a_chunk]], s_geometry=s_geometry)[:, np.newaxis]
+
+			a_chunk_rows, a_starts = np.unique(a_rows[a_chunk], return_index=True)		# Blocks of the chunk, the pairs are sorted by block
+			a_covered = np.bitwise_or.reduceat(											# Points covered by any atom of the group, for each block
+				np.ascontiguousarray(a_covered).view(o_word_type),
+				a_starts,
+				axis=0
+			).view(bool)
+			a_block_points[a_chunk_rows] = np.where(a_covered, a_codes[i_group], a_block_points[a_chunk_rows])		# The same value for the whole group
+		# End for
+	# End for
+	# END STEP 3 ---------------------------------------- #
+
+
+	# STEP 4 : Returning the grid ----------------------- #
+	return a_block_table, a_block_points		# Returns the non empty blocks and the points of the mixed blocks
+	# END STEP 4 ---------------------------------------- #
+
+# ---------------------------------------------------------------------------- #
+
+
+
+# Auxiliary functions -------------------------------------------------------- #
+
+def measure_offsets(a_offsets, s_geometry):
+	"""
+	Measures the length of offsets in the grid geometry, the euclidean lengths are squared to stay integers
+	:param a_offsets: Array of offsets, the last axis holds the x, y and z offsets
+	:param s_geometry: The sphere geometry, 'taxicab', 'uniform' or 'sphere'
+	:return: The length of each offset
+	"""
+
+	# If the grid geometry is a taxicab
+	if s_geometry.upper() in ("TAXICAB", "MANHATTAN"):
+		return np.sum(np.abs(a_offsets), axis=-1)		# Sum of the absolute differences
+
+	# If the grid geometry is uniform
+	if s_geometry.upper() in ("UNIFORM", "MINKOWSKI"):
+		return np.max(np.abs(a_offsets), axis=-1)		# Largest absolute difference
+
+	return np.sum(a_offsets ** 2, axis=-1)		# Squared euclidean distance
+# End function ------------------------------------------ #
+
+
+def measure_block_points(a_first, i_block_points, s_geometry):
+	"""
+	Measures the length of the offsets of every point of blocks, from the offset of their first point
+		The lengths are combined axis by axis, the offsets of every point are never created
+	:param a_first: Array of the offsets of the first point of each block, one row per block
+	:param i_block_points: Number of points along each axis of a block
+	:param s_geometry: The sphere geometry, 'taxicab', 'uniform' or 'sphere'
+	:return: The length of the offset of each point of each block, one row per block
+	"""
+
+	# Preparing variables
+	a_offsets = a_first[:, :, np.newaxis] + np.arange(i_block_points, dtype=np.int32)		# Offsets along each axis, for each block
+	a_x = a_offsets[:, 0, :, np.newaxis, np.newaxis]		# Offsets along the x axis
+	a_y = a_offsets[:, 1, np.newaxis, :, np.newaxis]		# Offsets along the y axis
+	a_z = a_offsets[:, 2, np.newaxis, np.newaxis, :]		# Offsets along the z axis
+
+	# If the grid geometry is a taxicab
+	if s_geometry.upper() in ("TAXICAB", "MANHATTAN"):
+		a_lengths = np.abs(a_x) + np.abs(a_y) + np.abs(a_z)		# Sum of the absolute differences
+
+	# If the grid geometry is uniform
+	elif s_geometry.upper() in ("UNIFORM", "MINKOWSKI"):
+		a_lengths = np.maximum(np.maximum(np.abs(a_x), np.abs(a_y)), np.abs(a_z))		# Largest absolute difference
+
+	# If the grid geometry is a classic sphere
+	else:
+		a_lengths = a_x ** 2 + a_y ** 2 + a_z ** 2		# Squared euclidean distance
+	# End if
+
+	return a_lengths.reshape(len(a_first), -1)		# Returns the lengths, in the order of the points of the blocks
+# End function ------------------------------------------ #
+
+
+def measure_radius(a_radius, s_geometry):
+	"""
+	Converts radius to the lengths returned by measure_offsets
+	:param a_radius: Array of radius, in grid points
+	:param s_geometry: The sphere geometry, 'taxicab', 'uniform' or 'sphere'
+	:return: The length of each radius
+	"""
+
+	# If the grid geometry is not euclidean
+	if s_geometry.upper() in ("TAXICAB", "MANHATTAN", "UNIFORM", "MINKOWSKI"):
+		return a_radius
+
+	return a_radius ** 2		# Squared euclidean radius
+# End function ------------------------------------------ #
+
+# ---------------------------------------------------------------------------- #
+
+
+
+# Reference ------------------------------------------------------------------ #
+
+# Importation
+# from rasterize_vdw_blocks import rasterize_vdw_blocks
+	# Generates a two levels grid of the VdW volumes, full blocks stored by value and mixed blocks refined point by point
+	# In : (t) grid shape, (l(t)) atoms grid coordinates, radius and value of each group, (s) sphere geometry,
+	# In : (i) points along each axis of a block, (i) maximal number of points at once
+	# Out : (a) sorted non empty blocks, (a) points of the mixed blocks
+
+# Usage
+# o_structure.a_blocks, o_structure.a_block_points = rasterize_vdw_blocks(		# Fills the blocks of the grid
+# 	t_grid_shape=tuple(self.a_grid_size),										# The shape of the grid
+# 	l_t_groups=l_t_groups,														# Atoms, radius and value of each group
+# 	s_geometry=d_parameters["s_grid_geometry"],									# The sphere geometry
+# 	i_block_points=d_parameters["i_block_points"]								# Points along each axis of a block
+# )
+
+# ---------------------------------------------------------------------------- #
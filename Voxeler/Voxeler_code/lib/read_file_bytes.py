@@ -0,0 +1,94 @@
+# Information ---------------------------------------------------------------- #
+# Author :	Julien Lenoir
+# Github :	Blackounet
+# Created : March 2021
+# Updated :
+# ---------------------------------------------------------------------------- #
+
+
+
+# Importations --------------------------------------------------------------- #
+
+# General library
+from lib.open_file_stream import open_file_stream
+	# Opens a file, a gzip file or a member of an archive for a binary reading
+	# In : (p) file's path
+	# Out : (f) the binary stream of the file
+from lib.terminate_program_process import terminate_program_process
+	# Stops the program and prints content
+	# In : (l(s)) content to prompt
+	# Out : None
+
+# ---------------------------------------------------------------------------- #
+
+
+
+# Main function -------------------------------------------------------------- #
+
+def read_file_bytes(p_file):
+	"""
+	Reads the raw content of a file in a single pass, newlines are translated to '\\n'
+		gzip files and members of archives, designated by 'archive::member', are read without being extracted
+	:param p_file: Path to the file to read
+	:return: The bytes of the file read
+	"""
+
+	# STEP 0 : Preparing variables ---------------------- #
+	l_s_logs = []		# A list for logs messages
+	x_content = b""		# Defines a buffer for the file's content
+	# END STEP 0 ---------------------------------------- #
+
+
+	# STEP 1 : Loading the file content ----------------- #
+	f_input = open_file_stream(		# Opens the file, decompresses it if needed
+		p_file=p_file				# Path to the file to read
+	)
+
+	# Tries to read the file
+	try:
+		x_content = f_input.read()		# Loads the file's content
+		f_input.close()					# Closes the input file
+
+	# If the file cannot be read
+	except (OSError, EOFError):
+		l_s_logs.append(		# Defines the error's message
+			"ERROR : Impossible to read the '"
+			+ p_file
+			+ "' file"
+		)
+		terminate_program_process(		# Stops the program
+			l_s_content=l_s_logs		# Content to save in the logs
+		)
+	# End try
+	# END STEP 1 ---------------------------------------- #
+
+
+	# STEP 2 : Translating the newlines ----------------- #
+	# If the file contains carriage returns
+	if b"\r" in x_content:
+		x_content = x_content.replace(b"\r\n", b"\n").replace(b"\r", b"\n")		# Uses the same newlines as a text reading
+	# END STEP 2 ---------------------------------------- #
+
+
+	# STEP 3 : Returning the content of the file -------- #
+	return x_content		# Returns content
+	# END STEP 3 ---------------------------------------- #
+
+# ---------------------------------------------------------------------------- #
+
+
+
+# Reference ------------------------------------------------------------------ #
+
+# Importation
+# from read_file_bytes import read_file_bytes
+	# Extracts the raw content of a file
+	# In : (p) file's path
+	# Out : (x) the file's bytes
+
+# Usage
+# read_file_bytes(		# Retrieves the raw content of the file
+# 	p_file=p_file,		# Path to the file to read
+# )
+
+# ---------------------------------------------------------------------------- #
@@ -14,11 +14,11 @@
 import numpy as np
 	# Optimized arrays
 
-# Program external resources
-from resources import elements
-	# Contains chemical elements properties
-
 # General library
+from lib.load_element_registry import load_element_registry, find_element_codes
+	# Loads the symbol, mass and VdW radius of each element code
+	# In : None
+	# Out : (d) the dictionary of the element properties arrays
 from lib.terminate_program_process import terminate_program_process
 	# Stops the program and prints content
 	# In : (l(s)) content to prompt
@@ -42,7 +42,7 @@ def retrieve_element_mass(x_element_symbol, x_backup_symbol):
 
 
 	# STEP 1 : Retrieving the element mass -------------- #
-	d_element_mass = {key.symbol: elements.ELEMENTS[key.symbol].mass for key in elements.ELEMENTS}
+	a_f_masses = load_element_registry()["a_f_masses"]		# Atomic mass of each element code
 	# END STEP 1 ---------------------------------------- #
 
 
@@ -50,32 +50,39 @@ def retrieve_element_mass(x_element_symbol, x_backup_symbol):
 	# If the element to convert is a numpy array
 	if isinstance(x_element_symbol, np.ndarray):
 
-		a_element_mass = np.zeros(len(x_element_symbol)).astype(np.float32)		# Creates an empty array for the elements mass
-		x_element_symbol.tolist()												# Converts the numpy array into a Python list
-
-		# For each element to process
-		for i_element in range(len(x_element_symbol)):
+		a_codes = find_element_codes(a_symbols=x_element_symbol)		# Retrieves the code of each element
+		a_missing = a_codes == -1										# Elements with an unknown symbol
 
-			# Tries to retrieve the element mass
-			try:
-				a_element_mass[i_element] = d_element_mass[x_element_symbol[i_element]]		# Retrieves the mass of the element
+		# If some element symbols are unknown
+		if np.any(a_missing):
+			a_codes[a_missing] = find_element_codes(		# Retrieves the code of the backup symbols
+				a_symbols=np.asarray(x_backup_symbol)[a_missing]
+			)
 
-			# If there is a symbol error
-			except KeyError:
-				a_element_mass[i_element] = d_element_mass[x_backup_symbol[i_element]]		# Retrieves the mass of the element
+			# If some backup symbols are also unknown
+			if np.any(a_codes == -1):
+				l_s_logs.append("ERROR : Unknown element symbol '{}'".format(x_element_symbol[a_codes == -1][0]))		# Defines the error message
+				terminate_program_process(		# Stops the program
+					l_s_content=l_s_logs		# Content to save to logs
+				)
+		# End if
 
-		return a_element_mass		# Returns the array of mass
+		return a_f_masses[a_codes].astype(np.float32)		# Returns the array of mass
 
 	# If the element to convert is a string
 	elif isinstance(x_element_symbol, str):
 
-		# Tries to retrieve the element mass
-		try:
-			return d_element_mass[x_element_symbol]		# Retrieves the mass of the element
+		a_codes = find_element_codes(a_symbols=np.array([x_element_symbol, x_backup_symbol]))		# Retrieves the code of the element and of its backup
+		i_code = a_codes[0] if a_codes[0] != -1 else a_codes[1]									# Uses the backup if the element symbol is unknown
+
+		# If the backup symbol is also unknown
+		if i_code == -1:
+			l_s_logs.append("ERROR : Unknown element symbol '{}'".format(x_element_symbol))		# Defines the error message
+			terminate_program_process(		# Stops the program
+				l_s_content=l_s_logs		# Content to save to logs
+			)
 
-		# If there is a symbol error
-		except KeyError:
-			return d_element_mass[x_backup_symbol]  # Retrieves the mass of the element
+		return float(a_f_masses[i_code])		# Retrieves the mass of the element
 
 	# If the argument type is wrong
 	else:
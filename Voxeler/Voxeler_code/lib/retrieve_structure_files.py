@@ -0,0 +1,171 @@
+# Information ---------------------------------------------------------------- #
+# Author :	Julien Lenoir
+# Github :	Blackounet
+# Created : March 2021
+# Updated :
+# ---------------------------------------------------------------------------- #
+
+
+
+# Importations --------------------------------------------------------------- #
+
+# Universal modules
+from fnmatch import fnmatch
+	# Matches a file name against a pattern
+import tarfile
+	# Reads the members of tar archives
+import zipfile
+	# Reads the members of zip archives
+
+# General library
+from lib.retrieve_specific_files import retrieve_specific_files
+	# Retrieves files path, recursively or not, matching a specific pattern, or not
+	# In : (p) directory to retrieve files from, (s) pattern to match,
+	# In : (b) if the search needs to be recursive, (i) minimum number of match,
+	# In : (i) maximum number of match
+	# Out : (l(p)) a list of the file paths founds
+from lib.terminate_program_process import terminate_program_process
+	# Stops the program and prints content
+	# In : (l(s)) content to prompt
+	# Out : None
+
+# ---------------------------------------------------------------------------- #
+
+
+
+# Main function -------------------------------------------------------------- #
+
+def retrieve_structure_files(p_directory, b_recursive=False, i_min_match=1, i_max_match=999999):
+	"""
+	Retrieves the PDB and mmCIF files of a directory, plain or gzip compressed, and the structure files stored in archives
+		The archives are not extracted, their members are designated by 'archive::member'
+	:param p_directory: Path to the directory to explore
+	:param b_recursive: If the search needs to be recursive
+	:param i_min_match: Minimum number of match
+	:param i_max_match: Maximum number of match
+	:return: The list of files path to be returned
+	"""
+
+	# STEP 0 : Preparing variables ---------------------- #
+	l_s_logs = []											# A list for logs messages
+	l_p_files = []											# The list of structure files found
+	l_s_patterns = ["*.pdb", "*.ent", "*.cif", "*.pdb.gz", "*.ent.gz", "*.cif.gz"]		# Patterns of the structure files
+	l_s_archive_patterns = ["*.tar", "*.tar.gz", "*.tgz", "*.zip"]	# Patterns of the archives
+	# END STEP 0 ---------------------------------------- #
+
+
+	# STEP 1 : Retrieving the structure files ----------- #
+	# For each pattern of structure file
+	for s_pattern in l_s_patterns:
+		l_p_files.extend(retrieve_specific_files(		# Retrieves the structure files
+			p_directory=p_directory,					# Path to the input directory
+			s_pattern=s_pattern,						# Pattern to match within the directories
+			b_recursive=b_recursive,					# Also searches in the subdirectories
+			i_min_match=0,								# The number of files is checked at the end
+			i_max_match=999999							# The number of files is checked at the end
+		))
+	# END STEP 1 ---------------------------------------- #
+
+
+	# STEP 2 : Retrieving the archived structure files -- #
+	# For each pattern of archive
+	for s_archive_pattern in l_s_archive_patterns:
+
+		# For each archive found
+		for p_archive in retrieve_specific_files(		# Retrieves the archives
+			p_directory=p_directory,					# Path to the input directory
+			s_pattern=s_archive_pattern,				# Pattern to match within the directories
+			b_recursive=b_recursive,					# Also searches in the subdirectories
+			i_min_match=0,								# Archives are optional
+			i_max_match=999999							# Archives are optional
+		):
+
+			# For each member of the archive
+			for s_member in list_archive_members(p_archive=p_archive):
+
+				# If the member is a structure file
+				if any([fnmatch(s_member.split('/')[-1], s_pattern) for s_pattern in l_s_patterns]):
+					l_p_files.append(p_archive + "::" + s_member)		# Saves the member
+	# End for
+	# END STEP 2 ---------------------------------------- #
+
+
+	# STEP 3 : Security check --------------------------- #
+	# If there is less than the requested amount of file
+	if len(l_p_files) < i_min_match:
+		l_s_logs.append("ERROR : Not enough files in '{}', at least '{}' files were expected".format(p_directory, i_min_match))		# Defines the error message
+		terminate_program_process(		# Stops the program
+			l_s_content=l_s_logs		# Content to save in the logs
+		)
+
+	# If there is more than the requested amount of file
+	if len(l_p_files) > i_max_match:
+		l_s_logs.append("ERROR : Too many files in '{}', no more than '{}' files were expected".format(p_directory, i_max_match))		# Defines the error message
+		terminate_program_process(		# Stops the program
+			l_s_content=l_s_logs		# Content to save in the logs
+		)
+	# END STEP 3 ---------------------------------------- #
+
+
+	# STEP 4 : Returning valid file paths --------------- #
+	return l_p_files		# Returns the list of matched paths
+	# END STEP 4 ---------------------------------------- #
+
+# ---------------------------------------------------------------------------- #
+
+
+
+# Auxiliary functions -------------------------------------------------------- #
+
+def list_archive_members(p_archive):
+	"""
+	Lists the regular files stored in a tar or zip archive
+	:param p_archive: Path to the archive
+	:return: The list of the members names
+	"""
+
+	l_s_logs = []		# A list for logs messages
+
+	# Tries to read the archive
+	try:
+
+		# If the archive is a zip file
+		if zipfile.is_zipfile(p_archive):
+			with zipfile.ZipFile(p_archive, "r") as o_archive:
+				return [o_info.filename for o_info in o_archive.infolist() if not o_info.is_dir()]		# Lists the files
+
+		# If the archive is a tar file, compressed or not
+		with tarfile.open(p_archive, "r:*") as o_archive:
+			return [o_info.name for o_info in o_archive.getmembers() if o_info.isfile()]		# Lists the files
+
+	# If the archive cannot be read
+	except (OSError, EOFError, tarfile.TarError, zipfile.BadZipFile):
+		l_s_logs.append("ERROR : Impossible to read the '{}' archive".format(p_archive))		# Defines the error message
+		terminate_program_process(		# Stops the program
+			l_s_content=l_s_logs		# Content to save in the logs
+		)
+	# End try
+# End function ------------------------------------------ #
+
+# ---------------------------------------------------------------------------- #
+
+
+
+# Reference ------------------------------------------------------------------ #
+
+# Importation
+# from retrieve_structure_files import retrieve_structure_files
+	# Retrieves structure files path, plain, compressed or archived, recursively or not
+	# In : (p) directory to retrieve files from, (b) if the search needs to be recursive,
+	# In : (i) minimum number of match, (i) maximum number of match
+	# Out : (l(p)) a list of the file paths founds
+
+# Usage
+# l_p_input_pdb = retrieve_structure_files(		# Retrieves PDB paths
+# 	p_directory=p_input_pdb,					# Path to the input directory
+# 	b_recursive=False,							# Also searches in the subdirectories
+# 	i_min_match=1,								# Minimum number of files to retrieve
+# 	i_max_match=999999							# Maximum number of files to retrieve
+# )
+
+# ---------------------------------------------------------------------------- #
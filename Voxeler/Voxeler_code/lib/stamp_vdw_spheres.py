@@ -0,0 +1,247 @@
+# Information ---------------------------------------------------------------- #
+# Author :	Julien Lenoir
+# Github :	Blackounet
+# Created : March 2021
+# Updated :
+# ---------------------------------------------------------------------------- #
+
+
+
+# Importations --------------------------------------------------------------- #
+
+# Universal modules
+import numpy as np
+	# Allows Numpy array manipulation
+
+# ---------------------------------------------------------------------------- #
+
+
+
+# Main function -------------------------------------------------------------- #
+
+def stamp_vdw_spheres(l_a_grids, a_centers, a_sphere, l_x_values=None, i_chunk_points=4194304, a_marks=None):
+	"""
+	Fills the sphere of each atom of an element in the grids, the atoms are processed in their order
+		The atoms are stamped by chunks of bounded size, each chunk is written at once
+		A grid point covered by several atoms takes the value of the last one, as if the atoms were stamped one by one
+		Without values, each atom spreads the values found at its center when its turn comes
+	:param l_a_grids: The grids to fill, they share the same shape and can be flattened without copy, as a field of a grid
+	:param a_centers: Array of the grid coordinates of each atom, one row per atom
+	:param a_sphere: Array of the relative coordinates of the sphere points, one row per axis
+	:param l_x_values: For each grid, the value of each atom or a single value, None to spread the center values
+	:param i_chunk_points: Maximal number of sphere points stamped at once
+	:param a_marks: Array of int32 of the grids size used to mark the grid points, None to allocate it in memory
+	"""
+
+	# STEP 0 : Preparing variables ---------------------- #
+	t_grid_shape = l_a_grids[0].shape											# Shape of the grids
+	i_sphere_points = a_sphere.shape[1]											# Number of points in the sphere
+	i_chunk_atoms = max(i_chunk_points // max(i_sphere_points, 1), 1)			# Number of atoms stamped at once
+	a_centers = np.asarray(a_centers).reshape(-1, 3).astype(np.int64)			# Coordinates of the atoms
+	a_offsets = (																# Grid index offset of each sphere point
+		a_sphere[0].astype(np.int64) * t_grid_shape[1] * t_grid_shape[2]
+		+ a_sphere[1].astype(np.int64) * t_grid_shape[2]
+		+ a_sphere[2].astype(np.int64)
+	)
+	l_a_flat_grids = []															# Flat views of the grids
+
+	# For each grid to fill
+	for a_grid in l_a_grids:
+		a_flat_grid = a_grid.view()				# A view of the grid
+		a_flat_grid.shape = (a_grid.size,)		# Flattens the view, fails if the grid would be copied
+		l_a_flat_grids.append(a_flat_grid)		# Saves the flat view
+
+	b_individual = l_x_values is None or any([np.ndim(x_values) > 0 for x_values in l_x_values])		# If the atoms have their own values
+
+	# If the marks are given
+	if a_marks is not None:
+		a_marks = a_marks.reshape(-1)		# Flat view of the marks
+
+	# If the marks are needed
+	elif b_individual:
+		a_marks = np.empty(int(np.prod(t_grid_shape)), dtype=np.int32)		# Marks of the grid points, only the current marks are read
+	# END STEP 0 ---------------------------------------- #
+
+
+	# STEP 1 : Stamping each chunk of atoms ------------- #
+	# For each chunk of atoms
+	for i_start in range(0, len(a_centers), i_chunk_atoms):
+		a_chunk = a_centers[i_start:i_start + i_chunk_atoms]		# Coordinates of the atoms of the chunk
+		b_wrapped = False											# If some sphere points have negative coordinates
+
+		# For each axis x, y and z
+		for i_axis in range(3):
+
+			# If some sphere points are outside of the grid, negative coordinates are read from the end as by Numpy
+			if np.min(a_chunk[:, i_axis]) + np.min(a_sphere[i_axis]) < -t_grid_shape[i_axis] or \
+					np.max(a_chunk[:, i_axis]) + np.max(a_sphere[i_axis]) >= t_grid_shape[i_axis]:
+				raise IndexError("The VdW spheres exceed the grid on axis {}".format(i_axis))
+
+			b_wrapped = b_wrapped or np.min(a_chunk[:, i_axis]) + np.min(a_sphere[i_axis]) < 0
+		# End for
+
+		a_center_points = np.ravel_multi_index(tuple(a_chunk.T), t_grid_shape, mode="wrap")		# Grid index of each atom center
+
+		# If the sphere points are read from the end of the grid
+		if b_wrapped:
+			a_points = np.ravel_multi_index((							# Grid index of each sphere point of each atom
+				a_chunk[:, 0:1] + a_sphere[0],							# X coordinates
+				a_chunk[:, 1:2] + a_sphere[1],							# Y coordinates
+				a_chunk[:, 2:3] + a_sphere[2]							# Z coordinates
+			), t_grid_shape, mode="wrap").ravel()
+
+		# If every sphere point is within the grid
+		else:
+			a_points = (a_center_points[:, np.newaxis] + a_offsets).ravel()		# Grid index of each sphere point of each atom
+
+		# If every atom has the same values
+		if not b_individual:
+
+			# For each grid to fill
+			for a_grid, x_values in zip(l_a_flat_grids, l_x_values):
+				a_grid[a_points] = x_values		# Fills the grid points
+
+			continue
+		# End if
+
+		a_owners = find_last_atoms(				# Last atom covering the point of each sphere point
+			a_marks=a_marks,
+			a_points=a_points,
+			i_sphere_points=i_sphere_points
+		)
+
+		# If the atoms spread the values found at their center
+		if l_x_values is None:
+			a_sources = a_center_points[find_center_sources(		# Center of the atom whose values are spread by each atom
+				a_marks=a_marks,
+				a_center_points=a_center_points,
+				a_points=a_points,
+				i_sphere_points=i_sphere_points
+			)]
+
+			# For each grid to fill
+			for a_grid in l_a_flat_grids:
+				a_grid[a_points] = a_grid[a_sources][a_owners]		# Fills the grid points
+
+		# If the values of the atoms are given
+		else:
+
+			# For each grid to fill
+			for a_grid, x_values in zip(l_a_flat_grids, l_x_values):
+
+				# If every atom has the same value
+				if np.ndim(x_values) == 0:
+					a_grid[a_points] = x_values		# Fills the grid points
+
+				# If each atom has its own value
+				else:
+					a_grid[a_points] = np.asarray(x_values)[i_start:i_start + i_chunk_atoms][a_owners]		# Fills the grid points
+		# End if
+	# End for
+	# END STEP 1 ---------------------------------------- #
+
+# ---------------------------------------------------------------------------- #
+
+
+
+# Auxiliary functions -------------------------------------------------------- #
+
+def find_last_atoms(a_marks, a_points, i_sphere_points):
+	"""
+	Finds the last atom covering each grid point, by marking the points with the position of the sphere points
+		The marks are checked, so the result does not depend on the order of the repeated writes
+	:param a_marks: Array of marks of the grid points, its previous content is ignored
+	:param a_points: Grid index of each sphere point, grouped by atom
+	:param i_sphere_points: Number of points in the sphere
+	:return: The last atom covering the point of each sphere point
+	"""
+
+	a_positions = np.arange(len(a_points), dtype=np.int32)		# Position of each sphere point
+	a_marks[a_points] = a_positions								# Marks the grid points with the sphere points
+
+	# While some grid points are not marked with their last sphere point
+	while True:
+		a_owners = a_marks[a_points]							# Sphere point marking the grid point of each sphere point
+		a_lost = np.flatnonzero(a_owners < a_positions)		# Sphere points coming after the mark
+
+		# If every grid point is marked with its last sphere point
+		if len(a_lost) == 0:
+			break
+
+		a_marks[a_points[a_lost]] = a_positions[a_lost]		# Marks the grid points again
+	# End while
+
+	return a_owners // i_sphere_points		# Returns the atom of the last sphere points
+# End function ------------------------------------------ #
+
+
+def find_center_sources(a_marks, a_center_points, a_points, i_sphere_points):
+	"""
+	Finds, for each atom, the atom of the chunk whose values are found at its center when its turn comes
+		The center of an atom holds the values spread by the last previous atom covering it, the chain is followed back
+		to an atom whose center is not covered by a previous atom of the chunk
+	:param a_marks: Array of marks of the grid points, its previous content is ignored
+	:param a_center_points: Grid index of each atom center
+	:param a_points: Grid index of each sphere point of each atom
+	:param i_sphere_points: Number of points in the sphere
+	:return: The array of the source atom of each atom
+	"""
+
+	i_atom_count = len(a_center_points)												# Number of atoms in the chunk
+	a_centers, a_center_ids = np.unique(a_center_points, return_inverse=True)		# Distinct centers
+
+	a_marks[a_centers] = np.arange(len(a_centers), dtype=np.int32)		# Marks the centers
+	a_hit_centers = a_marks[a_points]									# Center possibly covered by each sphere point
+	a_hits = np.flatnonzero(											# Sphere points really covering a center
+		(a_hit_centers >= 0) & (a_hit_centers < len(a_centers))
+	)
+	a_hits = a_hits[a_centers[a_hit_centers[a_hits]] == a_points[a_hits]]
+
+	a_keys = np.unique(												# Covered center and covering atom, sorted
+		a_hit_centers[a_hits].astype(np.int64) * i_atom_count + a_hits // i_sphere_points
+	)
+	a_queries = a_center_ids.astype(np.int64) * i_atom_count + np.arange(i_atom_count)		# Center and turn of each atom
+	a_previous = np.searchsorted(a_keys, a_queries) - 1										# Last key before the turn of the atom
+
+	a_sources = np.arange(i_atom_count)									# Each atom keeps its own center values by default
+	a_covered = a_previous >= 0											# Atoms having a previous key
+	a_covered[a_covered] = a_keys[a_previous[a_covered]] // i_atom_count == a_center_ids[a_covered]		# Previous key on the same center
+	a_sources[a_covered] = a_keys[a_previous[a_covered]] % i_atom_count								# Last previous atom covering the center
+
+	# While some atoms are not linked to their source
+	while True:
+		a_next = a_sources[a_sources]		# Follows the chain of atoms
+
+		# If every chain is complete
+		if np.array_equal(a_next, a_sources):
+			break
+
+		a_sources = a_next		# Goes one step further
+	# End while
+
+	return a_sources		# Returns the source of each atom
+# End function ------------------------------------------ #
+
+# ---------------------------------------------------------------------------- #
+
+
+
+# Reference ------------------------------------------------------------------ #
+
+# Importation
+# from stamp_vdw_spheres import stamp_vdw_spheres
+	# Fills the sphere of each atom of an element in the grids, by chunks of atoms
+	# In : (l(a)) grids to fill, (a) atoms grid coordinates, (a) sphere relative coordinates,
+	# In : (l(a/i)) values of the atoms or None to spread the center values, (i) maximal number of points at once,
+	# In : (a) marks of the grid points or None
+	# Out : None
+
+# Usage
+# stamp_vdw_spheres(								# Fills the VdW sphere of each atom
+# 	l_a_grids=[o_structure.a_grid],				# The grids to fill
+# 	a_centers=l_l_elements[i_element][3],		# Grid coordinates of the atoms
+# 	a_sphere=l_l_elements[i_element][5],			# Relative coordinates of the sphere points
+# 	l_x_values=[l_l_elements[i_element][1]]		# Value of the atoms
+# )
+
+# ---------------------------------------------------------------------------- #
@@ -0,0 +1,236 @@
+# Information ---------------------------------------------------------------- #
+# Author :	Julien Lenoir
+# Github :	Blackounet
+# Created : March 2021
+# Updated :
+# ---------------------------------------------------------------------------- #
+
+
+
+# Importations --------------------------------------------------------------- #
+
+# General library
+from lib.open_file_stream import open_file_stream
+	# Opens a file, a gzip file or a member of an archive for a binary reading
+	# In : (p) file's path
+	# Out : (f) the binary stream of the file
+from lib.load_pdb_structure import load_pdb_structure
+	# Extracts a PDB structure from the cache or from the content, and applies filters
+	# In : (p) PDB file to extract, (d) parsing filters to apply, (p) cache directory,
+	# In : (x) the structure's bytes, (s) name of the structure
+	# Out : (o) the object containing the structure
+
+# ---------------------------------------------------------------------------- #
+
+
+
+# Main function -------------------------------------------------------------- #
+
+def stream_pdb_models(p_file, d_filters, p_cache=None):
+	"""
+	Reads a PDB file one line at a time and yields a PDB structure for each MODEL of the file
+		Only the lines written outside of the models and the current model are kept in memory
+		The lines written before the first model and after the last model are the shared data of every model, a first
+		reading of the file finds them, a second reading yields the models
+		A file without MODEL record yields a single structure, as a mmCIF file
+	:param p_file: Path to the PDB file to extract
+	:param d_filters: Dictionary of parsing filters to apply
+	:param p_cache: Path to the directory of cached structures, None disables the cache
+	:return: A generator of the PDB structures extracted, one for each model
+	"""
+
+	# STEP 0 : Preparing variables ---------------------- #
+	s_name = p_file.split("::")[-1].split('/')[-1].split('.')[0]			# Extracts the name of the structure
+	l_x_model = None										# Lines of the current model, None outside of a model
+	i_model_count = 0										# Number of models yielded
+	# END STEP 0 ---------------------------------------- #
+
+
+	# STEP 1 : Finding the shared data ------------------ #
+	# If the file is a mmCIF file
+	if p_file.split("::")[-1].replace(".gz", "").endswith(".cif"):
+		yield load_pdb_structure(		# Extracts the structure of the whole file
+			p_file=p_file,				# The mmCIF file to extract
+			d_filters=d_filters,		# The parsing filters to apply
+			p_cache=p_cache				# Directory of the cached structures
+		)
+		return
+
+	l_x_leading, l_x_trailing, b_models = find_shared_lines(		# Lines written outside of the models
+		p_file=p_file												# Path to the file to read
+	)
+
+	# If the file does not contain any model
+	if not b_models:
+		yield load_pdb_structure(				# Extracts the structure of the whole file
+			p_file=p_file,						# The PDB file being extracted
+			d_filters=d_filters,				# The parsing filters to apply
+			p_cache=p_cache,					# Directory of the cached structures
+			x_content=b"".join(l_x_leading)		# The content of the file
+		)
+		return
+	# END STEP 1 ---------------------------------------- #
+
+
+	# STEP 2 : Yielding each model ---------------------- #
+	# For each line of the file
+	for x_line in read_file_lines(p_file=p_file):
+
+		# If the line starts a new model
+		if x_line[:5] == b"MODEL":
+			l_x_model = [x_line]		# Starts the lines of the model
+
+		# If the line is outside of a model
+		elif l_x_model is None:
+			continue
+
+		# If the line ends the current model
+		elif x_line[:6] == b"ENDMDL":
+			l_x_model.append(x_line)		# Saves the last line of the model
+			i_model_count += 1				# A new model is complete
+
+			yield load_pdb_structure(														# Extracts the structure of the model
+				p_file=p_file,																# The PDB file being extracted
+				d_filters=d_filters,														# The parsing filters to apply
+				p_cache=p_cache,															# Directory of the cached structures
+				x_content=b"".join(l_x_leading + l_x_model + l_x_trailing),				# The content of the model
+				s_name="{}_{}".format(s_name, extract_model_serial(						# Name of the model
+					x_line=l_x_model[0],
+					i_default=i_model_count
+				))
+			)
+			l_x_model = None		# Frees the lines of the model
+
+		# If the line belongs to the current model
+		else:
+			l_x_model.append(x_line)		# Saves the line
+	# End for
+	# END STEP 2 ---------------------------------------- #
+
+
+	# STEP 3 : Yielding the unterminated model ---------- #
+	# If the last model is not terminated by an ENDMDL record
+	if l_x_model is not None:
+		i_model_count += 1		# The model is complete
+
+		yield load_pdb_structure(														# Extracts the structure of the model
+			p_file=p_file,																# The PDB file being extracted
+			d_filters=d_filters,														# The parsing filters to apply
+			p_cache=p_cache,															# Directory of the cached structures
+			x_content=b"".join(l_x_leading + l_x_model),								# The content of the model
+			s_name="{}_{}".format(s_name, extract_model_serial(						# Name of the model
+				x_line=l_x_model[0],
+				i_default=i_model_count
+			))
+		)
+	# End if
+	# END STEP 3 ---------------------------------------- #
+
+# ---------------------------------------------------------------------------- #
+
+
+
+# Auxiliary functions -------------------------------------------------------- #
+
+def read_file_lines(p_file):
+	"""
+	Reads a file one line at a time, with the same newlines as a text reading
+	:param p_file: Path to the file to read
+	:return: A generator of the lines of the file, as bytes
+	"""
+
+	f_input = open_file_stream(		# Opens the file, decompresses it if needed
+		p_file=p_file				# Path to the file to read
+	)
+
+	# For each line of the file
+	for x_line in f_input:
+
+		# If the line uses other newlines than '\n'
+		if b"\r" in x_line:
+			x_line = x_line.replace(b"\r\n", b"\n").replace(b"\r", b"\n")		# Uses the same newlines as a text reading
+
+		yield x_line
+	# End for
+
+	f_input.close()		# Closes the input file
+# End function ------------------------------------------ #
+
+
+def find_shared_lines(p_file):
+	"""
+	Reads a PDB file one line at a time and keeps the lines written before the first model and after the last model
+		The lines written between two models are ignored, as the lines following an unterminated model belong to it
+	:param p_file: Path to the PDB file to read
+	:return: The lines before the first model, the lines after the last model, if the file contains a model
+	"""
+
+	# Preparing variables
+	l_x_leading = []		# Lines written before the first model
+	l_x_trailing = []		# Lines written after the last terminated model
+	b_in_model = False		# If the current line belongs to a model
+	b_models = False		# If a model has been found
+
+	# For each line of the file
+	for x_line in read_file_lines(p_file=p_file):
+
+		# If the line starts a new model
+		if x_line[:5] == b"MODEL":
+			b_in_model = True		# The next lines belong to the model
+			b_models = True
+			l_x_trailing = []		# The previous lines are not after the last model
+
+		# If the line ends the current model
+		elif b_in_model and x_line[:6] == b"ENDMDL":
+			b_in_model = False		# The next lines are outside of the models
+
+		# If no model has been found yet
+		elif not b_models:
+			l_x_leading.append(x_line)		# Saves the line as leading data of every model
+
+		# If the line follows a terminated model
+		elif not b_in_model:
+			l_x_trailing.append(x_line)		# Saves the line as trailing data of every model
+	# End for
+
+	return l_x_leading, l_x_trailing, b_models		# Returns the shared lines
+# End function ------------------------------------------ #
+
+
+def extract_model_serial(x_line, i_default):
+	"""
+	Extracts the serial number written in a MODEL record
+	:param x_line: The MODEL record
+	:param i_default: The number to use if the record does not contain a serial number
+	:return: The serial number of the model, as a string
+	"""
+
+	s_serial = x_line[10:14].decode(errors="replace").strip()		# Serial number columns of the record
+
+	# If the record does not contain a serial number
+	if s_serial == "":
+		s_serial = str(i_default)		# Uses the position of the model in the file
+
+	return s_serial		# Returns the serial number
+# End function ------------------------------------------ #
+
+# ---------------------------------------------------------------------------- #
+
+
+
+# Reference ------------------------------------------------------------------ #
+
+# Importation
+# from stream_pdb_models import stream_pdb_models
+	# Extracts a PDB structure for each model of a file, one at a time
+	# In : (p) PDB file to extract, (d) parsing filters to apply, (p) cache directory
+	# Out : (g(o)) a generator of the objects containing the structures
+
+# Usage
+# for o_structure in stream_pdb_models(		# Extracts each model of the file
+# 	p_file=p_file,							# The PDB file to extract
+# 	d_filters=d_filters,					# The parsing filters to apply
+# 	p_cache=p_cache							# Directory of the cached structures
+# ):
+
+# ---------------------------------------------------------------------------- #
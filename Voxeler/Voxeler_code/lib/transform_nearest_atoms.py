@@ -0,0 +1,213 @@
+# Information ---------------------------------------------------------------- #
+# Author :	Julien Lenoir
+# Github :	Blackounet
+# Created : March 2021
+# Updated :
+# ---------------------------------------------------------------------------- #
+
+
+
+# Importations --------------------------------------------------------------- #
+
+# Universal modules
+import numpy as np
+	# Allows Numpy array manipulation
+from scipy import ndimage
+	# Allows distance transforms of Numpy arrays
+
+# ---------------------------------------------------------------------------- #
+
+
+
+# Main function -------------------------------------------------------------- #
+
+def transform_nearest_atoms(l_a_grids, a_centers, l_a_values, i_reach, s_geometry, a_radius=None, i_slab_points=8388608):
+	"""
+	Fills the grid points with the values of their nearest atom, found by a distance transform of the atom centers
+		The grids are transformed by slabs along the x axis, each slab is widened by the reach to find the atoms
+		around it and limited to the points within the reach, the cost is linear in the number of points and does not
+		depend on the radius
+		With the radius of each atom, the points within the radius of their nearest atom are filled, otherwise only the
+		non empty points of the first grid are relabelled
+		The atoms sharing a grid point are represented by the last one, the atoms at equal distances by the transform
+	:param l_a_grids: The grids to fill, they share the same shape, they can be the planes of a larger grid
+	:param a_centers: Array of the coordinates of each atom in the grids, one row per atom, outside of the grids on the
+	x axis only
+	:param l_a_values: For each grid, the array of the value of each atom
+	:param i_reach: Largest distance from a filled point to its nearest atom, in grid points
+	:param s_geometry: The sphere geometry, 'taxicab', 'uniform' or 'sphere'
+	:param a_radius: Array of the radius of each atom in grid points, None to relabel the non empty points
+	:param i_slab_points: Number of points of a slab, without its widening
+	"""
+
+	# STEP 0 : Preparing variables ---------------------- #
+	t_grid_shape = tuple(int(i_size) for i_size in l_a_grids[0].shape)						# Shape of the grids
+	i_reach = int(i_reach)																	# Points added on each side of a slab
+	i_slab_width = max(i_slab_points // max(t_grid_shape[1] * t_grid_shape[2], 1), 2 * i_reach, 1)		# Number of planes in a slab
+	a_centers = np.asarray(a_centers).reshape(-1, 3).astype(np.int64)						# Coordinates of the atoms
+	a_order = np.argsort(a_centers[:, 0], kind="stable")									# Atoms sorted along the x axis
+	a_sorted_x = a_centers[a_order, 0]														# Sorted x coordinates of the atoms
+	s_geometry = {"MANHATTAN": "TAXICAB", "MINKOWSKI": "UNIFORM"}.get(s_geometry.upper(), s_geometry.upper())		# Name of the geometry
+
+	# If the points are filled within the radius of their nearest atom
+	if a_radius is not None:
+		a_limits = np.asarray(a_radius).astype(np.int64)		# Largest distance of a filled point to each atom
+
+		# If the grid geometry is a classic sphere
+		if s_geometry not in ("TAXICAB", "UNIFORM"):
+			a_limits = a_limits ** 2		# Compared to the squared distances
+	# END STEP 0 ---------------------------------------- #
+
+
+	# STEP 1 : Filling each slab ------------------------ #
+	# For each slab of the grids
+	for i_start in range(0, t_grid_shape[0], i_slab_width):
+		i_end = min(i_start + i_slab_width, t_grid_shape[0])		# Plane following the last plane of the slab
+		a_atoms = np.sort(a_order[										# Atoms within the reach of the slab, in order
+			np.searchsorted(a_sorted_x, i_start - i_reach):np.searchsorted(a_sorted_x, i_end + i_reach)
+		])
+
+		# If no atom reaches the slab
+		if len(a_atoms) == 0:
+			continue
+
+		# If only the non empty points are relabelled
+		if a_radius is None:
+			a_filled = l_a_grids[0][i_start:i_end] != 0		# Points to relabel
+
+			# If the slab is empty
+			if not np.any(a_filled):
+				continue
+
+		a_low = np.maximum(np.min(a_centers[a_atoms], axis=0) - (0, i_reach, i_reach), 0)		# First point of the box around the atoms
+		a_high = np.minimum(np.max(a_centers[a_atoms], axis=0) + (1, i_reach + 1, i_reach + 1), t_grid_shape)		# Point following the box
+		a_low[0] = min(i_start, a_centers[a_atoms, 0].min())			# The box contains the planes of the slab
+		a_high[0] = max(i_end, a_centers[a_atoms, 0].max() + 1)
+		t_box = (slice(i_start, i_end),) + tuple(slice(int(i_low), int(i_high)) for i_low, i_high in zip(a_low[1:], a_high[1:]))		# Part of the slab within the reach of the atoms
+		a_owners = np.full(tuple(a_high - a_low), -1, dtype=np.int32)		# Atom found at each point of the box
+		a_owners[tuple((a_centers[a_atoms] - a_low).T)] = a_atoms			# The last atom of a point is written last
+
+		# If only the non empty points are relabelled
+		if a_radius is None:
+			a_filled = a_filled[(slice(None),) + t_box[1:]]		# The points further than the reach are never covered
+
+		a_indices = find_nearest_centers(			# Coordinates of the nearest center of each point of the box
+			a_background=a_owners < 0,				# The points without atom
+			s_geometry=s_geometry					# The sphere geometry
+		)[:, i_start - a_low[0]:i_end - a_low[0]]	# Only the planes of the slab itself
+
+		# If the points are filled within the radius of their nearest atom
+		if a_radius is not None:
+			a_nearest = a_owners[tuple(a_indices)]		# Nearest atom of each point of the slab
+			a_filled = measure_center_distances(		# Distance of each point to its nearest center
+				a_indices=a_indices,					# Coordinates of the nearest centers
+				i_first_plane=i_start - a_low[0],		# First plane of the slab in the box
+				s_geometry=s_geometry					# The sphere geometry
+			) <= a_limits[a_nearest]					# Points within the radius of their nearest atom
+			a_nearest = a_nearest[a_filled]				# Nearest atom of the filled points
+
+		# If only the non empty points are relabelled
+		else:
+			a_nearest = a_owners[tuple(a_index[a_filled] for a_index in a_indices)]		# Nearest atom of the filled points
+
+		# For each grid to fill
+		for a_grid, a_values in zip(l_a_grids, l_a_values):
+			a_slab = a_grid[t_box]									# The slab of the grid, without copy
+			a_slab[a_filled] = np.asarray(a_values)[a_nearest]		# Value of the nearest atom
+		# End for
+	# End for
+	# END STEP 1 ---------------------------------------- #
+
+# ---------------------------------------------------------------------------- #
+
+
+
+# Auxiliary functions -------------------------------------------------------- #
+
+def find_nearest_centers(a_background, s_geometry):
+	"""
+	Finds the coordinates of the nearest center of each point, with the distance transform of the geometry
+	:param a_background: The grid marking the points without center
+	:param s_geometry: The sphere geometry, 'TAXICAB', 'UNIFORM' or 'SPHERE'
+	:return: The coordinates of the nearest center of each point, one array per axis
+	"""
+
+	# If the grid geometry is a taxicab
+	if s_geometry == "TAXICAB":
+		return ndimage.distance_transform_cdt(		# Sum of the absolute differences
+			a_background, metric="taxicab", return_distances=False, return_indices=True
+		)
+
+	# If the grid geometry is uniform
+	if s_geometry == "UNIFORM":
+		return ndimage.distance_transform_cdt(		# Largest absolute difference
+			a_background, metric="chessboard", return_distances=False, return_indices=True
+		)
+
+	return ndimage.distance_transform_edt(		# Euclidean distance
+		a_background, return_distances=False, return_indices=True
+	)
+# End function ------------------------------------------ #
+
+
+def measure_center_distances(a_indices, i_first_plane, s_geometry):
+	"""
+	Measures the exact distance of each point to its nearest center, squared for the classic spheres
+	:param a_indices: The coordinates of the nearest center of each point, one array per axis
+	:param i_first_plane: Index of the first plane of the points in the coordinates of the centers
+	:param s_geometry: The sphere geometry, 'TAXICAB', 'UNIFORM' or 'SPHERE'
+	:return: The distance of each point to its nearest center, in grid points
+	"""
+
+	# Preparing variables
+	t_points = np.ogrid[tuple(		# Coordinates of the points, one array per axis
+		slice(i_first_plane * (i_axis == 0), i_first_plane * (i_axis == 0) + i_size)
+		for i_axis, i_size in enumerate(a_indices.shape[1:])
+	)]
+	a_distances = np.zeros(a_indices.shape[1:], dtype=np.int32)		# Distance of each point
+
+	# For each axis x, y and z
+	for a_index, a_point in zip(a_indices, t_points):
+		a_delta = np.abs(a_index - a_point.astype(np.int32))		# Difference along the axis
+
+		# If the grid geometry is a taxicab
+		if s_geometry == "TAXICAB":
+			a_distances += a_delta
+
+		# If the grid geometry is uniform
+		elif s_geometry == "UNIFORM":
+			np.maximum(a_distances, a_delta, out=a_distances)
+
+		# If the grid geometry is a classic sphere
+		else:
+			a_distances += a_delta * a_delta
+	# End for
+
+	return a_distances		# Returns the distances
+# End function ------------------------------------------ #
+
+# ---------------------------------------------------------------------------- #
+
+
+
+# Reference ------------------------------------------------------------------ #
+
+# Importation
+# from transform_nearest_atoms import transform_nearest_atoms
+	# Fills the grid points with the values of their nearest atom, with distance transforms by slabs of the grids
+	# In : (l(a)) grids to fill, (a) atoms grid coordinates, (l(a)) values of the atoms for each grid,
+	# In : (i) reach of the atoms, (s) sphere geometry, (a) radius of the atoms or None to relabel,
+	# In : (i) number of points of a slab
+	# Out : None
+
+# Usage
+# transform_nearest_atoms(								# Fills the points within the radius of their nearest atom
+# 	l_a_grids=[a_grid],									# The grid of the structure
+# 	a_centers=a_centers,								# Coordinates of the atoms in the grid
+# 	l_a_values=[a_codes],								# Element of each atom
+# 	i_reach=self.i_max_radius,							# Largest VdW radius
+# 	s_geometry=d_parameters["s_grid_geometry"],			# The sphere geometry
+# 	a_radius=a_radius									# VdW radius of each atom
+# )
+
+# ---------------------------------------------------------------------------- #
@@ -18,6 +18,10 @@ from config import global_parameters as gp
 	# Contains the global variables
 
 # General library
+from lib.count_set_bits import count_set_bits
+	# Counts the bits set in a bit-packed grid, or in both of two bit-packed grids, by 64 bits words
+	# In : (a) first bit-packed grid, (a) second bit-packed grid or None, (i) maximal number of words at once
+	# Out : (i) the number of bits set
 from lib.terminate_program_process import terminate_program_process
 	# Stops the program and prints content
 	# In : (l(s)) content to prompt
@@ -56,14 +60,14 @@ def compute_grid_similarity(d_parameters, o_first_structure, o_second_structure)
 	# STEP 1 : Determining the normalization value ------ #
 	if s_normalisation == "MIN":
 		i_normalize = min(										# Retrieves the minimal number of non empty points
-			np.count_nonzero(o_first_structure.a_grid),			# Counts the number of non empty points in the first grid
-			np.count_nonzero(o_second_structure.a_grid),		# Counts the number of non empty points in the second grid
+			gp.O_SYSTEM_COMPARISON.count_grid_points(o_first_structure),		# Counts the number of non empty points in the first grid
+			gp.O_SYSTEM_COMPARISON.count_grid_points(o_second_structure),		# Counts the number of non empty points in the second grid
 		)
 
 	elif s_normalisation == "MAX":
 		i_normalize = max(										# Retrieves the maximal number of non empty points
-			np.count_nonzero(o_first_structure.a_grid),			# Counts the number of non empty points in the first grid
-			np.count_nonzero(o_second_structure.a_grid),		# Counts the number of non empty points in the second grid
+			gp.O_SYSTEM_COMPARISON.count_grid_points(o_first_structure),		# Counts the number of non empty points in the first grid
+			gp.O_SYSTEM_COMPARISON.count_grid_points(o_second_structure),		# Counts the number of non empty points in the second grid
 		)
 
 	else:
@@ -72,10 +76,61 @@ def compute_grid_similarity(d_parameters, o_first_structure, o_second_structure)
 
 
 	# STEP 2 : Determining the similarity score --------- #
-	try:
-		f_similarity = (np.count_nonzero(
-			np.bitwise_and(o_first_structure.a_grid, o_second_structure.a_grid)) / i_normalize		# Computes the similarity percentage
+	# If the grids only store their non empty points
+	if gp.O_SYSTEM_COMPARISON.b_sparse_grid:
+		t_first_box, t_second_box = intersect_grid_boxes(		# Parts of the grids covering the same points
+			o_first_structure=o_first_structure,				# The first structure to compare
+			o_second_structure=o_second_structure				# The second structure to compare
+		)
+		i_shared = 0 if t_first_box is None else count_shared_voxels(		# Counts the points shared by the sparse grids
+			t_a_first_grid=(o_first_structure.a_voxels, o_first_structure.a_grid_size, t_first_box),		# The runs of the first grid
+			t_a_second_grid=(o_second_structure.a_voxels, o_second_structure.a_grid_size, t_second_box)		# The runs of the second grid
+		)
+
+	# If the grids store the covered part of each point
+	elif gp.O_SYSTEM_COMPARISON.b_fractional_grid:
+		t_first_box, t_second_box = intersect_grid_boxes(		# Parts of the grids covering the same points
+			o_first_structure=o_first_structure,				# The first structure to compare
+			o_second_structure=o_second_structure				# The second structure to compare
 		)
+		i_shared = 0 if t_first_box is None else measure_shared_volume(		# Sums the parts of the points covered in both grids
+			t_a_first_grid=(o_first_structure.a_grid[t_first_box], o_first_structure.a_occupancy[t_first_box]),
+			t_a_second_grid=(o_second_structure.a_grid[t_second_box], o_second_structure.a_occupancy[t_second_box])
+		)
+
+	# If the grids are made of blocks
+	elif gp.O_SYSTEM_COMPARISON.b_block_grid:
+		i_shared = count_shared_blocks(								# Counts the points shared by the grids of blocks
+			o_first_structure=o_first_structure,					# The first structure to compare
+			o_second_structure=o_second_structure,					# The second structure to compare
+			i_block_points=gp.O_SYSTEM_COMPARISON.i_block_points	# Points along each axis of a block
+		)
+
+	# If the grids only store the occupancy of their points
+	elif gp.O_SYSTEM_COMPARISON.b_packed_grid:
+		t_first_box, t_second_box = intersect_grid_boxes(		# Parts of the grids covering the same points, in words along z
+			o_first_structure=o_first_structure,				# The first structure to compare
+			o_second_structure=o_second_structure,				# The second structure to compare
+			i_last_axis_points=64								# Points in a word
+		)
+		i_shared = 0 if t_first_box is None else count_set_bits(											# Counts the points occupied in both grids, word by word
+			a_first_bits=o_first_structure.a_bit_grid.view(np.uint64).reshape(o_first_structure.a_grid_size // (1, 1, 64))[t_first_box],		# The occupancy of the first grid
+			a_second_bits=o_second_structure.a_bit_grid.view(np.uint64).reshape(o_second_structure.a_grid_size // (1, 1, 64))[t_second_box]	# The occupancy of the second grid
+		)
+
+	# If the grids are dense
+	else:
+		t_first_box, t_second_box = intersect_grid_boxes(		# Parts of the grids covering the same points
+			o_first_structure=o_first_structure,				# The first structure to compare
+			o_second_structure=o_second_structure				# The second structure to compare
+		)
+		i_shared = 0 if t_first_box is None else np.count_nonzero(np.bitwise_and(		# Counts the shared points
+			o_first_structure.a_grid[t_first_box],
+			o_second_structure.a_grid[t_second_box]
+		))
+
+	try:
+		f_similarity = i_shared / i_normalize		# Computes the similarity percentage
 
 	except ZeroDivisionError:
 		l_s_logs.append("ERROR : One grid does not contain any valid atom")		# Defines the error message
@@ -93,6 +148,166 @@ def compute_grid_similarity(d_parameters, o_first_structure, o_second_structure)
 
 
 
+# Auxiliary functions -------------------------------------------------------- #
+
+def intersect_grid_boxes(o_first_structure, o_second_structure, i_last_axis_points=1):
+	"""
+	Finds the parts of the grids of two structures covering the same points of the system lattice
+	:param o_first_structure: The first structure, loaded into a grid
+	:param o_second_structure: The second structure, loaded into a grid
+	:param i_last_axis_points: Number of points stored in one element of the grids along the z axis
+	:return: For each grid, the tuple of slices of the shared box, or None if the boxes do not intersect
+	"""
+
+	a_low = np.maximum(o_first_structure.a_grid_origin, o_second_structure.a_grid_origin)		# First shared point
+	a_high = np.minimum(																		# Point following the last shared point
+		o_first_structure.a_grid_origin + o_first_structure.a_grid_size,
+		o_second_structure.a_grid_origin + o_second_structure.a_grid_size
+	)
+	a_scale = np.array((1, 1, i_last_axis_points))		# Points stored in one element of the grids, for each axis
+
+	# If the boxes do not intersect
+	if np.any(a_high <= a_low):
+		return None, None
+
+	return tuple(		# Returns the shared box in each grid
+		tuple(
+			slice(int((i_low - i_origin) // i_scale), int((i_high - i_origin) // i_scale))
+			for i_low, i_high, i_origin, i_scale in zip(a_low, a_high, o_structure.a_grid_origin, a_scale)
+		)
+		for o_structure in (o_first_structure, o_second_structure)
+	)
+# End function ------------------------------------------ #
+
+
+def count_shared_voxels(t_a_first_grid, t_a_second_grid):
+	"""
+	Counts the points shared by two sparse grids, by merging their sorted runs of points along the z axis
+		The runs of each grid are indexed in the box of its structure, they are cut and indexed again in the shared box
+		A point is shared if both grids contain it with element codes having common bits, as the dense grids are compared
+	:param t_a_first_grid: The runs of the first grid sorted by grid index, the size of its box and the tuple of slices
+	of the shared box in its box
+	:param t_a_second_grid: The same for the second grid
+	:return: The number of shared points
+	"""
+
+	# Preparing variables
+	l_t_runs = []		# First point, following point and element code of the runs of each grid in the shared box
+
+	# For each grid
+	for a_runs, a_grid_size, t_box in (t_a_first_grid, t_a_second_grid):
+		i_plane_points = int(a_grid_size[1]) * int(a_grid_size[2])		# Number of points in a plane of the box
+		i_first, i_last = np.searchsorted(								# Runs of the planes of the shared box, the runs are sorted by plane
+			a_runs["grid_index"],
+			(t_box[0].start * i_plane_points, t_box[0].stop * i_plane_points)
+		)
+		a_runs = a_runs[i_first:i_last]
+		a_x, a_y, a_z = np.unravel_index(a_runs["grid_index"], tuple(a_grid_size))		# Coordinates of the first point of the runs
+		a_start = np.maximum(a_z, t_box[2].start)										# First point of the runs within the shared box
+		a_stop = np.minimum(a_z + a_runs["run_length"], t_box[2].stop)					# Point following the runs within the shared box
+		a_inside = (a_y >= t_box[1].start) & (a_y < t_box[1].stop) & (a_start < a_stop)		# Runs crossing the shared box
+		a_rows = np.ravel_multi_index(													# Row of the runs in the shared box
+			(a_x[a_inside] - t_box[0].start, a_y[a_inside] - t_box[1].start),
+			(t_box[0].stop - t_box[0].start, t_box[1].stop - t_box[1].start)
+		) * (t_box[2].stop - t_box[2].start) - t_box[2].start
+		l_t_runs.append((													# Runs in the shared box, still sorted
+			a_rows + a_start[a_inside],
+			a_rows + a_stop[a_inside],
+			a_runs["element_symbol"][a_inside]
+		))
+	# End for
+
+	# Pairing the runs overlapping each other, the runs of a grid do not overlap
+	a_first_starts, a_first_stops, a_first_codes = l_t_runs[0]			# Runs of the first grid
+	a_second_starts, a_second_stops, a_second_codes = l_t_runs[1]		# Runs of the second grid
+	a_low = np.searchsorted(a_second_stops, a_first_starts, side="right")		# First run of the second grid ending after each run
+	a_high = np.searchsorted(a_second_starts, a_first_stops, side="left")		# Run of the second grid following the last overlapping one
+	a_counts = np.maximum(a_high - a_low, 0)									# Number of runs overlapping each run
+	a_firsts = np.repeat(np.arange(len(a_counts)), a_counts)					# Run of the first grid of each pair
+	a_seconds = np.arange(len(a_firsts)) - np.repeat(np.cumsum(a_counts) - a_counts, a_counts) + a_low[a_firsts]		# Run of the second grid of each pair
+
+	a_overlaps = (																# Number of points shared by each pair
+		np.minimum(a_first_stops[a_firsts], a_second_stops[a_seconds])
+		- np.maximum(a_first_starts[a_firsts], a_second_starts[a_seconds])
+	)
+
+	return int(np.sum(		# Counts the points of the pairs with common element bits
+		a_overlaps[np.bitwise_and(a_first_codes[a_firsts], a_second_codes[a_seconds]) != 0],
+		dtype=np.int64
+	))
+# End function ------------------------------------------ #
+
+
+def measure_shared_volume(t_a_first_grid, t_a_second_grid):
+	"""
+	Sums the parts of the points covered in two fractional grids, in 64th of a point
+		A point shared with element codes having common bits counts for the smallest of its two covered parts
+	:param t_a_first_grid: The element codes and the covered parts of the points of the first grid
+	:param t_a_second_grid: The element codes and the covered parts of the same points in the second grid
+	:return: The shared volume, in 64th of a point
+	"""
+
+	a_shared = np.bitwise_and(t_a_first_grid[0], t_a_second_grid[0]) != 0		# Points with common element bits
+
+	return int(np.sum(		# Sums the smallest covered part of each shared point
+		np.minimum(t_a_first_grid[1], t_a_second_grid[1])[a_shared],
+		dtype=np.int64
+	))
+# End function ------------------------------------------ #
+
+
+def count_shared_blocks(o_first_structure, o_second_structure, i_block_points, i_chunk_blocks=1024):
+	"""
+	Counts the points shared by two grids of blocks, by merging their sorted block index
+		Two full blocks are compared at once, the points are only compared when one of the blocks is mixed
+	:param o_first_structure: The first structure, loaded into a grid of blocks
+	:param o_second_structure: The second structure, loaded into a grid of blocks
+	:param i_block_points: Number of points along each axis of a block
+	:param i_chunk_blocks: Maximal number of mixed blocks compared at once
+	:return: The number of shared points
+	"""
+
+	# Preparing variables
+	a_common, a_first_indexes, a_second_indexes = np.intersect1d(		# Blocks present in both grids
+		o_first_structure.a_blocks["block_index"],
+		o_second_structure.a_blocks["block_index"],
+		assume_unique=True,
+		return_indices=True
+	)
+	a_first_blocks = o_first_structure.a_blocks[a_first_indexes]		# Shared blocks of the first grid
+	a_second_blocks = o_second_structure.a_blocks[a_second_indexes]		# Shared blocks of the second grid
+	a_full = (a_first_blocks["block_row"] < 0) & (a_second_blocks["block_row"] < 0)		# Blocks full in both grids
+
+	i_shared = int(np.count_nonzero(np.bitwise_and(		# Counts the full blocks with common element bits
+		a_first_blocks["element_symbol"][a_full],
+		a_second_blocks["element_symbol"][a_full]
+	))) * i_block_points ** 3
+	a_first_blocks = a_first_blocks[~a_full]			# Blocks mixed in at least one grid
+	a_second_blocks = a_second_blocks[~a_full]
+
+	# For each chunk of blocks mixed in at least one grid
+	for i_start in range(0, len(a_first_blocks), i_chunk_blocks):
+		l_a_points = []		# Points of the chunk in each grid
+
+		# For each grid
+		for a_blocks, o_structure in ((a_first_blocks, o_first_structure), (a_second_blocks, o_second_structure)):
+			a_chunk = a_blocks[i_start:i_start + i_chunk_blocks]		# Blocks of the chunk
+			a_points = o_structure.a_block_points[np.maximum(a_chunk["block_row"], 0)] if len(o_structure.a_block_points) > 0 \
+				else np.zeros((len(a_chunk), i_block_points ** 3), dtype=np.uint8)		# Points of the mixed blocks
+			a_points[a_chunk["block_row"] < 0] = a_chunk["element_symbol"][a_chunk["block_row"] < 0, np.newaxis]		# Points of the full blocks
+			l_a_points.append(a_points)
+		# End for
+
+		i_shared += int(np.count_nonzero(np.bitwise_and(l_a_points[0], l_a_points[1])))		# Counts the points with common element bits
+	# End for
+
+	return i_shared		# Returns the number of shared points
+# End function ------------------------------------------ #
+
+# ---------------------------------------------------------------------------- #
+
+
+
 # Reference ------------------------------------------------------------------ #
 
 # Importation
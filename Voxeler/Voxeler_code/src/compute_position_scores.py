@@ -21,6 +21,12 @@ from sklearn.neighbors import KDTree
 from config import global_parameters as gp
 	# Contains the global variabless
 
+# General library
+from lib.find_grid_points import find_grid_points
+	# Finds the coordinates of the grid points fulfilling a condition, by slabs along the x axis
+	# In : (a) grid to scan, (f) condition on a slab of the grid, (i) maximal number of points at once
+	# Out : (a) coordinates of the points, one row per axis
+
 # ---------------------------------------------------------------------------- #
 
 
@@ -37,9 +43,10 @@ def compute_position_scores(d_parameters, o_system, o_structure):
 
 	# STEP 0 : Preparing variables ---------------------- #
 	i_water_code = gp.D_ELEMENT_NUMBER["OOW"]		# Retrieves the element code for water
-	o_system.l_l_tasks = np.array(np.where(			# Retrieves the list of positions marked as available for water molecules
-		o_structure.a_grid["element_symbol"] == i_water_code
-	)).T
+	o_system.l_l_tasks = find_grid_points(			# Retrieves the list of positions marked as available for water molecules
+		a_grid=o_structure.a_grid,
+		f_condition=lambda a_slab: a_slab["element_symbol"] == i_water_code
+	).T
 	o_system.l_l_tasks = (							# Retrieves the coordinates of the point to analyse and convert it in real space coordinates in Angstroms
 		o_system.l_l_tasks.astype(np.float64)		# The coordinates in the grid
 		- o_system.a_offset							# Updates with the system offset
@@ -111,9 +118,10 @@ def compute_position_scores(d_parameters, o_system, o_structure):
 		f_max_score = 0		# Sets a default score
 	a_results /= f_max_score						# Normalizes the scores
 
-	a_positions = np.array(np.where(		# Retrieves the list of positions marked as available for water molecules
-		o_structure.a_grid["element_symbol"] == i_water_code
-	)).T
+	a_positions = find_grid_points(		# Retrieves the list of positions marked as available for water molecules
+		a_grid=o_structure.a_grid,
+		f_condition=lambda a_slab: a_slab["element_symbol"] == i_water_code
+	).T
 
 	l_x_coords = []		# List used to store the x coordinates
 	l_y_coords = []		# List used to store the y coordinates
@@ -162,6 +170,11 @@ def compute_score_thread(i_position_index):
 		sort_results=True											# Sorts the neighbours by distances
 	)
 
+	# Retrieving the properties of the neighbouring atoms, once for every neighbour
+	a_residue_serials = o_structure.a_atoms.take("residue_serial", a_i_index[0])		# Serial number of the residue of each neighbour
+	a_chain_ids = o_structure.a_atoms.take("chain_id", a_i_index[0])					# Chain identifier of each neighbour
+	a_custom_types = o_structure.a_atoms.take("custom_type", a_i_index[0])			# Custom type of each neighbour
+
 	# Scoring positions
 	l_f_score = []						# Initializes the score
 	i_skipped_atoms = 0					# The number of atoms ignored
@@ -174,8 +187,8 @@ def compute_score_thread(i_position_index):
 		if d_parameters["b_scoring_per_residue"]:
 
 			s_residue_key = "{}_{}".format(												# Creates a key
-				o_structure.a_atoms["residue_serial"][a_i_index[0][i_neighbor]],		# Retrieves the serial number of the current residue
-				o_structure.a_atoms["chain_id"][a_i_index[0][i_neighbor]]				# Retrieves the chain identifier of the current residue
+				a_residue_serials[i_neighbor],		# Retrieves the serial number of the current residue
+				a_chain_ids[i_neighbor]				# Retrieves the chain identifier of the current residue
 			)
 
 			# If the atom is part of an already considered residue
@@ -189,7 +202,7 @@ def compute_score_thread(i_position_index):
 		# End if
 
 		s_interaction = "OOW_{}_{}".format(
-			o_structure.a_atoms["custom_type"][a_i_index[0][i_neighbor]],
+			a_custom_types[i_neighbor],
 			i_neighbor + 1
 		)
 		f_score_buffer = o_system.retrieve_nearest_score(		# Gets the score of the interaction
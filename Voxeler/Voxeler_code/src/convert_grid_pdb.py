@@ -21,6 +21,10 @@ from config import global_parameters as gp
 
 # Classes
 # General library
+from lib.find_grid_points import find_grid_points
+	# Finds the coordinates of the grid points fulfilling a condition, by slabs along the x axis
+	# In : (a) grid to scan, (f) condition on a slab of the grid, (i) maximal number of points at once
+	# Out : (a) coordinates of the points, one row per axis
 # Specific modules
 
 #from Voxeler.Voxeler_code.src.save_density import create_dictionary
@@ -59,9 +63,10 @@ def convert_grid_pdb(d_parameters, o_system, o_structure):
 	# STEP 2 : ------------------------------------------ #
 
 	i_water_code = gp.D_ELEMENT_NUMBER["OOW"]		# Retrieves the element code for water
-	a_water_molecules = np.array(np.where(			# Retrieves the list of positions marked as available for water molecules
-		o_structure.a_grid["element_symbol"] == i_water_code
-	)).T
+	a_water_molecules = find_grid_points(			# Retrieves the list of positions marked as available for water molecules
+		a_grid=o_structure.a_grid,
+		f_condition=lambda a_slab: a_slab["element_symbol"] == i_water_code
+	).T
 
 	l_placed_scores = []
 	for i_obj in a_water_molecules:					# Retrieves the score assigned with each water position
@@ -10,8 +10,6 @@
 # Importations --------------------------------------------------------------- #
 
 # Universal modules
-import numpy as np
-	# Allows Numpy array manipulation
 import copy
 	# Allows true copy of elements
 
@@ -19,6 +17,12 @@ import copy
 import config.global_parameters as gp
 	# Contains the global variables
 
+# General library
+from lib.find_grid_points import find_grid_points
+	# Finds the coordinates of the grid points fulfilling a condition, by slabs along the x axis
+	# In : (a) grid to scan, (f) condition on a slab of the grid, (i) maximal number of points at once
+	# Out : (a) coordinates of the points, one row per axis
+
 # ---------------------------------------------------------------------------- #
 
 
@@ -61,7 +65,9 @@ def determine_structure_surface(d_parameters, o_system, o_structure):
 
 
 	# STEP 3 : Determining surface positions ------------ #
-	o_water_structure = copy.deepcopy(o_structure)		# Copies the structure to solubilize in order to work with water
+	o_water_structure = copy.copy(o_structure)									# Copies the structure to solubilize in order to work with water
+	o_water_structure.l_l_elements = [list(l_element) for l_element in o_structure.l_l_elements]		# Own radius and spheres of each element
+	o_water_structure.a_grid = o_system.copy_grid(o_structure.a_grid)			# Own grid, in the grid backend of the system
 	o_system.generate_vdw_spheres(					# Extends the VdW volume
 		o_structure=o_water_structure,				# The structure to solubilize
 		d_parameters=d_parameters,					# The parameters used for the extension of VdW radius around the structure
@@ -73,9 +79,10 @@ def determine_structure_surface(d_parameters, o_system, o_structure):
 		i_solubilization_radius=i_min_radius,		# The radius used for the VdW deletion
 		b_remove_volume=True						# Indicates the deletion of the selected volume
 	)
-	a_available_positions = np.array(np.where(		# Retrieves the number of non-empty points
-		o_water_structure.a_grid["element_symbol"] > 0
-	))
+	a_available_positions = find_grid_points(		# Retrieves the number of non-empty points
+		a_grid=o_water_structure.a_grid,
+		f_condition=lambda a_slab: a_slab["element_symbol"] > 0
+	)
 	del o_water_structure		# Frees memory
 	# END STEP 3 ---------------------------------------- #
 
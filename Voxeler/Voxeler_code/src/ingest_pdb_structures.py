@@ -0,0 +1,189 @@
+# Information ---------------------------------------------------------------- #
+# Author :	Julien Lenoir
+# Github :	Blackounet
+# Created : March 2021
+# Updated :
+# ---------------------------------------------------------------------------- #
+
+
+
+# Importations --------------------------------------------------------------- #
+
+# Universal modules
+import multiprocessing as mp
+	# Allows the execution of code on multiple threads
+from concurrent.futures import ProcessPoolExecutor
+	# Runs tasks on a pool of processes, detects the processes stopped during a task
+from concurrent.futures.process import BrokenProcessPool
+	# Raised when a process of the pool stops during a task
+
+# Parameters
+from config import global_parameters as gp
+	# Contains the global variables
+
+# General library
+from lib.load_pdb_structure import load_pdb_structure
+	# Extracts a PDB structure from the cache or from the file, and applies filters
+	# In : (p) PDB file to extract, (d) parsing filters to apply, (p) cache directory
+	# Out : (o) the object containing the structure
+from lib.stream_pdb_models import stream_pdb_models
+	# Extracts a PDB structure for each model of a file, one at a time
+	# In : (p) PDB file to extract, (d) parsing filters to apply, (p) cache directory
+	# Out : (g(o)) a generator of the objects containing the structures
+from lib.terminate_program_process import terminate_program_process
+	# Stops the program and prints content
+	# In : (l(s)) content to prompt
+	# Out : None
+
+# ---------------------------------------------------------------------------- #
+
+
+
+# Main function -------------------------------------------------------------- #
+
+def ingest_pdb_structures(l_p_files, d_filters, p_cache=None):
+	"""
+	Extracts the PDB structures of many files, the files are distributed over the allocated CPU
+	:param l_p_files: List of the PDB files to extract
+	:param d_filters: Dictionary of parsing filters to apply
+	:param p_cache: Path to the directory of cached structures, None disables the cache
+	:return: The list of extracted structures, in the order of the files and of their models
+	"""
+
+	# STEP 0 : Preparing variables ---------------------- #
+	l_s_logs = []				# A list for logs messages
+	l_o_structures = []			# The list of extracted structures
+	# END STEP 0 ---------------------------------------- #
+
+
+	# STEP 1 : Defining settings ------------------------ #
+	# If the user has defined a number of CPU
+	if gp.D_PARAMETERS_GLOBAL["i_cpu_allocated"] is not None:
+		i_cpu_count = gp.D_PARAMETERS_GLOBAL["i_cpu_allocated"]
+
+	# If the user has not defined a number of CPU to use
+	else:
+		i_cpu_count = mp.cpu_count()		# Retrieves the amount of available CPU
+
+	i_cpu_count = max(min(i_cpu_count, len(l_p_files)), 1)					# No more processes than files
+	i_chunk_size = max(len(l_p_files) // (i_cpu_count * 4), 1)				# Number of files sent at once to a process
+	# END STEP 1 ---------------------------------------- #
+
+
+	# STEP 2 : Extracting the structures ---------------- #
+	# If a single process is used
+	if i_cpu_count == 1:
+
+		# For each PDB file to parse
+		for p_pdb in l_p_files:
+			l_o_structures.extend(extract_file_structures(		# Extracts the PDB structures of the file
+				p_file=p_pdb,									# The PDB file to extract
+				d_filters=d_filters,							# The parsing filters to apply
+				p_cache=p_cache									# Directory of the cached structures
+			))
+
+	# If the files are distributed over several processes
+	else:
+
+		# Tries to extract every structure
+		try:
+			o_task_manager = ProcessPoolExecutor(		# Creates a task manager
+				max_workers=i_cpu_count					# Allocates a number of CPU to the task manager
+			)
+			l_l_structures = o_task_manager.map(		# Launches the tasks, keeps the order of the files
+				send_file_structures,					# The function to run on multiple CPU
+				l_p_files,								# The PDB files to extract
+				[d_filters] * len(l_p_files),			# The parsing filters to apply
+				[p_cache] * len(l_p_files),				# Directory of the cached structures
+				chunksize=i_chunk_size
+			)
+
+			# For each extracted file
+			for l_o_file_structures in l_l_structures:
+				l_o_structures.extend(l_o_file_structures)		# Saves the structures of the file
+
+			o_task_manager.shutdown()		# Closes the pool of tasks, reallocates resources
+
+		# If a process has been stopped, the cause is already written in the logs
+		except BrokenProcessPool:
+			l_s_logs.append("ERROR : The extraction of the PDB structures has been stopped")		# Defines the error message
+			terminate_program_process(		# Stops the program
+				l_s_content=l_s_logs		# Content to save to logs
+			)
+		# End try
+	# End if
+	# END STEP 2 ---------------------------------------- #
+
+
+	# STEP 3 : Returning the structures ----------------- #
+	return l_o_structures		# Returns the extracted structures
+	# END STEP 3 ---------------------------------------- #
+
+# ---------------------------------------------------------------------------- #
+
+
+
+# Auxiliary functions -------------------------------------------------------- #
+
+def extract_file_structures(p_file, d_filters, p_cache):
+	"""
+	Extracts the PDB structures of a file, a single one or one for each model, one structure at a time
+	:param p_file: Path to the PDB file to extract
+	:param d_filters: Dictionary of parsing filters to apply
+	:param p_cache: Path to the directory of cached structures, None disables the cache
+	:return: A generator of the extracted structures
+	"""
+
+	# If each model needs its own structure
+	if d_filters.get("b_split_models", False):
+		yield from stream_pdb_models(		# Extracts each model of the file, once the previous one is used
+			p_file=p_file,					# The PDB file to extract
+			d_filters=d_filters,			# The parsing filters to apply
+			p_cache=p_cache					# Directory of the cached structures
+		)
+		return
+
+	yield load_pdb_structure(		# Extracts a PDB structure into an object
+		p_file=p_file,				# The PDB file to extract
+		d_filters=d_filters,		# The parsing filters to apply
+		p_cache=p_cache				# Directory of the cached structures
+	)
+# End function ------------------------------------------ #
+
+
+def send_file_structures(p_file, d_filters, p_cache):
+	"""
+	Extracts the PDB structures of a file in a process of the pool, the structures are sent back together
+	:param p_file: Path to the PDB file to extract
+	:param d_filters: Dictionary of parsing filters to apply
+	:param p_cache: Path to the directory of cached structures, None disables the cache
+	:return: The list of extracted structures
+	"""
+
+	return list(extract_file_structures(		# A generator cannot be sent back by the process
+		p_file=p_file,							# The PDB file to extract
+		d_filters=d_filters,					# The parsing filters to apply
+		p_cache=p_cache							# Directory of the cached structures
+	))
+# End function ------------------------------------------ #
+
+# ---------------------------------------------------------------------------- #
+
+
+
+# Reference ------------------------------------------------------------------ #
+
+# Importation
+# from ingest_pdb_structures import ingest_pdb_structures
+	# Extracts the PDB structures of many files on multiple CPU
+	# In : (l(p)) PDB files to extract, (d) parsing filters to apply, (p) cache directory
+	# Out : (l(o)) the objects containing the structures
+
+# Usage
+# ingest_pdb_structures(		# Extracts the PDB structures
+# 	l_p_files=l_p_files,		# The PDB files to extract
+# 	d_filters=d_filters,		# The parsing filters to apply
+# 	p_cache=p_cache				# Directory of the cached structures
+# )
+
+# ---------------------------------------------------------------------------- #
@@ -10,8 +10,6 @@
 # Importations --------------------------------------------------------------- #
 
 # Universal modules
-import numpy as np
-	# Allows Numpy array manipulation
 import time
 	# Enables time manipulation
 import psutil
@@ -28,24 +26,29 @@ from cla.system_comparison import SystemComparison
 	# Singleton object containing every structure to be compared
 from cla.tree_plot import TreePlot
 	# Generates, renders and saves trees
+from cla.grid_cache import GridCache
+	# Least recently used cache of the grids generated by a process
+from cla.shared_grid_store import SharedGridStore
+	# Store of grids kept in shared memory blocks, read by every process without copy
+from cla.grid_archive import GridArchive
+	# Archive of the grids saved in compressed files, reused by the next runs
 
 # General library
-from lib.retrieve_specific_files import retrieve_specific_files
-	# Retrieves files path, recursively or not, matching a specific pattern, or not
-	# In : (p) directory to retrieve files from, (s) pattern to match,
-	# In : (b) if the search needs to be recursive, (i) minimum number of match,
-	# In : (i) maximum number of match
+from lib.retrieve_structure_files import retrieve_structure_files
+	# Retrieves structure files path, plain, compressed or archived, recursively or not
+	# In : (p) directory to retrieve files from, (b) if the search needs to be recursive,
+	# In : (i) minimum number of match, (i) maximum number of match
 	# Out : (l(p)) a list of the file paths founds
-from lib.parse_pdb_file import parse_pdb_file
-	# Extracts a PDB structure from a file and applies filters
-	# In : (p) PDB file to extract, (d) parsing filters to apply
-	# Out : (o) the object containing the structure
 from lib.terminate_program_process import terminate_program_process
 	# Stops the program and prints content
 	# In : (l(s)) content to prompt
 	# Out : None
 
 # Specific modules
+from src.ingest_pdb_structures import ingest_pdb_structures
+	# Extracts the PDB structures of many files on multiple CPU
+	# In : (l(p)) PDB files to extract, (d) parsing filters to apply, (p) cache directory
+	# Out : (l(o)) the objects containing the structures
 from src.compute_grid_similarity import compute_grid_similarity
 	# Computes the similarity between two grids
 	# In : (d) comparison parameters, (o) the first structure to compare,
@@ -77,9 +80,8 @@ def launch_structure_comparison():
 
 
 	# STEP 1 : Find PDB files --------------------------- #
-	l_p_input_pdb = retrieve_specific_files(						# Retrieves PDB paths
+	l_p_input_pdb = retrieve_structure_files(						# Retrieves PDB paths
 		p_directory=gp.D_PARAMETERS_COMPARISON["p_input_pdb"],		# Path to the input directory
-		s_pattern="*.pdb",											# Pattern to match within the directories
 		b_recursive=True,											# Also searches in the subdirectories
 		i_min_match=1,												# Minimum number of files to retrieve
 		i_max_match=9999											# Maximum number of files to retrieve
@@ -94,23 +96,22 @@ def launch_structure_comparison():
 		"b_discard_hydrogen": gp.D_PARAMETERS_COMPARISON["b_discard_hydrogen"],									# Discards Hydrogen atoms
 		"b_discard_water": gp.D_PARAMETERS_COMPARISON["b_discard_water"],										# Discards water molecules
 		"b_discard_alternative": gp.D_PARAMETERS_COMPARISON["b_discard_alternative"],							# Discards alternative positions
+		"b_split_models": gp.D_PARAMETERS_COMPARISON["b_split_models"],									# Extracts a structure for each model
 		"l_c_chain_white": [item.upper() for item in gp.D_PARAMETERS_COMPARISON["l_c_chain_white"]],			# List of chains to keep, discards others
 		"l_c_chain_black": [item.upper() for item in gp.D_PARAMETERS_COMPARISON["l_c_chain_black"]],			# List of chains to discard
 		"l_s_residue_white": [item.upper() for item in gp.D_PARAMETERS_COMPARISON["l_s_residue_white"]],		# List of residues to keep, discards others
 		"l_s_residue_black": [item.upper() for item in gp.D_PARAMETERS_COMPARISON["l_s_residue_black"]],		# List of residues to discard
-		"l_i_residue_white": [item.upper() for item in gp.D_PARAMETERS_COMPARISON["l_i_residue_white"]],		# List of residues ID to keep, discards others
-		"l_i_residue_black": [item.upper() for item in gp.D_PARAMETERS_COMPARISON["l_i_residue_black"]],		# List of residues ID to discard
+		"l_i_residue_white": [str(item).upper() for item in gp.D_PARAMETERS_COMPARISON["l_i_residue_white"]],		# List of residues ID to keep, discards others
+		"l_i_residue_black": [str(item).upper() for item in gp.D_PARAMETERS_COMPARISON["l_i_residue_black"]],		# List of residues ID to discard
 		"l_s_atom_white": [item.upper() for item in gp.D_PARAMETERS_COMPARISON["l_s_atom_white"]],				# List of atom type to keep, discards others
 		"l_s_atom_black": [item.upper() for item in gp.D_PARAMETERS_COMPARISON["l_s_atom_black"]],				# List of atom type to discard
 	}
 
-	# For each PDB file to parse
-	for p_pdb in l_p_input_pdb:
-		o_structure = parse_pdb_file(			# Extracts a PDB structure into an object
-			p_file=p_pdb,						# The PDB file to extract
-			d_filters=d_parsing_parameters		# The parsing filters to apply
-		)
-		gp.O_SYSTEM_COMPARISON.l_o_structures.append(o_structure)		# Registers the structure in the system
+	gp.O_SYSTEM_COMPARISON.l_o_structures.extend(ingest_pdb_structures(		# Registers the structures in the system
+		l_p_files=l_p_input_pdb,											# The PDB files to extract
+		d_filters=d_parsing_parameters,										# The parsing filters to apply
+		p_cache=gp.D_PARAMETERS_GLOBAL["p_structure_cache"]					# Directory of the cached structures
+	))
 
 	gp.O_SYSTEM_COMPARISON.actualize_properties()		# Actualizes the system properties depending of the structures
 	# END STEP 2 ---------------------------------------- #
@@ -126,7 +127,61 @@ def launch_structure_comparison():
 	# END STEP 3 ---------------------------------------- #
 
 
-	# STEP 4 : Determining the normalisation method ----- #
+	# STEP 4 : Generating the grids --------------------- #
+	# If the user has defined a number of CPU
+	if gp.D_PARAMETERS_GLOBAL["i_cpu_allocated"] is not None:
+		i_cpu_count = gp.D_PARAMETERS_GLOBAL["i_cpu_allocated"]
+
+	# If the user has not defined a number of CPU to use
+	else:
+		i_cpu_count = mp.cpu_count()		# Retrieves the amount of available CPU
+
+	# If the program is not allowed to use all the available memory
+	if gp.D_PARAMETERS_GLOBAL["f_memory_allocated"] > 0:
+		f_memory_budget = gp.D_PARAMETERS_GLOBAL["f_memory_allocated"]		# Memory allowed to the program, in gigabytes
+
+	# If the program can use all the available memory
+	else:
+		f_memory_budget = psutil.virtual_memory().available / 1073741824		# Memory currently available, in gigabytes
+
+	# If the grids are saved for the next runs
+	if gp.D_PARAMETERS_GLOBAL["p_grid_cache"] is not None and gp.D_PARAMETERS_GLOBAL["p_grid_cache"] != "":
+		gp.O_SYSTEM_COMPARISON.o_grid_archive = GridArchive(		# Loads the grids saved by the previous runs
+			p_directory=gp.D_PARAMETERS_GLOBAL["p_grid_cache"]		# Directory of the grid files
+		)
+
+	gp.O_SYSTEM_COMPARISON.o_grid_store = SharedGridStore(		# Keeps each grid once for every process
+		f_memory_budget=f_memory_budget / 2						# Half of the memory is used by the shared grids
+	)
+	o_task_manager = mp.Pool(									# Creates a task manager
+		processes=i_cpu_count									# Allocates a number of CPU to the task manager
+	)
+
+	# For each generated grid
+	for i_structure, t_a_grid in enumerate(o_task_manager.imap(		# Generates each grid once, on multiple CPU
+		func=build_grid_multithreaded,								# The function to run on multiple CPU
+		iterable=range(len(gp.O_SYSTEM_COMPARISON.l_o_structures))	# Allocates a structure index to each task
+	)):
+		gp.O_SYSTEM_COMPARISON.o_grid_store.store_grid(			# Copies the grid into shared memory
+			t_key=gp.O_SYSTEM_COMPARISON.build_grid_key(
+				o_structure=gp.O_SYSTEM_COMPARISON.l_o_structures[i_structure],		# The structure of the grid
+				d_parameters=gp.D_PARAMETERS_COMPARISON								# Parameters used for the grid generation
+			),
+			t_a_grid=t_a_grid
+		)
+	# End for
+
+	o_task_manager.close()		# Closes the pool of tasks
+	o_task_manager.join()		# Joins the results
+	o_task_manager.terminate()	# Kills the pool of tasks, reallocates resources
+
+	gp.O_SYSTEM_COMPARISON.o_grid_cache = GridCache(		# Each process keeps the grids missing from the store for its next tasks
+		f_memory_budget=f_memory_budget / 2 / i_cpu_count	# Shares the other half of the memory between the processes
+	)
+	# END STEP 4 ---------------------------------------- #
+
+
+	# STEP 5 : Determining the normalisation method ----- #
 	s_normalisation = gp.D_PARAMETERS_COMPARISON["s_comparison_normalisation"].upper()		# Retrieves the normalisation method to use
 
 	# If the program needs to retrieve the number of non empty points for each structure
@@ -140,8 +195,8 @@ def launch_structure_comparison():
 				o_structure=o_structure,					# The structure to place into a grid
 				d_parameters=gp.D_PARAMETERS_COMPARISON		# Parameters used for the VdW volumes generation
 			)
-			l_structure_size.append(np.count_nonzero(o_structure.a_grid))		# Counts the number of points containing atoms
-			o_structure.a_grid = None		# Frees some memory
+			l_structure_size.append(gp.O_SYSTEM_COMPARISON.count_grid_points(o_structure))		# Counts the number of points containing atoms
+			o_structure.delete_grid()		# Frees some memory
 		# End for
 
 	# If the similarity needs to be based on the minimal number of empty points
@@ -160,10 +215,10 @@ def launch_structure_comparison():
 			l_s_content=l_s_logs		# Content to save in the logs
 		)
 	# End if
-	# END STEP 4 ---------------------------------------- #
+	# END STEP 5 ---------------------------------------- #
 
 
-	# STEP 5 : Running the comparison ------------------- #
+	# STEP 6 : Running the comparison ------------------- #
 	i_total_tasks = int(										# Computes the number of combination to process
 		len(gp.O_SYSTEM_COMPARISON.l_o_structures) *
 		(len(gp.O_SYSTEM_COMPARISON.l_o_structures) - 1)
@@ -180,14 +235,6 @@ def launch_structure_comparison():
 			gp.O_SYSTEM_COMPARISON.l_l_tasks.append([i_first_index, i_second_index])		# Saves the parameters of the each task
 	# End for
 
-	# If the user has defined a number of CPU
-	if gp.D_PARAMETERS_GLOBAL["i_cpu_allocated"] is not None:
-		i_cpu_count = gp.D_PARAMETERS_GLOBAL["i_cpu_allocated"]
-
-	# If the user has not defined a number of CPU to use
-	else:
-		i_cpu_count = mp.cpu_count()		# Retrieves the amount of available CPU
-
 	# Running the tasks
 	gp.O_SYSTEM_COMPARISON.setup_progress()		# Initializes the progression bar
 	o_task_manager = mp.Pool(					# Creates a task manager
@@ -202,11 +249,12 @@ def launch_structure_comparison():
 	o_task_manager.join()									# Joins the results
 	o_task_manager.terminate()								# Kills the pool of tasks, reallocates resources
 	gp.O_SYSTEM_COMPARISON.close_progress()					# Closes the progression bar
+	gp.O_SYSTEM_COMPARISON.o_grid_store.release_blocks()	# Deletes the shared grids
 	del gp.O_SYSTEM_COMPARISON								# Deletes the object and frees memory
-	# END STEP 5 ---------------------------------------- #
+	# END STEP 6 ---------------------------------------- #
 
 
-	# STEP 6 : Generating the tree ---------------------- #
+	# STEP 7 : Generating the tree ---------------------- #
 	o_tree = TreePlot()		# Creates a tree object
 
 	# For each result to save
@@ -228,7 +276,7 @@ def launch_structure_comparison():
 		d_parameters=gp.D_PARAMETERS_COMPARISON		# The parameters used for saving the tree
 	)
 	del o_tree										# Deletes the tree and frees memory
-	# END STEP 6 ---------------------------------------- #
+	# END STEP 7 ---------------------------------------- #
 
 # ---------------------------------------------------------------------------- #
 
@@ -236,6 +284,34 @@ def launch_structure_comparison():
 
 # Auxiliary functions -------------------------------------------------------- #
 
+def build_grid_multithreaded(i_structure):
+	"""
+	Generates the grid of a structure, to be copied into the shared store
+	:param i_structure: The index of the structure to load into a grid
+	:return: The arrays of the grid
+	"""
+
+	o_structure = gp.O_SYSTEM_COMPARISON.l_o_structures[i_structure]		# Loads the structure
+
+	gp.O_SYSTEM_COMPARISON.generate_grid(			# Creates a grid, loads the structure into it, place VdW volumes
+		o_structure=o_structure,					# The structure to place into a grid
+		d_parameters=gp.D_PARAMETERS_COMPARISON		# Parameters used for the VdW volumes generation
+	)
+	t_a_grid = (		# The arrays of the grid
+		o_structure.a_grid,
+		o_structure.a_voxels,
+		o_structure.a_bit_grid,
+		o_structure.a_blocks,
+		o_structure.a_block_points,
+		o_structure.a_occupancy
+	)
+	o_structure.delete_grid()		# Frees some memory
+
+	return t_a_grid		# Returns the arrays of the grid
+# End function ------------------------------------------ #
+
+
+
 def compare_grid_multithreaded(i_task):
 	"""
 	Generates and compares grids of atoms
@@ -254,24 +330,14 @@ def compare_grid_multithreaded(i_task):
 		while (psutil.virtual_memory().used / 1073741824) - 2.0 > gp.D_PARAMETERS_GLOBAL["f_memory_allocated"]:
 			time.sleep(1)		# Waits until there is available memory
 
-	# Generating grids
-	gp.O_SYSTEM_COMPARISON.generate_grid(			# Creates a grid, loads the structure into it, place VdW volumes
-		o_structure=o_second_structure,				# The structure to place into a grid
-		d_parameters=gp.D_PARAMETERS_COMPARISON		# Parameters used for the VdW volumes generation
-	)
-	gp.O_SYSTEM_COMPARISON.generate_grid(			# Creates a grid, loads the structure into it, place VdW volumes
-		o_structure=o_second_structure,				# The structure to place into a grid
-		d_parameters=gp.D_PARAMETERS_COMPARISON		# Parameters used for the VdW volumes generation
-	)
-
-	# Computing the grid similarities
+	# Computing the grid similarities, the grids are generated or taken from the cache of the process
 	f_similarity = compute_grid_similarity(				# Computes the similarity between two structures
 		d_parameters=gp.D_PARAMETERS_COMPARISON,		# Comparison parameters
 		o_first_structure=o_first_structure,			# The first structure to compare
 		o_second_structure=o_second_structure,			# The second structure to compare
 	)
 
-	# Freeing memory
+	# Freeing memory, the grids are kept by the cache of the process
 	o_first_structure.delete_grid()			# Frees some memory some memory
 	o_second_structure.delete_grid()		# Frees some memory some memory
 
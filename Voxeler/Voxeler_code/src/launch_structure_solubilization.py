@@ -19,18 +19,17 @@ from config import global_parameters as gp
 from cla.system_solubilization import SystemSolubilization
 
 # General library
-from lib.retrieve_specific_files import retrieve_specific_files
-	# Retrieves files path, recursively or not, matching a specific pattern, or not
-	# In : (p) directory to retrieve files from, (s) pattern to match,
-	# In : (b) if the search needs to be recursive, (i) minimum number of match,
-	# In : (i) maximum number of match
+from lib.retrieve_structure_files import retrieve_structure_files
+	# Retrieves structure files path, plain, compressed or archived, recursively or not
+	# In : (p) directory to retrieve files from, (b) if the search needs to be recursive,
+	# In : (i) minimum number of match, (i) maximum number of match
 	# Out : (l(p)) a list of the file paths founds
-from lib.parse_pdb_file import parse_pdb_file
-	# Extracts a PDB structure from a file and applies filters
-	# In : (p) PDB file to extract, (d) parsing filters to apply
-	# Out : (o) the object containing the structure
 
 # Specific modules
+from src.ingest_pdb_structures import ingest_pdb_structures
+	# Extracts the PDB structures of many files on multiple CPU
+	# In : (l(p)) PDB files to extract, (d) parsing filters to apply, (p) cache directory
+	# Out : (l(o)) the objects containing the structures
 from src.solubilize_pdb_structure import solubilize_pdb_structure
 from src.convert_dic_pdb import thresh_positions
 from src.convert_dic_pdb import convert_dic_pdb
@@ -59,9 +58,8 @@ def launch_structure_solubilization():
 
 
 	# STEP 1 : Find PDB files --------------------------- #
-	l_p_input_pdb = retrieve_specific_files(							# Retrieves PDB paths
+	l_p_input_pdb = retrieve_structure_files(							# Retrieves PDB paths
 		p_directory=gp.D_PARAMETERS_SOLUBILIZATION["p_input_pdb"],		# Path to the input directory
-		s_pattern="*.pdb",												# Pattern to match within the directories
 		b_recursive=True,												# Also searches in the subdirectories
 		i_min_match=1,													# Minimum number of files to retrieve
 		i_max_match=9999												# Maximum number of files to retrieve
@@ -76,23 +74,22 @@ def launch_structure_solubilization():
 		"b_discard_hydrogen": gp.D_PARAMETERS_SOLUBILIZATION["b_discard_hydrogen"],									# Discards Hydrogen atoms
 		"b_discard_water": gp.D_PARAMETERS_SOLUBILIZATION["b_discard_water"],										# Discards water molecules
 		"b_discard_alternative": gp.D_PARAMETERS_SOLUBILIZATION["b_discard_alternative"],							# Discards alternative positions
+		"b_split_models": gp.D_PARAMETERS_SOLUBILIZATION["b_split_models"],									# Extracts a structure for each model
 		"l_c_chain_white": [item.upper() for item in gp.D_PARAMETERS_SOLUBILIZATION["l_c_chain_white"]],			# List of chains to keep, discards others
 		"l_c_chain_black": [item.upper() for item in gp.D_PARAMETERS_SOLUBILIZATION["l_c_chain_black"]],			# List of chains to discard
 		"l_s_residue_white": [item.upper() for item in gp.D_PARAMETERS_SOLUBILIZATION["l_s_residue_white"]],		# List of residues to keep, discards others
 		"l_s_residue_black": [item.upper() for item in gp.D_PARAMETERS_SOLUBILIZATION["l_s_residue_black"]],		# List of residues to discard
-		"l_i_residue_white": [item.upper() for item in gp.D_PARAMETERS_SOLUBILIZATION["l_i_residue_white"]],		# List of residues ID to keep, discards others
-		"l_i_residue_black": [item.upper() for item in gp.D_PARAMETERS_SOLUBILIZATION["l_i_residue_black"]],		# List of residues ID to discard
+		"l_i_residue_white": [str(item).upper() for item in gp.D_PARAMETERS_SOLUBILIZATION["l_i_residue_white"]],		# List of residues ID to keep, discards others
+		"l_i_residue_black": [str(item).upper() for item in gp.D_PARAMETERS_SOLUBILIZATION["l_i_residue_black"]],		# List of residues ID to discard
 		"l_s_atom_white": [item.upper() for item in gp.D_PARAMETERS_SOLUBILIZATION["l_s_atom_white"]],				# List of atom type to keep, discards others
 		"l_s_atom_black": [item.upper() for item in gp.D_PARAMETERS_SOLUBILIZATION["l_s_atom_black"]],				# List of atom type to discard
 	}
 
-	# For each PDB file to parse
-	for p_pdb in l_p_input_pdb:
-		o_structure = parse_pdb_file(			# Extracts a PDB structure into an object
-			p_file=p_pdb,						# The PDB file to extract
-			d_filters=d_parsing_parameters		# The parsing filters to apply
-		)
-		gp.O_SYSTEM_SOLUBILIZATION.l_o_structures.append(o_structure)		# Registers the structure in the system
+	gp.O_SYSTEM_SOLUBILIZATION.l_o_structures.extend(ingest_pdb_structures(		# Registers the structures in the system
+		l_p_files=l_p_input_pdb,											# The PDB files to extract
+		d_filters=d_parsing_parameters,										# The parsing filters to apply
+		p_cache=gp.D_PARAMETERS_GLOBAL["p_structure_cache"]					# Directory of the cached structures
+	))
 
 	gp.O_SYSTEM_SOLUBILIZATION.actualize_properties()		# Actualizes the system properties depending of the structures
 	# END STEP 2 ---------------------------------------- #
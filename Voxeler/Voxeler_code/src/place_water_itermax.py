@@ -24,6 +24,17 @@ from config import global_parameters as gp
 
 # Classes
 # General library
+from lib.build_sphere_stencil import build_sphere_stencil
+
+# Defines the relative coordinates of the points of a sphere, built once by process
+# In : (s) sphere geometry, (i) radius in grid points
+# Out : (a) the relative coordinates, one row per axis
+from lib.find_grid_points import find_grid_points
+
+# Finds the coordinates of the grid points fulfilling a condition, by slabs along the x axis
+# In : (a) grid to scan, (f) condition on a slab of the grid, (i) maximal number of points at once
+# Out : (a) coordinates of the points, one row per axis
+
 # Specific modules
 
 # ---------------------------------------------------------------------------- #
@@ -41,45 +52,38 @@ def place_water_itermax(d_parameters, o_system, o_structure):
 
     # STEP 0 : Preparing variables ---------------------- #
     i_water_code = gp.D_ELEMENT_NUMBER["OOW"]  # Retrieves the element code for water
-    f_water_radius = o_system.d_scaled_vdw["OOW"]  # Retrieves the VdW radius of a water molecule, in Angstrom
-    l_i_radius_range = list(range(-f_water_radius,
-                                  f_water_radius + 1))  # Generates the list of radius inside the WdV sphere of water molecules
+    f_water_radius = o_system.a_scaled_vdw[i_water_code]  # Retrieves the VdW radius of a water molecule, in Angstrom
     # END STEP 0 ---------------------------------------- #
 
     # STEP 1 : Determining the functions to be used ----- #
-    d_geometry_sphere = {  # Dictionary matching the system geometry to the corresponding sphere formula
-        "manhattan": determine_sphere_manhattan,
-        "minkowski": determine_sphere_minkowski,
-        "euclidean": determine_sphere_euclidean
-    }
     d_geometry_distance = {  # Dictionary matching the system geometry to the corresponding distance formula
         "manhattan": compute_distance_manhattan,
         "minkowski": compute_distance_minkowski,
         "euclidean": compute_distance_euclidean
     }
-    function_sphere = d_geometry_sphere[
-        d_parameters["s_scoring_metric"].lower()]  # Loads the sphere function corresponding to the system geometry
     function_distance = d_geometry_distance[
         d_parameters["s_scoring_metric"].lower()]  # Loads the distance function corresponding to the system geometry
     # END STEP 1 ---------------------------------------- #
 
     # STEP 2 : Separating structure and water ----------- #
-    a_water_grid = cp.deepcopy(o_structure.a_grid)  # Copies the grid containing the structure
-    a_water_positions = np.array(np.where(  # Retrieves the position of potential water molecules
-        o_structure.a_grid["element_symbol"] == i_water_code
-    ))
+    a_water_grid = o_system.copy_grid(o_structure.a_grid)  # Copies the grid containing the structure
+    a_water_positions = find_grid_points(  # Retrieves the position of potential water molecules
+        a_grid=o_structure.a_grid,
+        f_condition=lambda a_slab: a_slab["element_symbol"] == i_water_code
+    )
     o_structure.a_grid[  # Deletes the water positions from the main grid
         a_water_positions[0],  # X coordinates for the potential water molecules
         a_water_positions[1],  # Y coordinates for the potential water molecules
         a_water_positions[2]  # Z coordinates for the potential water molecules
     ] = (0, 0, 0)
 
-    a_structure_positions = np.array(np.where(  # Retrieves the coordinates of each structure atoms
-        np.bitwise_and(  # Points must fulfil multiple conditions
-            o_structure.a_grid["element_symbol"] > 0,  # Non-empty points
-            o_structure.a_grid["element_symbol"] != i_water_code  # Points not containing water molecules
+    a_structure_positions = find_grid_points(  # Retrieves the coordinates of each structure atoms
+        a_grid=o_structure.a_grid,
+        f_condition=lambda a_slab: np.bitwise_and(  # Points must fulfil multiple conditions
+            a_slab["element_symbol"] > 0,  # Non-empty points
+            a_slab["element_symbol"] != i_water_code  # Points not containing water molecules
         )
-    ))
+    )
     a_water_grid[  # Deletes the structure atoms from the water grid
         a_structure_positions[0],  # X coordinates of the structure atoms
         a_structure_positions[1],  # Y coordinates of the structure atoms
@@ -88,10 +92,10 @@ def place_water_itermax(d_parameters, o_system, o_structure):
     # END STEP 2 ---------------------------------------- #
 
     # STEP 3 : Filtering insufficient scores ------------ #
-    a_low_scores = np.array(
-        np.where(  # Retrieves the coordinates of each potential position with a score inferior to the minimal one
-            a_water_grid["score"] <= max(0, d_parameters["f_min_water_score"])
-        ))
+    a_low_scores = find_grid_points(  # Retrieves the coordinates of each potential position with a score inferior to the minimal one
+        a_grid=a_water_grid,
+        f_condition=lambda a_slab: a_slab["score"] <= max(0, d_parameters["f_min_water_score"])
+    )
 
     # If there is any position with a invalid score
     if np.any(a_low_scores):
@@ -100,9 +104,10 @@ def place_water_itermax(d_parameters, o_system, o_structure):
             a_low_scores[1],  # Y coordinates of the positions with insufficient score
             a_low_scores[2],  # Z coordinates of the positions with insufficient score
         ] = (0, 0, 0)
-        a_water_positions = np.array(np.where(  # Updates the position of potential water molecules
-            a_water_grid["element_symbol"] == i_water_code
-        ))
+        a_water_positions = find_grid_points(  # Updates the position of potential water molecules
+            a_grid=a_water_grid,
+            f_condition=lambda a_slab: a_slab["element_symbol"] == i_water_code
+        )
 
     del a_low_scores  # Deletes the array of invalid positions
     # End if
@@ -117,9 +122,9 @@ def place_water_itermax(d_parameters, o_system, o_structure):
     # END STEP 4 ---------------------------------------- #
 
     # STEP 5 : Determining the shape of the VdW sphere -- #
-    a_sphere_shape = function_sphere(  # Generates the array of points in the VdW sphere
-        l_i_radius_range=l_i_radius_range,  # All the distances from the atom center
-        f_element_radius=f_water_radius  # The VdW radius from the atom center
+    a_sphere_shape = build_sphere_stencil(  # Retrieves the shared array of points in the VdW sphere
+        s_geometry=d_parameters["s_scoring_metric"],  # The sphere geometry matching the scoring metric
+        i_radius=f_water_radius  # The VdW radius from the atom center
     )
     # END STEP 5 ---------------------------------------- #
 
@@ -279,9 +284,10 @@ def sort_element_score(a_element_grid, i_element_code, f_min_score):
 	Sorts each score value in the element grid
 	"""
 
-    a_element_positions = np.array(np.where(
-        a_element_grid["element_symbol"] == i_element_code  # Retrieves the positions where the element is present
-    )) #TODO use this (and the rest)
+    a_element_positions = find_grid_points(
+        a_grid=a_element_grid,
+        f_condition=lambda a_slab: a_slab["element_symbol"] == i_element_code  # Retrieves the positions where the element is present
+    ) #TODO use this (and the rest)
     l_all_scores = np.sort(
         list(set(  # Retrieves the score of each point containing the element, save it into a sorted set list
             a_element_grid["score"][
@@ -344,41 +350,6 @@ def place_element_volume(a_structure_grid, a_element_grid, a_atom_center, a_sphe
     return b_place
 
 
-# End function ------------------------------------------ #
-
-# Sphere formulas
-
-def determine_sphere_manhattan(l_i_radius_range, f_element_radius):
-    """
-	Determines the array of points contained within the VdW sphere of the element
-	"""
-    a_sphere = np.array([(x, y, z) for x in l_i_radius_range for y in l_i_radius_range for z in l_i_radius_range
-                         if abs(x) + abs(y) + abs(z) <= f_element_radius]).astype(np.int32).T
-    return a_sphere  # Returns the relative positions of points included in the sphere
-
-
-# End function ------------------------------------------ #
-
-def determine_sphere_minkowski(l_i_radius_range, f_element_radius):
-    """
-	Determines the array of points contained within the VdW sphere of the element
-	"""
-    a_sphere = np.array(
-        [(x, y, z) for x in l_i_radius_range for y in l_i_radius_range for z in l_i_radius_range]).astype(np.int32).T
-    return a_sphere  # Returns the relative positions of points included in the sphere
-
-
-# End function ------------------------------------------ #
-
-def determine_sphere_euclidean(l_i_radius_range, f_element_radius):
-    """
-	Determines the array of points contained within the VdW sphere of the element
-	"""
-    a_sphere = np.array([(x, y, z) for x in l_i_radius_range for y in l_i_radius_range for z in l_i_radius_range
-                         if x ** 2 + y ** 2 + z ** 2 <= f_element_radius ** 2]).astype(np.int32).T
-    return a_sphere  # Returns the relative positions of points included in the sphere
-
-
 # End function ------------------------------------------ #
 
 # Distance formulas